@@ -0,0 +1,70 @@
+"""add monthly financial rollup table
+
+Revision ID: 20261018_01
+Revises: 20260513_01
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_01"
+down_revision: Union[str, None] = "20260513_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS monthly_financial_rollup (
+            id SERIAL PRIMARY KEY,
+            month VARCHAR(7) NOT NULL,
+            trip_count INTEGER NOT NULL DEFAULT 0,
+            revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+            received DOUBLE PRECISION NOT NULL DEFAULT 0,
+            pending DOUBLE PRECISION NOT NULL DEFAULT 0,
+            pending_trips INTEGER NOT NULL DEFAULT 0,
+            partial_trips INTEGER NOT NULL DEFAULT 0,
+            unpaid_trips INTEGER NOT NULL DEFAULT 0,
+            charged_toll DOUBLE PRECISION NOT NULL DEFAULT 0,
+            charged_parking DOUBLE PRECISION NOT NULL DEFAULT 0,
+            discount DOUBLE PRECISION NOT NULL DEFAULT 0,
+            trip_fuel DOUBLE PRECISION NOT NULL DEFAULT 0,
+            direct_fuel DOUBLE PRECISION NOT NULL DEFAULT 0,
+            bhatta DOUBLE PRECISION NOT NULL DEFAULT 0,
+            toll DOUBLE PRECISION NOT NULL DEFAULT 0,
+            parking DOUBLE PRECISION NOT NULL DEFAULT 0,
+            other_expenses DOUBLE PRECISION NOT NULL DEFAULT 0,
+            maintenance DOUBLE PRECISION NOT NULL DEFAULT 0,
+            spare DOUBLE PRECISION NOT NULL DEFAULT 0,
+            oil DOUBLE PRECISION NOT NULL DEFAULT 0,
+            mechanic DOUBLE PRECISION NOT NULL DEFAULT 0,
+            vendor_payments DOUBLE PRECISION NOT NULL DEFAULT 0,
+            salary DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_monthly_financial_rollup_id ON monthly_financial_rollup (id)")
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_monthly_financial_rollup_month ON monthly_financial_rollup (month)"
+    )
+
+    # The dashboard reads the rollup and writes only deltas, so seed it with existing history.
+    from sqlalchemy.orm import Session
+
+    from app.services.financial_rollup_service import rebuild_financial_rollup
+
+    session = Session(bind=op.get_bind())
+    try:
+        rebuild_financial_rollup(session)
+    finally:
+        session.close()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS monthly_financial_rollup")
@@ -0,0 +1,132 @@
+"""normalize stored vehicle numbers and index vehicle_number columns
+
+Revision ID: 20261018_02
+Revises: 20261018_01
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_02"
+down_revision: Union[str, None] = "20261018_01"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same canonical form as vehicle_service.normalize_vehicle_number.
+NORMALIZED = "upper(replace(replace(vehicle_number, ' ', ''), '-', ''))"
+
+CHILD_TABLES = (
+    "trips",
+    "trip_vehicles",
+    "trip_driver_changes",
+    "fuel_entries",
+    "spare_parts",
+    "mechanic_entries",
+    "maintenance",
+    "oil_bill_entries",
+    "vehicle_emi_plans",
+    "vehicle_insurance",
+    "vehicle_tax",
+)
+
+INDEXED_TABLES = (
+    "trips",
+    "trip_vehicles",
+    "fuel_entries",
+    "spare_parts",
+    "mechanic_entries",
+    "maintenance",
+)
+
+
+def _colliding_vehicle_numbers() -> list[str]:
+    rows = op.get_bind().execute(
+        text(
+            f"""
+            SELECT string_agg(vehicle_number, ', ' ORDER BY vehicle_number)
+            FROM vehicles
+            GROUP BY {NORMALIZED}
+            HAVING count(*) > 1
+            ORDER BY 1
+            """
+        )
+    )
+    return [row[0] for row in rows]
+
+
+def upgrade() -> None:
+    # Every lookup compares against the canonical form, so two vehicles that
+    # normalize to the same number would leave one of them (and its child rows)
+    # unreachable. Stop before touching anything and let an operator merge them.
+    collisions = _colliding_vehicle_numbers()
+    if collisions:
+        raise RuntimeError(
+            "Cannot normalize vehicle numbers; these vehicles share a canonical number "
+            "and must be merged first: " + "; ".join(collisions)
+        )
+
+    # Foreign keys to vehicles(vehicle_number) are not ON UPDATE CASCADE, so they
+    # are dropped for the backfill and restored with their original definitions.
+    op.execute(
+        "CREATE TEMP TABLE _vehicle_number_fks (table_name text, constraint_name text, definition text) ON COMMIT DROP"
+    )
+    op.execute(
+        """
+        INSERT INTO _vehicle_number_fks
+        SELECT con.conrelid::regclass::text, con.conname, pg_get_constraintdef(con.oid)
+        FROM pg_constraint con
+        JOIN pg_attribute att ON att.attrelid = con.confrelid AND att.attnum = ANY (con.confkey)
+        WHERE con.contype = 'f'
+          AND con.confrelid = 'vehicles'::regclass
+          AND att.attname = 'vehicle_number'
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        DECLARE fk record;
+        BEGIN
+            FOR fk IN SELECT * FROM _vehicle_number_fks LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.table_name, fk.constraint_name);
+            END LOOP;
+        END $$;
+        """
+    )
+
+    op.execute(f"UPDATE vehicles SET vehicle_number = {NORMALIZED} WHERE vehicle_number <> {NORMALIZED}")
+    # Child rows get the same canonical form, so each still matches its vehicle
+    # and lookups by the normalized number reach every row.
+    for table in CHILD_TABLES:
+        op.execute(
+            f"UPDATE {table} SET vehicle_number = {NORMALIZED} "
+            f"WHERE vehicle_number IS NOT NULL AND vehicle_number <> {NORMALIZED}"
+        )
+
+    op.execute(
+        """
+        DO $$
+        DECLARE fk record;
+        BEGIN
+            FOR fk IN SELECT * FROM _vehicle_number_fks LOOP
+                EXECUTE format('ALTER TABLE %s ADD CONSTRAINT %I %s', fk.table_name, fk.constraint_name, fk.definition);
+            END LOOP;
+        END $$;
+        """
+    )
+
+    for table in INDEXED_TABLES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_vehicle_number ON {table} (vehicle_number)")
+
+
+def downgrade() -> None:
+    # Only the indexes are removed. The original spellings of vehicles.vehicle_number
+    # and of every child row were overwritten and cannot be restored, and the
+    # foreign keys stay as upgrade re-created them (same definitions, canonical values).
+    for table in INDEXED_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_vehicle_number")
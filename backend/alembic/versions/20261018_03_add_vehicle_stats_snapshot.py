@@ -0,0 +1,79 @@
+"""add per-vehicle stats snapshot tables
+
+Revision ID: 20261018_03
+Revises: 20261018_02
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_03"
+down_revision: Union[str, None] = "20261018_02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS vehicle_stats_snapshot (
+            id SERIAL PRIMARY KEY,
+            vehicle_number VARCHAR NOT NULL,
+            month VARCHAR(7) NOT NULL,
+            trip_count INTEGER NOT NULL DEFAULT 0,
+            trip_income DOUBLE PRECISION NOT NULL DEFAULT 0,
+            trip_revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+            total_km DOUBLE PRECISION NOT NULL DEFAULT 0,
+            trip_fuel_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+            direct_fuel_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+            direct_fuel_litres DOUBLE PRECISION NOT NULL DEFAULT 0,
+            spare_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+            oil_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+            oil_entries INTEGER NOT NULL DEFAULT 0,
+            mechanic_cost DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_vehicle_stats_snapshot_vehicle_month UNIQUE (vehicle_number, month)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_vehicle_stats_snapshot_id ON vehicle_stats_snapshot (id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_stats_snapshot_vehicle_number ON vehicle_stats_snapshot (vehicle_number)"
+    )
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS vehicle_driver_stats (
+            id SERIAL PRIMARY KEY,
+            vehicle_number VARCHAR NOT NULL,
+            driver_id INTEGER NOT NULL,
+            trips INTEGER NOT NULL DEFAULT 0,
+            revenue DOUBLE PRECISION NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_vehicle_driver_stats_vehicle_driver UNIQUE (vehicle_number, driver_id)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_vehicle_driver_stats_id ON vehicle_driver_stats (id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_vehicle_driver_stats_vehicle_number ON vehicle_driver_stats (vehicle_number)"
+    )
+
+    # The vehicle page reads these tables directly, so fill them before the app starts.
+    from sqlalchemy.orm import Session
+
+    from app.services.vehicle_snapshot_service import rebuild_vehicle_stats_snapshot
+
+    session = Session(bind=op.get_bind())
+    try:
+        rebuild_vehicle_stats_snapshot(session)
+    finally:
+        session.close()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS vehicle_driver_stats")
+    op.execute("DROP TABLE IF EXISTS vehicle_stats_snapshot")
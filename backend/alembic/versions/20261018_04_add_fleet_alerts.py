@@ -0,0 +1,52 @@
+"""add precomputed fleet alerts table
+
+Revision ID: 20261018_04
+Revises: 20261018_03
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_04"
+down_revision: Union[str, None] = "20261018_03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS fleet_alerts (
+            id SERIAL PRIMARY KEY,
+            vehicle_number VARCHAR NOT NULL,
+            alert_type VARCHAR(20) NOT NULL,
+            severity VARCHAR(10) NOT NULL,
+            message VARCHAR NOT NULL,
+            remaining_days INTEGER,
+            due_date DATE,
+            refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT uq_fleet_alerts_vehicle_type UNIQUE (vehicle_number, alert_type)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fleet_alerts_id ON fleet_alerts (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fleet_alerts_vehicle_number ON fleet_alerts (vehicle_number)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_fleet_alerts_alert_type ON fleet_alerts (alert_type)")
+
+    from sqlalchemy.orm import Session
+
+    from app.services.fleet_alert_service import rebuild_fleet_alerts
+
+    session = Session(bind=op.get_bind())
+    try:
+        rebuild_fleet_alerts(session)
+    finally:
+        session.close()
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS fleet_alerts")
@@ -0,0 +1,34 @@
+"""add indexes for the paginated trip listing
+
+Revision ID: 20261018_05
+Revises: 20261018_04
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_05"
+down_revision: Union[str, None] = "20261018_04"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trips_customer_id ON trips (customer_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trips_driver_id ON trips (driver_id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_trip_vehicles_driver_id ON trip_vehicles (driver_id)")
+    # Lets "invoice_number LIKE 'prefix%'" use an index under any collation.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_trips_invoice_number_pattern ON trips (invoice_number varchar_pattern_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_trips_invoice_number_pattern")
+    op.execute("DROP INDEX IF EXISTS ix_trip_vehicles_driver_id")
+    op.execute("DROP INDEX IF EXISTS ix_trips_driver_id")
+    op.execute("DROP INDEX IF EXISTS ix_trips_customer_id")
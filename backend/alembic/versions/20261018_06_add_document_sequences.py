@@ -0,0 +1,36 @@
+"""add document number sequences
+
+Revision ID: 20261018_06
+Revises: 20261018_05
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_06"
+down_revision: Union[str, None] = "20261018_05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS document_sequences (
+            id SERIAL PRIMARY KEY,
+            document_type VARCHAR(20) NOT NULL,
+            financial_year VARCHAR(7) NOT NULL,
+            last_value INTEGER NOT NULL DEFAULT 0,
+            CONSTRAINT uq_document_sequences_type_year UNIQUE (document_type, financial_year)
+        );
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_document_sequences_id ON document_sequences (id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS document_sequences")
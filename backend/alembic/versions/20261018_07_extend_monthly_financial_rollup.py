@@ -0,0 +1,56 @@
+"""add invoice counts and recoveries to the monthly rollup and index trip dates
+
+Revision ID: 20261018_07
+Revises: 20261018_06
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_07"
+down_revision: Union[str, None] = "20261018_06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NEW_COLUMNS = {
+    "pending_trips": "INTEGER NOT NULL DEFAULT 0",
+    "partial_trips": "INTEGER NOT NULL DEFAULT 0",
+    "unpaid_trips": "INTEGER NOT NULL DEFAULT 0",
+    "charged_toll": "DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "charged_parking": "DOUBLE PRECISION NOT NULL DEFAULT 0",
+    "discount": "DOUBLE PRECISION NOT NULL DEFAULT 0",
+}
+
+TRIP_DATE_COLUMNS = ("trip_date", "departure_datetime", "return_datetime")
+
+
+def upgrade() -> None:
+    for name, definition in NEW_COLUMNS.items():
+        op.execute(f"ALTER TABLE monthly_financial_rollup ADD COLUMN IF NOT EXISTS {name} {definition}")
+
+    # The dashboard counts upcoming and ongoing trips live, over trips that have not finished yet.
+    for column in TRIP_DATE_COLUMNS:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_trips_{column} ON trips ({column})")
+
+    # Existing months need the new columns filled in.
+    from sqlalchemy.orm import Session
+
+    from app.services.financial_rollup_service import rebuild_financial_rollup
+
+    session = Session(bind=op.get_bind())
+    try:
+        rebuild_financial_rollup(session)
+    finally:
+        session.close()
+
+
+def downgrade() -> None:
+    for column in TRIP_DATE_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_trips_{column}")
+    for name in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE monthly_financial_rollup DROP COLUMN IF EXISTS {name}")
@@ -0,0 +1,33 @@
+"""add shared data version counter for the response cache
+
+Revision ID: 20261018_08
+Revises: 20261018_07
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_08"
+down_revision: Union[str, None] = "20261018_07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        );
+        """
+    )
+    op.execute("INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS data_version")
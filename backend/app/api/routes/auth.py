@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.schemas.user import LoginRequest, LoginResponse, PasswordResetRequest, PasswordResetResponse
-from app.services.auth_service import get_current_user, get_db, login_user, reset_password
-from app.models.user import User
+from app.services.auth_service import Principal, get_current_user, get_db, login_user, reset_password
 
 router = APIRouter(
     prefix="/auth",
@@ -18,11 +17,11 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 def reset_user_password(
     payload: PasswordResetRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     reset_password(
         db=db,
-        user=current_user,
+        principal=current_user,
         current_password=payload.current_password,
         new_password=payload.new_password,
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database.session import SessionLocal
 from app.models.customer import Customer
@@ -17,6 +17,7 @@ from app.services.customer_service import (
     get_customer_with_trips,
 )
 from app.services.auth_service import require_admin, require_write_access
+from app.services.trip_service import is_compact_view
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
@@ -54,8 +55,12 @@ def edit_customer(
 
 
 @router.get("/{customer_id}/trips", response_model=CustomerWithTrips)
-def customer_trips(customer_id: int, db: Session = Depends(get_db)):
-    result = get_customer_with_trips(db, customer_id)
+def customer_trips(
+    customer_id: int,
+    view: str = Query(default="full", description="full or compact (list columns only)"),
+    db: Session = Depends(get_db),
+):
+    result = get_customer_with_trips(db, customer_id, compact=is_compact_view(view))
     if not result:
         raise HTTPException(status_code=404, detail="Customer not found")
     customer, trips = result
@@ -3,8 +3,14 @@ from sqlalchemy.orm import Session
 
 from app.database.session import SessionLocal
 from app.schemas.fuel import FuelCreate, FuelResponse
-from app.services.fuel_service import add_fuel, fuel_history_by_vehicle, get_all_fuel, get_fuel_by_id, update_fuel
-from app.models.fuel import Fuel
+from app.services.fuel_service import (
+    add_fuel,
+    delete_fuel,
+    fuel_history_by_vehicle,
+    get_all_fuel,
+    get_fuel_by_id,
+    update_fuel,
+)
 from app.services.auth_service import require_write_access
 
 router = APIRouter(prefix="/fuel", tags=["Fuel"])
@@ -32,17 +38,14 @@ def all_fuel(db: Session = Depends(get_db)):
 
 
 @router.delete("/{fuel_id}")
-def delete_fuel(
+def remove_fuel(
     fuel_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(require_write_access),
 ):
-    fuel = db.query(Fuel).filter(Fuel.id == fuel_id).first()
+    fuel = delete_fuel(db, fuel_id)
     if not fuel:
         raise HTTPException(status_code=404, detail="Fuel not found")
-
-    db.delete(fuel)
-    db.commit()
     return {"message": "Fuel deleted"}
 
 @router.get("/{fuel_id}", response_model=FuelResponse)
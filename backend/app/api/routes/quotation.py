@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from app.database.session import SessionLocal
 from app.models.quotation import Quotation
 from app.schemas.quotation import QuotationCreate, QuotationResponse, QuotationUpdate
 from app.services.auth_service import get_current_user, require_write_access
+from app.services.document_number_service import check_manual_number, is_duplicate_number, next_document_number
 
 router = APIRouter(
     prefix="/quotations",
@@ -28,13 +30,26 @@ def _ensure_quotations_table(db: Session) -> None:
     if not inspector.has_table("quotations"):
         Quotation.__table__.create(bind, checkfirst=True)
 
+def _commit_quotation_no(db: Session) -> None:
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_duplicate_number(exc, "quotation_no"):
+            raise HTTPException(status_code=400, detail="Quotation number already exists")
+        raise
+
 # ---------------- CREATE QUOTATION ----------------
 @router.post("", response_model=QuotationResponse)
 def create_quotation(quotation: QuotationCreate, db: Session = Depends(get_db)):
     _ensure_quotations_table(db)
+    check_manual_number("quotation", quotation.quotation_no)
     db_quotation = Quotation(**quotation.model_dump())
+    db_quotation.quotation_no = (db_quotation.quotation_no or "").strip() or next_document_number(
+        db, "quotation", db_quotation.quotation_date
+    )
     db.add(db_quotation)
-    db.commit()
+    _commit_quotation_no(db)
     db.refresh(db_quotation)
     return db_quotation
 
@@ -65,11 +80,12 @@ def update_quotation(
     db_quotation = db.query(Quotation).filter(Quotation.id == id, Quotation.is_deleted == False).first()
     if not db_quotation:
         raise HTTPException(status_code=404, detail="Quotation not found")
+    check_manual_number("quotation", quotation_data.quotation_no, db_quotation.quotation_no)
     
     for key, value in quotation_data.model_dump().items():
         setattr(db_quotation, key, value)
     
-    db.commit()
+    _commit_quotation_no(db)
     db.refresh(db_quotation)
     return db_quotation
 
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.database.session import SessionLocal
 from app.models.trip import Trip
-from app.schemas.trip import TripCreate, TripResponse, TripUpdate
+from app.schemas.trip import TripCreate, TripImportReport, TripListItem, TripResponse, TripUpdate
 from app.services.auth_service import require_write_access
+from app.services.trip_export_service import EXPORT_MEDIA_TYPES, export_trips
+from app.services.trip_import_service import import_trips, parse_trip_rows
 from app.services.trip_service import (
     create_trip,
     get_trips_by_vehicle,
     get_trips_by_driver,
+    is_compact_view,
+    list_trips,
+    trip_list_totals,
     update_trip,
     delete_trip
 )
@@ -31,20 +39,118 @@ def get_db():
 def add_trip(trip: TripCreate, db: Session = Depends(get_db)):
     return create_trip(db, trip)
 
+# ---------------- BULK IMPORT TRIPS ----------------
+@router.post("/bulk", response_model=TripImportReport)
+def bulk_import_trips(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_write_access),
+):
+    return import_trips(db, parse_trip_rows(file.file.read(), file.filename))
+
 # ---------------- GET ALL TRIPS ----------------
-@router.get("", response_model=list[TripResponse])
-def get_all_trips(db: Session = Depends(get_db)):
-    return db.query(Trip).order_by(Trip.created_at.desc()).all()
+@router.get("", response_model=list[TripResponse] | list[TripListItem])
+def get_all_trips(
+    response: Response,
+    view: str = Query(default="full", description="full or compact (list columns only)"),
+    limit: int | None = Query(default=None, ge=1, le=500, description="Page size; every matching trip when omitted"),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor value from the previous page"),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = Query(default=None, description="settled, partial or outstanding"),
+    db: Session = Depends(get_db),
+):
+    trips, next_cursor, total = list_trips(
+        db,
+        limit=limit,
+        cursor=cursor,
+        start_date=start_date,
+        end_date=end_date,
+        customer_id=customer_id,
+        vehicle_number=vehicle_number,
+        driver_id=driver_id,
+        invoice_prefix=invoice_prefix,
+        payment_status=payment_status,
+        compact=is_compact_view(view),
+    )
+    response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return trips
+
+# ---------------- TRIP TOTALS ----------------
+@router.get("/totals")
+def get_trip_totals(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = Query(default=None, description="settled, partial or outstanding"),
+    db: Session = Depends(get_db),
+):
+    return trip_list_totals(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        customer_id=customer_id,
+        vehicle_number=vehicle_number,
+        driver_id=driver_id,
+        invoice_prefix=invoice_prefix,
+        payment_status=payment_status,
+    )
+
+# ---------------- EXPORT TRIPS ----------------
+@router.get("/export")
+def export_all_trips(
+    format: str = Query(default="ndjson", description="ndjson or csv"),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = Query(default=None, description="settled, partial or outstanding"),
+):
+    chunks = export_trips(
+        SessionLocal,
+        format,
+        start_date=start_date,
+        end_date=end_date,
+        customer_id=customer_id,
+        vehicle_number=vehicle_number,
+        driver_id=driver_id,
+        invoice_prefix=invoice_prefix,
+        payment_status=payment_status,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="trips.{format}"'},
+    )
 
 # ---------------- GET TRIPS BY VEHICLE ----------------
-@router.get("/vehicle/{vehicle_number}", response_model=list[TripResponse])
-def trips_by_vehicle(vehicle_number: str, db: Session = Depends(get_db)):
-    return get_trips_by_vehicle(db, vehicle_number)
+@router.get("/vehicle/{vehicle_number}", response_model=list[TripResponse] | list[TripListItem])
+def trips_by_vehicle(
+    vehicle_number: str,
+    view: str = Query(default="full", description="full or compact (list columns only)"),
+    db: Session = Depends(get_db),
+):
+    return get_trips_by_vehicle(db, vehicle_number, compact=is_compact_view(view))
 
 # ---------------- GET TRIPS BY DRIVER ----------------
-@router.get("/driver/{driver_id}", response_model=list[TripResponse])
-def trips_by_driver(driver_id: int, db: Session = Depends(get_db)):
-    return get_trips_by_driver(db, driver_id)
+@router.get("/driver/{driver_id}", response_model=list[TripResponse] | list[TripListItem])
+def trips_by_driver(
+    driver_id: int,
+    view: str = Query(default="full", description="full or compact (list columns only)"),
+    db: Session = Depends(get_db),
+):
+    return get_trips_by_driver(db, driver_id, compact=is_compact_view(view))
 
 # ---------------- GET SINGLE TRIP ----------------
 @router.get("/{trip_id}", response_model=TripResponse)
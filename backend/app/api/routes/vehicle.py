@@ -1,6 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
 
 from app.database.session import SessionLocal
 from app.models.vehicle import Vehicle
@@ -13,7 +12,7 @@ from app.services.vehicle_service import (
     normalize_vehicle_number
 )
 
-from app.services.vehicle_stats_service import vehicle_summary
+from app.services.vehicle_stats_service import fleet_summary, vehicle_summary
 from app.services.auth_service import require_write_access
 
 router = APIRouter(
@@ -43,6 +42,18 @@ def list_vehicles(db: Session = Depends(get_db)):
     return get_all_vehicles(db)
 
 
+# Declared before "/{vehicle_number}" so "summary" is not read as a vehicle number.
+@router.get("/summary")
+def get_fleet_summary(
+    vehicle_numbers: str | None = Query(default=None, description="Comma-separated; all vehicles when omitted"),
+    db: Session = Depends(get_db),
+):
+    numbers = None
+    if vehicle_numbers:
+        numbers = [normalize_vehicle_number(value) for value in vehicle_numbers.split(",") if value.strip()]
+    return fleet_summary(db, numbers)
+
+
 @router.get("/{vehicle_number}", response_model=VehicleResponse)
 def vehicle_details(vehicle_number: str, db: Session = Depends(get_db)):
     vehicle = get_vehicle_by_number(db, normalize_vehicle_number(vehicle_number))
@@ -53,8 +64,14 @@ def vehicle_details(vehicle_number: str, db: Session = Depends(get_db)):
 
 # ✅ FIXED: trailing slash added
 @router.get("/{vehicle_number}/summary")
-def get_vehicle_summary(vehicle_number: str, db: Session = Depends(get_db)):
-    return vehicle_summary(db, normalize_vehicle_number(vehicle_number))
+def get_vehicle_summary(
+    vehicle_number: str,
+    include: str | None = Query(default=None, description="Comma-separated sections; all when omitted"),
+    limit: int | None = Query(default=None, ge=1, le=200, description="Page size for history lists"),
+    cursor: str | None = Query(default=None, description="next_cursors value from the previous page"),
+    db: Session = Depends(get_db),
+):
+    return vehicle_summary(db, normalize_vehicle_number(vehicle_number), include=include, limit=limit, cursor=cursor)
 
 
 @router.delete("/{vehicle_id}")
@@ -87,7 +104,7 @@ def update_vehicle(
     if new_number != normalized_current:
         # Check if new number already exists
         existing = db.query(Vehicle).filter(
-            func.lower(Vehicle.vehicle_number) == func.lower(new_number)
+            Vehicle.vehicle_number == new_number
         ).first()
         if existing:
             raise HTTPException(status_code=400, detail="New vehicle number already exists")
@@ -100,6 +117,8 @@ def update_vehicle(
         from app.models.vehicle_insurance import VehicleInsurance
         from app.models.vehicle_tax import VehicleTax
         from app.models.oil_bill import OilBillEntry
+        from app.models.vehicle_stats_snapshot import VehicleDriverStats, VehicleStatsSnapshot
+        from app.models.fleet_alert import FleetAlert
 
         db.query(Trip).filter(Trip.vehicle_number == normalized_current).update({"vehicle_number": new_number})
         db.query(Fuel).filter(Fuel.vehicle_number == normalized_current).update({"vehicle_number": new_number})
@@ -108,6 +127,9 @@ def update_vehicle(
         db.query(VehicleInsurance).filter(VehicleInsurance.vehicle_number == normalized_current).update({"vehicle_number": new_number})
         db.query(VehicleTax).filter(VehicleTax.vehicle_number == normalized_current).update({"vehicle_number": new_number})
         db.query(OilBillEntry).filter(OilBillEntry.vehicle_number == normalized_current).update({"vehicle_number": new_number})
+        db.query(VehicleStatsSnapshot).filter(VehicleStatsSnapshot.vehicle_number == normalized_current).update({"vehicle_number": new_number})
+        db.query(VehicleDriverStats).filter(VehicleDriverStats.vehicle_number == normalized_current).update({"vehicle_number": new_number})
+        db.query(FleetAlert).filter(FleetAlert.vehicle_number == normalized_current).update({"vehicle_number": new_number})
 
         vehicle.vehicle_number = new_number
 
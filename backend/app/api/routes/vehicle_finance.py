@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.database.session import SessionLocal
 from app.schemas.vehicle_finance import (
+    EMIInstallmentPage,
     EMIPaymentCreate,
+    EMIPlanBatchCreate,
     EMIPlanCreate,
     EMIPlanResponse,
     FinanceDashboardSummary,
@@ -15,10 +19,12 @@ from app.schemas.vehicle_finance import (
 )
 from app.services.auth_service import require_write_access
 from app.services.vehicle_finance_service import (
-    get_finance_dashboard_summary,
+    get_cached_finance_dashboard_summary,
     get_vehicle_finance_summary,
+    list_emi_installments,
     pay_emi_installment,
     upsert_vehicle_emi_plan,
+    upsert_vehicle_emi_plans,
     upsert_vehicle_insurance,
     upsert_vehicle_tax,
 )
@@ -49,6 +55,27 @@ def save_vehicle_emi(
     return upsert_vehicle_emi_plan(db, vehicle_number, payload)
 
 
+@router.post("/emi-plans/batch", response_model=list[EMIPlanResponse])
+def save_vehicle_emi_batch(
+    payload: EMIPlanBatchCreate,
+    db: Session = Depends(get_db),
+    _current_user=Depends(require_write_access),
+):
+    return upsert_vehicle_emi_plans(db, payload.plans)
+
+
+@router.get("/emi-plans/{plan_id}/installments", response_model=EMIInstallmentPage)
+def emi_plan_installments(
+    plan_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    limit: int | None = Query(None, ge=1, le=600),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    return list_emi_installments(db, plan_id, start_date, end_date, limit, cursor)
+
+
 @router.post("/emi-installments/{installment_id}/pay")
 def pay_installment(
     installment_id: int,
@@ -81,4 +108,4 @@ def save_vehicle_tax(
 
 @router.get("/dashboard-summary", response_model=FinanceDashboardSummary)
 def finance_dashboard_summary(db: Session = Depends(get_db)):
-    return get_finance_dashboard_summary(db)
+    return get_cached_finance_dashboard_summary(db)
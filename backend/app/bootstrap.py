@@ -0,0 +1,151 @@
+"""
+Once-per-deploy database bootstrap and per-worker warm-up.
+
+Run ``python -m app.bootstrap`` after ``alembic upgrade head`` and set
+``BOOTSTRAP_ON_STARTUP=0`` for the API. Without that flag the lifespan runs
+``run_bootstrap`` too, so a deploy without the step still gets seeded; on
+Postgres an advisory lock lets one worker do the work while the others wait
+for it and skip. Every step checks before it writes, so repeated runs only
+read.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, configure_mappers
+
+import app.models  # noqa: F401
+from app.database.locks import advisory_lock
+from app.database.session import SessionLocal, engine as default_engine
+from app.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_lock.
+BOOTSTRAP_LOCK_ID = 724_310_001
+BOOTSTRAP_ON_STARTUP = os.getenv("BOOTSTRAP_ON_STARTUP", "1").lower() not in {"0", "false", "no"}
+
+DEFAULT_USERS = (
+    ("Nathkrupa_1", "Nathkrupa_1", "admin"),
+    ("Nathkrupa_2", "Nathkrupa_2", "admin"),
+    ("Nathkrupa_3", "Nathkrupa_3", "limited"),
+)
+
+_DRIVER_COLUMNS = (
+    ("joining_date", "ALTER TABLE drivers ADD COLUMN IF NOT EXISTS joining_date DATE"),
+    ("monthly_salary", "ALTER TABLE drivers ADD COLUMN IF NOT EXISTS monthly_salary DOUBLE PRECISION"),
+    ("is_active", "ALTER TABLE drivers ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE"),
+)
+
+
+def create_default_users(db: Session) -> int:
+    """Add the default users that do not exist yet. Returns how many were added."""
+    usernames = [username for username, _, _ in DEFAULT_USERS]
+    existing = set(db.scalars(select(User.username).where(User.username.in_(usernames))))
+    added = 0
+    for username, password, role in DEFAULT_USERS:
+        if username in existing:
+            continue
+        db.add(User(username=username, password_hash=User.hash_password(password), role=role))
+        try:
+            db.commit()
+            added += 1
+        except IntegrityError:
+            db.rollback()
+    return added
+
+
+def ensure_driver_schema(db: Session) -> int:
+    """
+    Add driver columns that predate the migrations, if missing. Returns how many were added.
+
+    The columns are looked up first because ALTER TABLE locks ``drivers`` even
+    when IF NOT EXISTS turns it into a no-op.
+    """
+    inspector = inspect(db.connection())
+    if not inspector.has_table("drivers"):
+        return 0
+    columns = {column["name"] for column in inspector.get_columns("drivers")}
+    missing = [statement for name, statement in _DRIVER_COLUMNS if name not in columns]
+    if not missing:
+        return 0
+    for statement in missing:
+        db.execute(text(statement))
+    if "is_active" not in columns:
+        db.execute(text("UPDATE drivers SET is_active = TRUE WHERE is_active IS NULL"))
+    db.commit()
+    return len(missing)
+
+
+def _bootstrap(bind: Engine) -> None:
+    db = Session(bind=bind)
+    try:
+        users = create_default_users(db)
+        columns = ensure_driver_schema(db)
+        logger.info("Bootstrap added %d default users and %d driver columns", users, columns)
+    except OperationalError:
+        # If migrations are not applied yet, skip bootstrap.
+        db.rollback()
+        logger.warning("Bootstrap skipped; run the migrations first", exc_info=True)
+    finally:
+        db.close()
+
+
+def run_bootstrap(bind: Engine | None = None) -> bool:
+    """
+    Seed default users and patch the drivers table. Returns False when another process did it.
+
+    On Postgres the work runs under an advisory lock: the first caller runs
+    it, concurrent callers block until it finishes and then return.
+    """
+    bind = bind or default_engine
+    try:
+        with advisory_lock(bind, BOOTSTRAP_LOCK_ID, wait=False) as acquired:
+            if acquired:
+                _bootstrap(bind)
+                return True
+        # Another worker is bootstrapping; wait for it instead of repeating the work.
+        with advisory_lock(bind, BOOTSTRAP_LOCK_ID):
+            return False
+    except OperationalError:
+        logger.warning("Bootstrap skipped; database unavailable", exc_info=True)
+        return False
+
+
+def warm_up(api: FastAPI) -> None:
+    """
+    Pay first-request costs before the worker takes traffic.
+
+    Configures the ORM mappers, runs the statements behind authentication and
+    the trip list once, to fill the engine's compiled-statement cache, and
+    builds the OpenAPI schema, which walks every route's Pydantic models.
+    """
+    # Imported here: the trip service pulls in most of the service layer.
+    from app.services.trip_service import list_trips
+
+    started = time.perf_counter()
+    configure_mappers()
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == "").first()
+        list_trips(db, limit=1)
+    except OperationalError:
+        logger.warning("Warm-up queries failed; continuing", exc_info=True)
+    finally:
+        db.rollback()
+        db.close()
+    api.openapi()
+    logger.info("Warm-up finished in %.3fs", time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_bootstrap()
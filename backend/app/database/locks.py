@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def advisory_lock(bind: Engine, key: int, wait: bool = True) -> Iterator[bool]:
+    """
+    Hold the Postgres session-level advisory lock ``key`` for the block.
+
+    Yields whether the lock was taken: with ``wait=False`` a lock held by
+    another process yields False straight away instead of blocking. Other
+    databases have no advisory locks and always yield True.
+    """
+    if bind.dialect.name != "postgresql":
+        yield True
+        return
+
+    with bind.connect() as connection:
+        if wait:
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            acquired = bool(connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}).scalar())
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                connection.commit()
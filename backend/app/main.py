@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -21,13 +23,25 @@ from app.api.routes.vehicle_finance import router as vehicle_finance_router
 from app.api.routes.vehicle_notes import router as vehicle_notes_router
 from app.api.routes.vendor import router as vendor_router
 from app.api.routes.vendor_payment_routes import router as vendor_payment_router
-from app.database.session import engine
-from app.models.user import User
+from app.bootstrap import BOOTSTRAP_ON_STARTUP, run_bootstrap, warm_up
 from app.services.auth_service import get_current_user
+from app.services.fleet_alert_service import start_fleet_alert_job
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if BOOTSTRAP_ON_STARTUP:
+        run_bootstrap()
+    warm_up(_app)
+    stop_fleet_alerts = start_fleet_alert_job()
+    yield
+    stop_fleet_alerts.set()
+
 
 app = FastAPI(
     title="Tour & Travel Management API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -41,90 +55,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
-from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError, OperationalError
-from sqlalchemy.orm import Session
-
-
-def create_default_users() -> None:
-    db = Session(bind=engine)
-    try:
-        default_users = [
-            ("Nathkrupa_1", "Nathkrupa_1", "admin"),
-            ("Nathkrupa_2", "Nathkrupa_2", "admin"),
-            ("Nathkrupa_3", "Nathkrupa_3", "limited"),
-        ]
-
-        for username, password, role in default_users:
-            exists = db.query(User).filter(User.username == username).first()
-            if exists:
-                continue
-            db.add(
-                User(
-                    username=username,
-                    password_hash=User.hash_password(password),
-                    role=role,
-                )
-            )
-            try:
-                db.commit()
-            except IntegrityError:
-                db.rollback()
-    except OperationalError:
-        # If migrations are not applied yet, skip bootstrap user creation.
-        db.rollback()
-    finally:
-        db.close()
-
-
-def ensure_driver_schema() -> None:
-    db = Session(bind=engine)
-    try:
-        db.execute(
-            text(
-                """
-                ALTER TABLE drivers
-                ADD COLUMN IF NOT EXISTS joining_date DATE;
-                """
-            )
-        )
-        db.execute(
-            text(
-                """
-                ALTER TABLE drivers
-                ADD COLUMN IF NOT EXISTS monthly_salary DOUBLE PRECISION;
-                """
-            )
-        )
-        db.execute(
-            text(
-                """
-                ALTER TABLE drivers
-                ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE;
-                """
-            )
-        )
-        db.execute(
-            text(
-                """
-                UPDATE drivers
-                SET is_active = TRUE
-                WHERE is_active IS NULL;
-                """
-            )
-        )
-        db.commit()
-    except OperationalError:
-        db.rollback()
-    finally:
-        db.close()
-
-
-create_default_users()
-ensure_driver_schema()
-
 auth_dependency = [Depends(get_current_user)]
 
 app.include_router(auth_router, prefix="/api")
@@ -1,10 +1,14 @@
 from app.models.customer import Customer  # noqa: F401
 from app.models.dashboard_note import DashboardNote  # noqa: F401
+from app.models.data_version import DataVersion  # noqa: F401
+from app.models.document_sequence import DocumentSequence  # noqa: F401
 from app.models.driver import Driver  # noqa: F401
 from app.models.driver_expense import DriverExpense  # noqa: F401
 from app.models.driver_salary import DriverSalary  # noqa: F401
+from app.models.fleet_alert import FleetAlert  # noqa: F401
 from app.models.fuel import Fuel  # noqa: F401
 from app.models.mechanic import MechanicEntry  # noqa: F401
+from app.models.monthly_financial_rollup import MonthlyFinancialRollup  # noqa: F401
 from app.models.maintenance import Maintenance  # noqa: F401
 from app.models.oil_bill import OilBill, OilBillEntry  # noqa: F401
 from app.models.payment import Payment  # noqa: F401
@@ -19,6 +23,7 @@ from app.models.vehicle import Vehicle  # noqa: F401
 from app.models.vehicle_emi import VehicleEMIInstallment, VehicleEMIPlan  # noqa: F401
 from app.models.vehicle_insurance import VehicleInsurance  # noqa: F401
 from app.models.vehicle_note import VehicleNote  # noqa: F401
+from app.models.vehicle_stats_snapshot import VehicleDriverStats, VehicleStatsSnapshot  # noqa: F401
 from app.models.vehicle_tax import VehicleTax  # noqa: F401
 from app.models.vendor import Vendor  # noqa: F401
 from app.models.vendor_payment import VendorPayment  # noqa: F401
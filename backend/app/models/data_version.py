@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.database.base import Base
+
+
+class DataVersion(Base):
+    """Single-row counter bumped by every committed write; shared by all worker processes."""
+
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
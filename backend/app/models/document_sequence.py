@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, UniqueConstraint
+
+from app.database.base import Base
+
+
+class DocumentSequence(Base):
+    """Last invoice/quotation number handed out, one counter row per document type and financial year."""
+
+    __tablename__ = "document_sequences"
+    __table_args__ = (UniqueConstraint("document_type", "financial_year", name="uq_document_sequences_type_year"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_type = Column(String(20), nullable=False)  # invoice, quotation
+    financial_year = Column(String(7), nullable=False)  # 2026-27
+    last_value = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database.base import Base
+
+
+class FleetAlert(Base):
+    """Precomputed insurance, tax, EMI and service alerts, one row per vehicle and alert type."""
+
+    __tablename__ = "fleet_alerts"
+    __table_args__ = (UniqueConstraint("vehicle_number", "alert_type", name="uq_fleet_alerts_vehicle_type"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_number = Column(String, nullable=False, index=True)
+    alert_type = Column(String(20), nullable=False, index=True)  # emi, insurance, tax, service
+    severity = Column(String(10), nullable=False)  # warning, danger
+    message = Column(String, nullable=False)
+    remaining_days = Column(Integer, nullable=True)
+    due_date = Column(Date, nullable=True)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -7,7 +7,7 @@ class Fuel(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False)
+    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False, index=True)
     fuel_type = Column(String, nullable=False)  # diesel / petrol
     quantity = Column(Float, nullable=False)    # litres
     rate_per_litre = Column(Float, nullable=False)
@@ -13,7 +13,7 @@ class Maintenance(Base):
     __tablename__ = "maintenance"
 
     id = Column(Integer, primary_key=True)
-    vehicle_number = Column(String, nullable=False)
+    vehicle_number = Column(String, nullable=False, index=True)
     maintenance_type = Column(Enum(MaintenanceType), nullable=False)
     description = Column(String)
     amount = Column(Float, nullable=False)
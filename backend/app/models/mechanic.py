@@ -7,7 +7,7 @@ class MechanicEntry(Base):
     __tablename__ = "mechanic_entries"
 
     id = Column(Integer, primary_key=True, index=True)
-    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False)
+    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False, index=True)
     work_description = Column(String, nullable=False)
     cost = Column(Float, nullable=False)
     vendor = Column(String)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy.sql import func
+
+from app.database.base import Base
+
+
+class MonthlyFinancialRollup(Base):
+    __tablename__ = "monthly_financial_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False, unique=True, index=True)  # YYYY-MM
+
+    trip_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+    received = Column(Float, nullable=False, default=0)
+    pending = Column(Float, nullable=False, default=0)
+    pending_trips = Column(Integer, nullable=False, default=0)
+    partial_trips = Column(Integer, nullable=False, default=0)
+    unpaid_trips = Column(Integer, nullable=False, default=0)
+    charged_toll = Column(Float, nullable=False, default=0)
+    charged_parking = Column(Float, nullable=False, default=0)
+    discount = Column(Float, nullable=False, default=0)
+
+    trip_fuel = Column(Float, nullable=False, default=0)
+    direct_fuel = Column(Float, nullable=False, default=0)
+    bhatta = Column(Float, nullable=False, default=0)
+    toll = Column(Float, nullable=False, default=0)
+    parking = Column(Float, nullable=False, default=0)
+    other_expenses = Column(Float, nullable=False, default=0)
+    maintenance = Column(Float, nullable=False, default=0)
+    spare = Column(Float, nullable=False, default=0)
+    oil = Column(Float, nullable=False, default=0)
+    mechanic = Column(Float, nullable=False, default=0)
+    vendor_payments = Column(Float, nullable=False, default=0)
+    salary = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -11,7 +11,8 @@ class SparePart(Base):
     vehicle_number = Column(
         String,
         ForeignKey("vehicles.vehicle_number"),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     part_name = Column(String, nullable=False)
@@ -8,17 +8,17 @@ class Trip(Base):
 
     id = Column(Integer, primary_key=True, index=True)
 
-    trip_date = Column(Date, nullable=False)
+    trip_date = Column(Date, nullable=False, index=True)
     booking_id = Column(String(100), nullable=True)
-    departure_datetime = Column(DateTime(timezone=True))
-    return_datetime = Column(DateTime(timezone=True))
+    departure_datetime = Column(DateTime(timezone=True), index=True)
+    return_datetime = Column(DateTime(timezone=True), index=True)
     from_location = Column(String, nullable=False)
     to_location = Column(String, nullable=False)
     route_details = Column(Text)
 
-    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"))
-    driver_id = Column(Integer, ForeignKey("drivers.id"))
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), index=True)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
 
     start_km = Column(Float, default=0)
     end_km = Column(Float, default=0)
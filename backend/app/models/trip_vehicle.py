@@ -9,8 +9,8 @@ class TripVehicle(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
-    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False)
-    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=False)
+    vehicle_number = Column(String, ForeignKey("vehicles.vehicle_number"), nullable=False, index=True)
+    driver_id = Column(Integer, ForeignKey("drivers.id"), nullable=False, index=True)
     start_km = Column(Float, default=0)
     end_km = Column(Float, default=0)
     distance_km = Column(Integer, nullable=True)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database.base import Base
+
+
+class VehicleStatsSnapshot(Base):
+    """Per-vehicle, per-month running totals behind the vehicle summary page."""
+
+    __tablename__ = "vehicle_stats_snapshot"
+    __table_args__ = (UniqueConstraint("vehicle_number", "month", name="uq_vehicle_stats_snapshot_vehicle_month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_number = Column(String, nullable=False, index=True)
+    month = Column(String(7), nullable=False)  # YYYY-MM
+
+    trip_count = Column(Integer, nullable=False, default=0)
+    trip_income = Column(Float, nullable=False, default=0)  # full billed total of trips using the vehicle
+    trip_revenue = Column(Float, nullable=False, default=0)  # the vehicle's allocated share
+    total_km = Column(Float, nullable=False, default=0)
+    trip_fuel_cost = Column(Float, nullable=False, default=0)
+
+    direct_fuel_cost = Column(Float, nullable=False, default=0)
+    direct_fuel_litres = Column(Float, nullable=False, default=0)
+    spare_cost = Column(Float, nullable=False, default=0)
+    oil_cost = Column(Float, nullable=False, default=0)
+    oil_entries = Column(Integer, nullable=False, default=0)
+    mechanic_cost = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class VehicleDriverStats(Base):
+    """Trips driven and allocated revenue per vehicle and driver."""
+
+    __tablename__ = "vehicle_driver_stats"
+    __table_args__ = (UniqueConstraint("vehicle_number", "driver_id", name="uq_vehicle_driver_stats_vehicle_driver"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    vehicle_number = Column(String, nullable=False, index=True)
+    driver_id = Column(Integer, nullable=False)
+    trips = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
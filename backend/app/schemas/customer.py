@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List
-from app.schemas.trip import TripResponse
+from typing import List, Union
+from app.schemas.trip import TripListItem, TripResponse
 
 class CustomerCreate(BaseModel):
     name: str
@@ -34,7 +34,7 @@ class CustomerResponse(BaseModel):
 
 class CustomerWithTrips(BaseModel):
     customer: CustomerResponse
-    trips: List[TripResponse]
+    trips: Union[List[TripResponse], List[TripListItem]]
 
     class Config:
         orm_mode = True
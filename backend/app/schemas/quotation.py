@@ -22,7 +22,7 @@ class QuotationBase(BaseModel):
     amount_in_words: Optional[str] = None
 
 class QuotationCreate(QuotationBase):
-    pass
+    quotation_no: Optional[str] = None  # Allocated by the server when blank
 
 class QuotationUpdate(QuotationBase):
     pass
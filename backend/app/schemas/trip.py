@@ -156,7 +156,7 @@ class TripCreate(BaseModel):
     vendor: str | None = None
     
     # INVOICE NUMBER
-    invoice_number: str  # Required field
+    invoice_number: str | None = None  # Allocated by the server when blank
 
     # MULTI-ENTRY SUPPORT
     pricing_items: List[TripPricingItemCreate] = []
@@ -275,3 +275,46 @@ class TripResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# ======================
+# LIST ROW
+# ======================
+class TripListItem(BaseModel):
+    """The columns a trip list row shows; fetch the trip itself for the full detail."""
+    id: int
+    invoice_number: str | None
+    booking_id: str | None
+    trip_date: date
+    departure_datetime: datetime | None
+    from_location: str
+    to_location: str
+    vehicle_number: str | None
+    driver_id: int | None
+    customer_id: int
+    number_of_vehicles: int | None
+    distance_km: int | None
+    total_charged: float | None
+    amount_received: float | None
+    pending_amount: float | None
+    party_fuel_credit: float = 0
+    created_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+# ======================
+# BULK IMPORT
+# ======================
+class TripImportError(BaseModel):
+    row: int  # 1-based data row in the uploaded file
+    invoice_number: str | None = None
+    errors: List[str]
+
+
+class TripImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[TripImportError] = []
@@ -26,6 +26,14 @@ class EMIPlanCreate(BaseModel):
         return _round_2(value) if value is not None else value
 
 
+class EMIPlanBatchItem(EMIPlanCreate):
+    vehicle_number: str
+
+
+class EMIPlanBatchCreate(BaseModel):
+    plans: list[EMIPlanBatchItem] = Field(..., min_length=1, max_length=500)
+
+
 class EMIInstallmentResponse(BaseModel):
     id: int
     installment_number: int
@@ -43,6 +51,12 @@ class EMIInstallmentResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class EMIInstallmentPage(BaseModel):
+    plan_id: int
+    items: list[EMIInstallmentResponse]
+    next_cursor: str | None = None
+
+
 class EMIPlanResponse(BaseModel):
     id: int
     vehicle_number: str
@@ -58,7 +72,7 @@ class EMIPlanResponse(BaseModel):
     pending_installments: int
     overdue_installments: int
     total_remaining_balance: float
-    installments: list[EMIInstallmentResponse]
+    next_due_installment: EMIInstallmentResponse | None = None
 
     model_config = {"from_attributes": True}
 
@@ -1,10 +1,14 @@
 import os
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from jose.exceptions import ExpiredSignatureError
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.database.session import SessionLocal
@@ -21,6 +25,7 @@ if not SECRET_KEY:
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
@@ -33,6 +38,87 @@ def get_db():
         db.close()
 
 
+# ==========================
+# Principal Cache
+# ==========================
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it; holds no session state, so it can be shared."""
+
+    id: int
+    username: str
+    role: str | None
+
+
+class PrincipalCache:
+    """
+    Resolved principals by token subject, kept for ``ttl_seconds``.
+
+    Any committed write to ``users`` clears the cache (see the session events
+    below). The TTL bounds how long another worker process keeps serving a
+    principal whose role or account changed.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: dict[str, tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, username: str) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, principal: Principal, generation: int) -> None:
+        """Store a principal loaded at ``generation``; skipped if the cache was cleared since."""
+        with self._lock:
+            if generation == self._generation and self.ttl_seconds > 0:
+                self._entries[principal.username] = (time.monotonic() + self.ttl_seconds, principal)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+principal_cache = PrincipalCache(ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS)
+
+_USERS_CHANGED_KEY = "principal_cache_users_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_users(session, _flush_context):
+    if any(isinstance(obj, User) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_USERS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_user_changes(orm_execute_state):
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and any(
+        mapper.class_ is User for mapper in orm_execute_state.all_mappers
+    ):
+        orm_execute_state.session.info[_USERS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_principals_on_commit(session):
+    if session.info.pop(_USERS_CHANGED_KEY, False):
+        principal_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_changes_on_rollback(session):
+    session.info.pop(_USERS_CHANGED_KEY, None)
+
+
 # ==========================
 # JWT Helpers
 # ==========================
@@ -127,13 +213,17 @@ def create_user(
 
 def reset_password(
     db: Session,
-    user: User,
+    principal: Principal,
     current_password: str,
     new_password: str,
 ) -> None:
     """
     Reset current user's password after validating current password.
     """
+    user = db.query(User).filter(User.id == principal.id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
     if not user.verify_password(current_password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
 
@@ -148,24 +238,33 @@ def reset_password(
     db.commit()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+def _load_principal(username: str) -> Principal:
+    generation = principal_cache.generation
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        principal = Principal(id=user.id, username=user.username, role=user.role)
+    finally:
+        db.close()
+    principal_cache.put(principal, generation)
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Resolve the bearer token's user, from the principal cache when possible."""
     username = verify_token(token)
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    return user
+    return principal_cache.get(username) or _load_principal(username)
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if (current_user.role or "").lower() != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
 
-def require_write_access(current_user: User = Depends(get_current_user)) -> User:
+def require_write_access(current_user: Principal = Depends(get_current_user)) -> Principal:
     role = (current_user.role or "").lower()
     if role == "limited":
         raise HTTPException(status_code=403, detail="Limited access: edit/delete not allowed")
@@ -3,6 +3,7 @@ from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from app.models.customer import Customer
 from app.models.trip import Trip
+from app.services.trip_service import query_trips
 
 def create_customer(db: Session, name: str, phone: str | None = None, email: str | None = None, address: str | None = None):
     normalized_name = name.strip() if name else ""
@@ -46,14 +47,8 @@ def update_customer(db: Session, customer_id: int, name: str, phone: str | None
     return customer
 
 
-def get_customer_with_trips(db: Session, customer_id: int):
+def get_customer_with_trips(db: Session, customer_id: int, compact: bool = False):
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
         return None
-    trips = (
-        db.query(Trip)
-        .filter(Trip.customer_id == customer_id)
-        .order_by(Trip.trip_date.desc())
-        .all()
-    )
-    return customer, trips
+    return customer, query_trips(db, Trip.customer_id == customer_id, compact=compact)
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, datetime
+
+from sqlalchemy import and_, case, func, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.trip import Trip
+from app.models.trip_pricing_item import TripPricingItem
+from app.models.trip_vehicle import TripVehicle
+from app.models.trip_vehicle_expense import TripVehicleExpense
+from app.services.expense_service import expense_totals, month_bucket
+
+
+MAX_TREND_MONTHS = 60
+
+# Dashboard cost key for each expense_service category.
+DASHBOARD_EXPENSE_CATEGORIES = {
+    "direct_fuel": "direct_fuel_cost",
+    "maintenance": "maintenance_cost",
+    "spare": "spare_cost",
+    "oil": "oil_cost",
+    "mechanic": "mechanic_cost",
+    "vendor_payment": "vendor_payment_cost",
+    "driver_salary": "driver_salary_cost",
+}
+
+
+def _round_2(value: float | None) -> float:
+    return round(float(value or 0), 2)
+
+
+def trip_effective_date():
+    """Departure date when known, otherwise the booked trip date."""
+    return func.coalesce(func.date(Trip.departure_datetime), Trip.trip_date)
+
+
+def trip_date_criteria(start_date: date | None, end_date: date | None) -> list:
+    if start_date and end_date:
+        return [trip_effective_date().between(start_date, end_date)]
+    return []
+
+
+def trip_status_expression(now: datetime, today: date):
+    """CASE expression classifying a trip as ongoing, upcoming or completed."""
+    has_window = and_(Trip.departure_datetime.isnot(None), Trip.return_datetime.isnot(None))
+    return case(
+        (and_(has_window, Trip.departure_datetime <= now, Trip.return_datetime >= now), "ongoing"),
+        (and_(has_window, Trip.departure_datetime > now), "upcoming"),
+        (has_window, "completed"),
+        (trip_effective_date() > today, "upcoming"),
+        else_="completed",
+    )
+
+
+def party_fuel_credit_subquery(criteria: list):
+    """Per-trip vendor deductions plus party fuel expenses, mirroring Trip.get_party_fuel_credit."""
+    trip_ids = select(Trip.id).where(*criteria)
+    deductions = select(
+        TripVehicle.trip_id.label("trip_id"),
+        func.coalesce(TripVehicle.vendor_deduction_amount, 0).label("amount"),
+    ).where(TripVehicle.trip_id.in_(trip_ids))
+    expenses = (
+        select(
+            TripVehicle.trip_id.label("trip_id"),
+            func.coalesce(TripVehicleExpense.amount, 0).label("amount"),
+        )
+        .join(TripVehicleExpense, TripVehicleExpense.trip_vehicle_id == TripVehicle.id)
+        .where(TripVehicle.trip_id.in_(trip_ids))
+    )
+    credits = union_all(deductions, expenses).subquery()
+    return (
+        select(credits.c.trip_id, func.sum(credits.c.amount).label("party_fuel_credit"))
+        .group_by(credits.c.trip_id)
+        .subquery()
+    )
+
+
+def _pricing_item_amount():
+    quantity = case((func.coalesce(TripPricingItem.quantity, 0) == 0, 1), else_=TripPricingItem.quantity)
+    return case(
+        (func.coalesce(TripPricingItem.amount, 0) != 0, TripPricingItem.amount),
+        else_=quantity * func.coalesce(TripPricingItem.rate, 0),
+    )
+
+
+def _charge_category():
+    description = func.lower(func.coalesce(TripPricingItem.description, ""))
+    return case(
+        (description.like("%night%"), "night_charges"),
+        (description.like("%wait%"), "waiting_charges"),
+        (or_(description.like("%add%"), description.like("%extra%")), "additional_charges"),
+        else_="other_additional_charges",
+    )
+
+
+def trip_financial_totals(db: Session, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """
+    Revenue, collection, trip status and trip-level cost totals for trips in the window.
+
+    Everything is summed in the database; only the scalar totals are returned.
+    """
+    criteria = trip_date_criteria(start_date, end_date)
+    credits = party_fuel_credit_subquery(criteria)
+
+    charged = func.coalesce(Trip.total_charged, 0)
+    received = func.coalesce(Trip.amount_received, 0) + func.coalesce(credits.c.party_fuel_credit, 0)
+    outstanding = charged - received
+    status = trip_status_expression(datetime.now().astimezone(), date.today())
+
+    trip_row = (
+        db.execute(
+            select(
+                func.count(Trip.id).label("total_trips"),
+                func.sum(case((status == "completed", 1), else_=0)).label("completed_trips"),
+                func.sum(case((status == "upcoming", 1), else_=0)).label("upcoming_trips"),
+                func.sum(case((status == "ongoing", 1), else_=0)).label("ongoing_trips"),
+                func.sum(charged).label("invoice_revenue"),
+                func.sum(received).label("paid_amount"),
+                func.sum(case((outstanding > 0, outstanding), else_=0)).label("pending_amount"),
+                func.sum(case((outstanding > 0, 1), else_=0)).label("pending_customer_payments"),
+                func.sum(case((and_(outstanding > 0, received <= 0), 1), else_=0)).label("unpaid_invoices"),
+                func.sum(case((and_(outstanding > 0, received > 0), 1), else_=0)).label("partial_payments"),
+                func.sum(func.coalesce(Trip.charged_toll_amount, 0)).label("charged_toll_recovery"),
+                func.sum(func.coalesce(Trip.charged_parking_amount, 0)).label("charged_parking_recovery"),
+                func.sum(func.coalesce(Trip.discount_amount, 0)).label("discount_total"),
+                func.sum(func.coalesce(Trip.diesel_used, 0) + func.coalesce(Trip.petrol_used, 0)).label("trip_fuel_cost"),
+                func.sum(func.coalesce(Trip.driver_bhatta, 0)).label("driver_bhatta_cost"),
+                func.sum(func.coalesce(Trip.toll_amount, 0)).label("toll_cost"),
+                func.sum(func.coalesce(Trip.parking_amount, 0)).label("parking_cost"),
+                func.sum(func.coalesce(Trip.other_expenses, 0)).label("daily_running_expense"),
+            )
+            .select_from(Trip)
+            .outerjoin(credits, credits.c.trip_id == Trip.id)
+            .where(*criteria)
+        )
+        .mappings()
+        .one()
+    )
+
+    pricing_row = pricing_item_totals(db, start_date, end_date)
+
+    totals = {key: _round_2(value) for key, value in {**trip_row, **pricing_row}.items()}
+    for key in (
+        "total_trips",
+        "completed_trips",
+        "upcoming_trips",
+        "ongoing_trips",
+        "pending_customer_payments",
+        "unpaid_invoices",
+        "partial_payments",
+    ):
+        totals[key] = int(trip_row[key] or 0)
+    return totals
+
+
+def pricing_item_totals(db: Session, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """Custom pricing and charge-item totals, by dashboard category, for trips in the window."""
+    criteria = trip_date_criteria(start_date, end_date)
+    vehicle_factor = case((func.coalesce(Trip.number_of_vehicles, 0) < 1, 1), else_=Trip.number_of_vehicles)
+    item_amount = _pricing_item_amount()
+    is_charge = TripPricingItem.item_type == "charge"
+    charge_category = _charge_category()
+    row = (
+        db.execute(
+            select(
+                func.sum(
+                    case((TripPricingItem.item_type == "pricing", item_amount * vehicle_factor), else_=0)
+                ).label("invoice_custom_pricing"),
+                *(
+                    func.sum(case((and_(is_charge, charge_category == category), item_amount), else_=0)).label(category)
+                    for category in (
+                        "night_charges",
+                        "waiting_charges",
+                        "additional_charges",
+                        "other_additional_charges",
+                    )
+                ),
+            )
+            .select_from(TripPricingItem)
+            .join(Trip, Trip.id == TripPricingItem.trip_id)
+            .where(*criteria)
+        )
+        .mappings()
+        .one()
+    )
+    return {key: _round_2(value) for key, value in row.items()}
+
+
+def trip_status_counts(db: Session, start_date: date | None = None, end_date: date | None = None) -> dict:
+    """
+    Upcoming and ongoing trip counts for trips in the window.
+
+    These depend on the current time, so they cannot be rolled up. Only trips
+    that depart or return later than now can be either, which keeps the scan to
+    the indexed tail of the trips table.
+    """
+    now = datetime.now().astimezone()
+    today = date.today()
+    status = trip_status_expression(now, today)
+    row = (
+        db.execute(
+            select(
+                func.sum(case((status == "upcoming", 1), else_=0)).label("upcoming_trips"),
+                func.sum(case((status == "ongoing", 1), else_=0)).label("ongoing_trips"),
+            ).where(
+                *trip_date_criteria(start_date, end_date),
+                or_(Trip.departure_datetime > now, Trip.return_datetime >= now, Trip.trip_date > today),
+            )
+        )
+        .mappings()
+        .one()
+    )
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+def operating_expense_total(costs: dict) -> float:
+    """Operating expense as shown on the dashboard; oil bills are reported separately."""
+    return _round_2(
+        sum(
+            float(costs.get(key) or 0)
+            for key in (
+                "trip_fuel_cost",
+                "direct_fuel_cost",
+                "driver_bhatta_cost",
+                "driver_salary_cost",
+                "toll_cost",
+                "parking_cost",
+                "maintenance_cost",
+                "spare_cost",
+                "mechanic_cost",
+                "daily_running_expense",
+                "vendor_payment_cost",
+            )
+        )
+    )
+
+
+def month_window(start_month: str, end_month: str) -> tuple[date, date, list[str]]:
+    """First day, last day and every YYYY-MM label for an inclusive month range."""
+    start_year, start_mon = map(int, start_month.split("-"))
+    end_year, end_mon = map(int, end_month.split("-"))
+    start = date(start_year, start_mon, 1)
+    end = date(end_year, end_mon, calendar.monthrange(end_year, end_mon)[1])
+
+    months = []
+    year, mon = start_year, start_mon
+    while (year, mon) <= (end_year, end_mon):
+        months.append(f"{year:04d}-{mon:02d}")
+        year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return start, end, months
+
+
+def _monthly_trip_totals(db: Session, start_date: date, end_date: date) -> dict[str, dict]:
+    criteria = trip_date_criteria(start_date, end_date)
+    credits = party_fuel_credit_subquery(criteria)
+    charged = func.coalesce(Trip.total_charged, 0)
+    received = func.coalesce(Trip.amount_received, 0) + func.coalesce(credits.c.party_fuel_credit, 0)
+    outstanding = charged - received
+    status = trip_status_expression(datetime.now().astimezone(), date.today())
+    month = month_bucket(db, trip_effective_date())
+
+    rows = db.execute(
+        select(
+            month.label("month"),
+            func.count(Trip.id).label("total_trips"),
+            func.sum(case((status == "completed", 1), else_=0)).label("completed_trips"),
+            func.sum(case((status == "upcoming", 1), else_=0)).label("upcoming_trips"),
+            func.sum(case((status == "ongoing", 1), else_=0)).label("ongoing_trips"),
+            func.sum(charged).label("revenue"),
+            func.sum(received).label("received"),
+            func.sum(case((outstanding > 0, outstanding), else_=0)).label("pending"),
+            func.sum(func.coalesce(Trip.diesel_used, 0) + func.coalesce(Trip.petrol_used, 0)).label("trip_fuel_cost"),
+            func.sum(func.coalesce(Trip.driver_bhatta, 0)).label("driver_bhatta_cost"),
+            func.sum(func.coalesce(Trip.toll_amount, 0)).label("toll_cost"),
+            func.sum(func.coalesce(Trip.parking_amount, 0)).label("parking_cost"),
+            func.sum(func.coalesce(Trip.other_expenses, 0)).label("daily_running_expense"),
+        )
+        .select_from(Trip)
+        .outerjoin(credits, credits.c.trip_id == Trip.id)
+        .where(*criteria)
+        .group_by(month)
+    ).mappings()
+    return {row["month"]: dict(row) for row in rows}
+
+
+def dashboard_expense_totals(
+    db: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    group_by: str | None = None,
+) -> dict:
+    """Dashboard expense categories for the window in a single round trip, keyed like the summary."""
+    if not (start_date and end_date):
+        start_date = end_date = None
+    totals = expense_totals(
+        db,
+        DASHBOARD_EXPENSE_CATEGORIES,
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+    )
+
+    def rename(values: dict) -> dict:
+        return {DASHBOARD_EXPENSE_CATEGORIES[key]: value for key, value in values.items()}
+
+    if group_by:
+        return {key: rename(values) for key, values in totals.items()}
+    return rename(totals)
+
+
+def dashboard_trend(db: Session, start_month: str, end_month: str) -> dict:
+    """
+    Per-month revenue, expense, profit and trip-status series for an inclusive range.
+
+    Uses one grouped trip query and one UNION ALL expense query, so the cost
+    does not grow with the number of months requested.
+    """
+    start_date, end_date, months = month_window(start_month, end_month)
+    trip_totals = _monthly_trip_totals(db, start_date, end_date)
+    monthly_expenses = dashboard_expense_totals(db, start_date, end_date, group_by="month")
+
+    series = []
+    for month in months:
+        trips = trip_totals.get(month, {})
+        costs = {**trips, **monthly_expenses.get(month, {})}
+        revenue = _round_2(trips.get("revenue"))
+        operating_expense = operating_expense_total(costs)
+        series.append(
+            {
+                "month": month,
+                "total_trips": int(trips.get("total_trips") or 0),
+                "completed_trips": int(trips.get("completed_trips") or 0),
+                "upcoming_trips": int(trips.get("upcoming_trips") or 0),
+                "ongoing_trips": int(trips.get("ongoing_trips") or 0),
+                "revenue": revenue,
+                "received": _round_2(trips.get("received")),
+                "pending": _round_2(trips.get("pending")),
+                "expense": operating_expense,
+                "oil_cost": _round_2(costs.get("oil_cost")),
+                "profit": _round_2(revenue - operating_expense),
+            }
+        )
+    return {"from": start_month, "to": end_month, "months": series}
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+import re
+from collections import Counter, deque
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.document_sequence import DocumentSequence
+from app.models.quotation import Quotation
+from app.models.trip import Trip
+
+
+DOCUMENT_PREFIXES = {
+    "invoice": os.getenv("INVOICE_NUMBER_PREFIX", "INV"),
+    "quotation": os.getenv("QUOTATION_NUMBER_PREFIX", "QT"),
+}
+DOCUMENT_NUMBER_WIDTH = int(os.getenv("DOCUMENT_NUMBER_WIDTH", "5"))
+DOCUMENT_NUMBER_COLUMNS = {
+    "invoice": Trip.invoice_number,
+    "quotation": Quotation.quotation_no,
+}
+_DOCUMENT_LABELS = {"invoice": "Invoice", "quotation": "Quotation"}
+
+
+def financial_year(day: date | datetime | None = None) -> str:
+    """The April-March financial year containing ``day`` (today when None), e.g. ``2026-27``."""
+    day = day or date.today()
+    start = day.year if day.month >= 4 else day.year - 1
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _reserve(db: Session, document_type: str, year: str, count: int) -> int:
+    """Advance the year's counter by ``count`` and return its new last value."""
+    increment = (
+        update(DocumentSequence)
+        .where(DocumentSequence.document_type == document_type, DocumentSequence.financial_year == year)
+        .values(last_value=DocumentSequence.last_value + count)
+        .returning(DocumentSequence.last_value)
+        .execution_options(synchronize_session=False)
+    )
+    value = db.execute(increment).scalar()
+    if value is not None:
+        return value
+    try:
+        with db.begin_nested():
+            db.execute(insert(DocumentSequence).values(document_type=document_type, financial_year=year, last_value=count))
+        return count
+    except IntegrityError:
+        # Another transaction opened the year first; queue behind it instead.
+        return db.execute(increment).scalar()
+
+
+def _format(document_type: str, year: str, value: int) -> str:
+    return f"{DOCUMENT_PREFIXES[document_type]}/{year}/{value:0{DOCUMENT_NUMBER_WIDTH}d}"
+
+
+def _allocate(db: Session, document_type: str, year: str, count: int) -> list[str]:
+    """Reserve ``count`` numbers in ``year``, reserving again for any that are already stored."""
+    column = DOCUMENT_NUMBER_COLUMNS[document_type]
+    numbers: list[str] = []
+    while len(numbers) < count:
+        needed = count - len(numbers)
+        last_value = _reserve(db, document_type, year, needed)
+        candidates = [_format(document_type, year, value) for value in range(last_value - needed + 1, last_value + 1)]
+        taken = set(db.scalars(select(column).where(column.in_(candidates))))
+        numbers.extend(number for number in candidates if number not in taken)
+    return numbers
+
+
+def next_document_number(db: Session, document_type: str, day: date | datetime | None = None) -> str:
+    """
+    Allocate the next number for ``document_type`` in the financial year of ``day``.
+
+    The year's counter row is incremented in place, which locks it until the
+    caller's transaction ends: concurrent allocations queue on that one row,
+    and a rolled-back transaction gives its number back. Numbers already
+    stored, e.g. typed in before numbering moved to the server, are skipped,
+    so the sequence is gapless apart from those. Numbers look like
+    ``INV/2026-27/00001``.
+    """
+    return _allocate(db, document_type, financial_year(day), 1)[0]
+
+
+def next_document_numbers(db: Session, document_type: str, days: list) -> list[str]:
+    """Allocate one number per entry of ``days``, with one counter update per financial year when none is taken."""
+    years = [financial_year(day) for day in days]
+    free = {
+        year: deque(_allocate(db, document_type, year, count)) for year, count in sorted(Counter(years).items())
+    }
+    return [free[year].popleft() for year in years]
+
+
+def uses_allocated_format(document_type: str, number: str) -> bool:
+    """Whether ``number`` has the allocator's ``PREFIX/YYYY-YY/NNNNN`` shape."""
+    prefix = re.escape(DOCUMENT_PREFIXES[document_type])
+    return re.fullmatch(rf"{prefix}/\d{{4}}-\d{{2}}/\d+", number.strip()) is not None
+
+
+def check_manual_number(document_type: str, number: str | None, current: str | None = None) -> None:
+    """
+    Reject a typed-in number that the allocator could hand out later.
+
+    ``current`` is the document's stored number; keeping it unchanged is allowed.
+    """
+    number = (number or "").strip()
+    if number and number != current and uses_allocated_format(document_type, number):
+        label = _DOCUMENT_LABELS[document_type]
+        example = _format(document_type, financial_year(), 1)
+        raise HTTPException(
+            400, f"{label} numbers like {example} are assigned automatically; leave the {label.lower()} number blank"
+        )
+
+
+def is_duplicate_number(exc: IntegrityError, column: str) -> bool:
+    """Whether ``exc`` is the unique index on ``column`` rejecting a number that is already taken."""
+    return column in str(exc.orig)
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.driver_salary import DriverSalary
 from app.schemas.driver_salary import DriverSalaryCreate
+from app.services.financial_rollup_service import record_driver_salary
 
 
 def list_salaries_by_driver(db: Session, driver_id: int):
@@ -22,6 +23,7 @@ def list_all_salaries(db: Session):
 def create_salary(db: Session, data: DriverSalaryCreate):
     salary = DriverSalary(**data.dict())
     db.add(salary)
+    record_driver_salary(db, salary)
     db.commit()
     db.refresh(salary)
     return salary
@@ -30,6 +32,7 @@ def create_salary(db: Session, data: DriverSalaryCreate):
 def delete_salary(db: Session, salary_id: int):
     salary = db.query(DriverSalary).filter(DriverSalary.id == salary_id).first()
     if salary:
+        record_driver_salary(db, salary, sign=-1)
         db.delete(salary)
         db.commit()
     return salary
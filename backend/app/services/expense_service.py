@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.driver_salary import DriverSalary
+from app.models.fuel import Fuel
+from app.models.maintenance import Maintenance
+from app.models.mechanic import MechanicEntry
+from app.models.oil_bill import OilBill, OilBillEntry
+from app.models.spare_part import SparePart
+from app.models.trip import Trip
+from app.models.trip_vehicle import TripVehicle
+from app.models.vendor_payment import VendorPayment
+from app.services.vehicle_service import normalize_vehicle_number
+
+
+def month_bucket(db: Session, column):
+    """Render a date/datetime column as a YYYY-MM string on the bound dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _normalized(column):
+    return func.lower(func.trim(column))
+
+
+def _vendor_trip_ids(vendor_name: str):
+    # Trips where at least one vehicle entry names this fuel vendor.
+    return select(TripVehicle.trip_id).where(_normalized(TripVehicle.fuel_vendor) == vendor_name).distinct()
+
+
+# Each source describes how one expense category is summed and which columns
+# the optional date, vehicle and vendor filters apply to.
+EXPENSE_SOURCES = {
+    "direct_fuel": {
+        "amount": Fuel.total_cost,
+        "date": Fuel.filled_date,
+        "vehicle": Fuel.vehicle_number,
+        "vendor_name": Fuel.vendor,
+    },
+    "maintenance": {
+        "amount": Maintenance.amount,
+        "date": Maintenance.start_date,
+        "datetime": True,
+        "vehicle": Maintenance.vehicle_number,
+    },
+    "spare": {
+        "amount": SparePart.cost * SparePart.quantity,
+        "date": SparePart.replaced_date,
+        "vehicle": SparePart.vehicle_number,
+        "vendor_name": SparePart.vendor,
+    },
+    "oil": {
+        "amount": OilBillEntry.total_amount,
+        "date": OilBill.bill_date,
+        "vehicle": OilBillEntry.vehicle_number,
+        "vendor_id": OilBill.vendor_id,
+        "select_from": OilBillEntry,
+        "join": (OilBill, OilBill.id == OilBillEntry.oil_bill_id),
+    },
+    "mechanic": {
+        "amount": MechanicEntry.cost,
+        "date": MechanicEntry.service_date,
+        "vehicle": MechanicEntry.vehicle_number,
+        "vendor_name": MechanicEntry.vendor,
+    },
+    "vendor_payment": {
+        "amount": VendorPayment.amount,
+        "date": VendorPayment.paid_on,
+        "vendor_id": VendorPayment.vendor_id,
+    },
+    "driver_salary": {
+        "amount": DriverSalary.amount,
+        "date": DriverSalary.paid_on,
+    },
+    # Vendor-side trip fuel: per-vehicle fuel cost where the entry names the vendor,
+    # otherwise trip-level diesel + petrol when the trip itself names the vendor.
+    "vendor_trip_fuel": {
+        "amount": TripVehicle.fuel_cost,
+        "vendor_name": TripVehicle.fuel_vendor,
+    },
+    "vendor_trip_fuel_fallback": {
+        "amount": Trip.diesel_used + Trip.petrol_used,
+        "vendor_name": Trip.vendor,
+        "extra": lambda vendor_name: [~Trip.id.in_(_vendor_trip_ids(vendor_name))],
+    },
+}
+
+
+def _source_branch(
+    db: Session,
+    category: str,
+    start_date: date | None,
+    end_date: date | None,
+    vehicle_numbers: list[str] | None,
+    vendor_id: int | None,
+    vendor_name: str | None,
+    group_by: str | None,
+):
+    source = EXPENSE_SOURCES[category]
+
+    def column(key: str):
+        if key not in source:
+            raise ValueError(f"Expense category '{category}' cannot be filtered or grouped by {key}")
+        return source[key]
+
+    criteria = []
+    if start_date and end_date:
+        if source.get("datetime"):
+            criteria.append(
+                column("date").between(
+                    datetime.combine(start_date, datetime.min.time()),
+                    datetime.combine(end_date, datetime.max.time()),
+                )
+            )
+        else:
+            criteria.append(column("date").between(start_date, end_date))
+    if vehicle_numbers is not None:
+        criteria.append(column("vehicle").in_([normalize_vehicle_number(value) for value in vehicle_numbers]))
+    # Vendor-owned tables link by id; free-text vendor columns are matched by name.
+    if vendor_id is not None and "vendor_id" in source:
+        criteria.append(source["vendor_id"] == vendor_id)
+    elif vendor_name is not None:
+        criteria.append(_normalized(column("vendor_name")) == vendor_name)
+        if "extra" in source:
+            criteria.extend(source["extra"](vendor_name))
+    elif vendor_id is not None:
+        column("vendor_id")
+
+    group_key = None
+    if group_by == "month":
+        group_key = month_bucket(db, column("date"))
+    elif group_by == "vehicle_number":
+        group_key = column("vehicle")
+
+    columns = [literal(category).label("category")]
+    if group_key is not None:
+        columns.append(group_key.label("group_key"))
+    columns.append(func.coalesce(func.sum(source["amount"]), 0).label("amount"))
+
+    query = select(*columns)
+    if "select_from" in source:
+        query = query.select_from(source["select_from"]).join(*source["join"])
+    query = query.where(*criteria)
+    if group_key is not None:
+        query = query.group_by(group_key)
+    return query
+
+
+def expense_totals(
+    db: Session,
+    categories,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    vehicle_numbers: list[str] | None = None,
+    vendor_id: int | None = None,
+    vendor_name: str | None = None,
+    group_by: str | None = None,
+) -> dict:
+    """
+    Sum the requested expense categories in one UNION ALL round trip.
+
+    Returns ``{category: amount}``, or ``{group: {category: amount}}`` when
+    ``group_by`` is ``"month"`` (YYYY-MM) or ``"vehicle_number"`` (normalized).
+    When filtering by vendor, sources with a vendor id use ``vendor_id`` and
+    the rest match ``vendor_name`` case-insensitively after trimming.
+    """
+    categories = list(categories)
+    if vendor_name is not None:
+        vendor_name = vendor_name.strip().lower()
+    if vehicle_numbers is not None and not vehicle_numbers:
+        return {} if group_by else dict.fromkeys(categories, 0.0)
+
+    branches = [
+        _source_branch(db, category, start_date, end_date, vehicle_numbers, vendor_id, vendor_name, group_by)
+        for category in categories
+    ]
+    rows = db.execute(union_all(*branches)).mappings()
+
+    if not group_by:
+        totals = dict.fromkeys(categories, 0.0)
+        for row in rows:
+            totals[row["category"]] += float(row["amount"] or 0)
+        return totals
+
+    grouped: dict[str, dict[str, float]] = {}
+    for row in rows:
+        if row["group_key"] is None:
+            continue
+        bucket = grouped.setdefault(row["group_key"], dict.fromkeys(categories, 0.0))
+        bucket[row["category"]] += float(row["amount"] or 0)
+    return grouped
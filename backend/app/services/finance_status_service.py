@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.models.vehicle_emi import VehicleEMIInstallment, VehicleEMIPlan
+from app.models.vehicle_insurance import VehicleInsurance
+from app.models.vehicle_tax import VehicleTax
+
+
+EXPIRY_WARNING_DAYS = 30
+
+
+def installment_aggregates(db: Session, today: date, *criteria) -> dict[int, dict]:
+    """Paid / pending / overdue counts and remaining balance per plan id, from one grouped query."""
+    paid = VehicleEMIInstallment.is_paid == True
+    overdue = and_(VehicleEMIInstallment.is_paid == False, VehicleEMIInstallment.due_date < today)
+    outstanding = case(
+        (
+            and_(VehicleEMIInstallment.is_paid == False, VehicleEMIInstallment.amount_due > VehicleEMIInstallment.paid_amount),
+            VehicleEMIInstallment.amount_due - VehicleEMIInstallment.paid_amount,
+        ),
+        else_=0,
+    )
+    rows = (
+        db.query(
+            VehicleEMIInstallment.emi_plan_id,
+            func.sum(case((paid, 1), else_=0)),
+            func.sum(case((overdue, 1), else_=0)),
+            func.count(VehicleEMIInstallment.id),
+            func.sum(outstanding),
+        )
+        .join(VehicleEMIPlan, VehicleEMIPlan.id == VehicleEMIInstallment.emi_plan_id)
+        .filter(*criteria)
+        .group_by(VehicleEMIInstallment.emi_plan_id)
+        .all()
+    )
+    aggregates: dict[int, dict] = {}
+    for plan_id, paid_count, overdue_count, total, remaining in rows:
+        paid_count, overdue_count = int(paid_count or 0), int(overdue_count or 0)
+        aggregates[plan_id] = {
+            "paid": paid_count,
+            "pending": int(total) - paid_count - overdue_count,
+            "overdue": overdue_count,
+            "remaining": float(remaining or 0),
+        }
+    return aggregates
+
+
+def insurance_status(record: VehicleInsurance | None, today: date) -> tuple[int, str]:
+    if not record:
+        return 0, "missing"
+    remaining_days = (record.end_date - today).days
+    if remaining_days < 0:
+        return remaining_days, "expired"
+    if remaining_days <= EXPIRY_WARNING_DAYS:
+        return remaining_days, "expiring_soon"
+    return remaining_days, "active"
+
+
+def tax_status(record: VehicleTax | None, today: date) -> tuple[int, str]:
+    if not record:
+        return 0, "missing"
+    remaining_days = (record.tax_expiry_date - today).days
+    if remaining_days < 0:
+        return remaining_days, "expired"
+    if remaining_days <= EXPIRY_WARNING_DAYS:
+        return remaining_days, "expiring_soon"
+    return remaining_days, "active"
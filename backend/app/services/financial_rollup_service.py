@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.driver_salary import DriverSalary
+from app.models.fuel import Fuel
+from app.models.maintenance import Maintenance
+from app.models.mechanic import MechanicEntry
+from app.models.monthly_financial_rollup import MonthlyFinancialRollup
+from app.models.oil_bill import OilBill, OilBillEntry
+from app.models.spare_part import SparePart
+from app.models.trip import Trip
+from app.models.vendor_payment import VendorPayment
+from app.services.dashboard_service import party_fuel_credit_subquery, trip_effective_date
+from app.services.expense_service import month_bucket
+
+
+ROLLUP_METRICS = (
+    "trip_count",
+    "revenue",
+    "received",
+    "pending",
+    "pending_trips",
+    "partial_trips",
+    "unpaid_trips",
+    "charged_toll",
+    "charged_parking",
+    "discount",
+    "trip_fuel",
+    "direct_fuel",
+    "bhatta",
+    "toll",
+    "parking",
+    "other_expenses",
+    "maintenance",
+    "spare",
+    "oil",
+    "mechanic",
+    "vendor_payments",
+    "salary",
+)
+
+# Metrics that count trips rather than sum money.
+ROLLUP_COUNTS = ("trip_count", "pending_trips", "partial_trips", "unpaid_trips")
+
+
+def _round_2(value: float | None) -> float:
+    return round(float(value or 0), 2)
+
+
+def _month_key(value: date | datetime | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.strftime("%Y-%m")
+
+
+def apply_counter_delta(db: Session, table, key: dict, deltas: dict) -> None:
+    """
+    Add deltas to the counter row identified by ``key`` inside the caller's transaction.
+
+    The row is updated with ``col = col + :delta`` so concurrent writers never
+    overwrite each other; the first writer for a new key inserts it.
+    """
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    increment = (
+        table.update()
+        .where(*(table.c[name] == value for name, value in key.items()))
+        .values({name: table.c[name] + value for name, value in deltas.items()})
+    )
+    if db.execute(increment).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(table.insert().values(**key, **deltas))
+    except IntegrityError:
+        # Another transaction created the row first; fall back to incrementing it.
+        db.execute(increment)
+
+
+def apply_row_deltas(db: Session, table, key_column: str, deltas_by_key: dict) -> None:
+    """
+    Add deltas to existing rows with ``col = coalesce(col, 0) + :delta``.
+
+    ``deltas_by_key`` maps a ``key_column`` value to ``{column: delta}``. Rows
+    are updated in key order, so concurrent transactions take their row locks
+    in the same order. Keys without a row are ignored.
+    """
+    key = table.c[key_column]
+    for value in sorted(deltas_by_key):
+        deltas = {name: delta for name, delta in deltas_by_key[value].items() if delta}
+        if deltas:
+            db.execute(
+                table.update()
+                .where(key == value)
+                .values({name: func.coalesce(table.c[name], 0) + delta for name, delta in deltas.items()})
+            )
+
+
+def apply_rollup_delta(db: Session, month: str | None, deltas: dict) -> None:
+    """Add deltas to one month's rollup row."""
+    if month:
+        apply_counter_delta(db, MonthlyFinancialRollup.__table__, {"month": month}, deltas)
+
+
+def _record(db: Session, value: date | datetime | None, metrics: dict, sign: int) -> None:
+    apply_rollup_delta(db, _month_key(value), {name: sign * amount for name, amount in metrics.items()})
+
+
+def _trip_metrics(trip: Trip, party_fuel_credit: float) -> dict:
+    charged = float(trip.total_charged or 0)
+    received = float(trip.amount_received or 0) + float(party_fuel_credit or 0)
+    outstanding = charged - received
+    return {
+        "trip_count": 1,
+        "revenue": charged,
+        "received": received,
+        "pending": max(outstanding, 0),
+        "pending_trips": int(outstanding > 0),
+        "partial_trips": int(outstanding > 0 and received > 0),
+        "unpaid_trips": int(outstanding > 0 and received <= 0),
+        "charged_toll": float(trip.charged_toll_amount or 0),
+        "charged_parking": float(trip.charged_parking_amount or 0),
+        "discount": float(trip.discount_amount or 0),
+        "trip_fuel": float(trip.diesel_used or 0) + float(trip.petrol_used or 0),
+        "bhatta": float(trip.driver_bhatta or 0),
+        "toll": float(trip.toll_amount or 0),
+        "parking": float(trip.parking_amount or 0),
+        "other_expenses": float(trip.other_expenses or 0),
+    }
+
+
+def _trip_effective_date(trip: Trip) -> date | None:
+    return trip.departure_datetime.date() if trip.departure_datetime else trip.trip_date
+
+
+def record_trip(db: Session, trip: Trip, party_fuel_credit: float | None = None, sign: int = 1) -> None:
+    if party_fuel_credit is None:
+        party_fuel_credit = trip.get_party_fuel_credit()
+    _record(db, _trip_effective_date(trip), _trip_metrics(trip, party_fuel_credit), sign)
+
+
+def record_trips(db: Session, trips: list[tuple[Trip, float]]) -> None:
+    """Record many new trips, given as (trip, party fuel credit) pairs, with one delta per month."""
+    months: defaultdict[str, dict] = defaultdict(lambda: defaultdict(float))
+    for trip, party_fuel_credit in trips:
+        month = _month_key(_trip_effective_date(trip))
+        if not month:
+            continue
+        for name, amount in _trip_metrics(trip, party_fuel_credit).items():
+            months[month][name] += amount
+    for month, deltas in sorted(months.items()):
+        apply_rollup_delta(db, month, deltas)
+
+
+def record_fuel(db: Session, fuel: Fuel, sign: int = 1) -> None:
+    _record(db, fuel.filled_date, {"direct_fuel": float(fuel.total_cost or 0)}, sign)
+
+
+def record_spare_part(db: Session, spare: SparePart, sign: int = 1) -> None:
+    _record(db, spare.replaced_date, {"spare": float(spare.cost or 0) * float(spare.quantity or 1)}, sign)
+
+
+def record_maintenance(db: Session, maintenance: Maintenance, sign: int = 1) -> None:
+    _record(db, maintenance.start_date, {"maintenance": float(maintenance.amount or 0)}, sign)
+
+
+def record_mechanic_entry(db: Session, entry: MechanicEntry, sign: int = 1) -> None:
+    _record(db, entry.service_date, {"mechanic": float(entry.cost or 0)}, sign)
+
+
+def record_oil_bill(db: Session, bill: OilBill, sign: int = 1) -> None:
+    # Matches the dashboard, which sums bill entries rather than the stored grand total.
+    amount = sum(float(entry.total_amount or 0) for entry in bill.entries)
+    _record(db, bill.bill_date, {"oil": amount}, sign)
+
+
+def record_vendor_payment(db: Session, payment: VendorPayment, sign: int = 1) -> None:
+    _record(db, payment.paid_on, {"vendor_payments": float(payment.amount or 0)}, sign)
+
+
+def record_driver_salary(db: Session, salary: DriverSalary, sign: int = 1) -> None:
+    _record(db, salary.paid_on, {"salary": float(salary.amount or 0)}, sign)
+
+
+def _grouped_sums(db: Session, date_column, metrics: dict, *, select_from=None, join=None) -> list:
+    month = month_bucket(db, date_column)
+    query = select(month.label("month"), *(func.sum(expr).label(name) for name, expr in metrics.items()))
+    if select_from is not None:
+        query = query.select_from(select_from)
+    if join is not None:
+        query = query.join(*join)
+    return db.execute(query.where(date_column.isnot(None)).group_by(month)).mappings().all()
+
+
+def _monthly_source_totals(db: Session) -> dict[str, dict[str, float]]:
+    months: defaultdict[str, dict[str, float]] = defaultdict(lambda: dict.fromkeys(ROLLUP_METRICS, 0))
+
+    credits = party_fuel_credit_subquery([])
+    charged = func.coalesce(Trip.total_charged, 0)
+    received = func.coalesce(Trip.amount_received, 0) + func.coalesce(credits.c.party_fuel_credit, 0)
+    outstanding = charged - received
+    trip_month = month_bucket(db, trip_effective_date())
+    trip_rows = db.execute(
+        select(
+            trip_month.label("month"),
+            func.count(Trip.id).label("trip_count"),
+            func.sum(charged).label("revenue"),
+            func.sum(received).label("received"),
+            func.sum(case((outstanding > 0, outstanding), else_=0)).label("pending"),
+            func.sum(case((outstanding > 0, 1), else_=0)).label("pending_trips"),
+            func.sum(case((and_(outstanding > 0, received > 0), 1), else_=0)).label("partial_trips"),
+            func.sum(case((and_(outstanding > 0, received <= 0), 1), else_=0)).label("unpaid_trips"),
+            func.sum(func.coalesce(Trip.charged_toll_amount, 0)).label("charged_toll"),
+            func.sum(func.coalesce(Trip.charged_parking_amount, 0)).label("charged_parking"),
+            func.sum(func.coalesce(Trip.discount_amount, 0)).label("discount"),
+            func.sum(func.coalesce(Trip.diesel_used, 0) + func.coalesce(Trip.petrol_used, 0)).label("trip_fuel"),
+            func.sum(func.coalesce(Trip.driver_bhatta, 0)).label("bhatta"),
+            func.sum(func.coalesce(Trip.toll_amount, 0)).label("toll"),
+            func.sum(func.coalesce(Trip.parking_amount, 0)).label("parking"),
+            func.sum(func.coalesce(Trip.other_expenses, 0)).label("other_expenses"),
+        )
+        .select_from(Trip)
+        .outerjoin(credits, credits.c.trip_id == Trip.id)
+        .where(trip_effective_date().isnot(None))
+        .group_by(trip_month)
+    ).mappings().all()
+
+    sources = [
+        trip_rows,
+        _grouped_sums(db, Fuel.filled_date, {"direct_fuel": Fuel.total_cost}),
+        _grouped_sums(db, SparePart.replaced_date, {"spare": SparePart.cost * func.coalesce(SparePart.quantity, 1)}),
+        _grouped_sums(db, Maintenance.start_date, {"maintenance": Maintenance.amount}),
+        _grouped_sums(db, MechanicEntry.service_date, {"mechanic": MechanicEntry.cost}),
+        _grouped_sums(
+            db,
+            OilBill.bill_date,
+            {"oil": OilBillEntry.total_amount},
+            select_from=OilBillEntry,
+            join=(OilBill, OilBill.id == OilBillEntry.oil_bill_id),
+        ),
+        _grouped_sums(db, VendorPayment.paid_on, {"vendor_payments": VendorPayment.amount}),
+        _grouped_sums(db, DriverSalary.paid_on, {"salary": DriverSalary.amount}),
+    ]
+    for rows in sources:
+        for row in rows:
+            bucket = months[row["month"]]
+            for name, value in row.items():
+                if name != "month":
+                    bucket[name] += value or 0
+    return months
+
+
+def rebuild_financial_rollup(db: Session) -> int:
+    """Recompute every month from the source tables and replace the rollup. Returns the month count."""
+    months = _monthly_source_totals(db)
+    db.execute(delete(MonthlyFinancialRollup))
+    if months:
+        db.execute(
+            insert(MonthlyFinancialRollup),
+            [
+                {
+                    "month": month,
+                    **{name: (int(value) if name in ROLLUP_COUNTS else _round_2(value)) for name, value in totals.items()},
+                }
+                for month, totals in sorted(months.items())
+            ],
+        )
+    db.commit()
+    return len(months)
+
+
+def rollup_totals(db: Session, start_month: str | None = None, end_month: str | None = None) -> dict:
+    """Month-by-month rollup rows plus their sum for the inclusive YYYY-MM range."""
+    query = db.query(MonthlyFinancialRollup)
+    if start_month:
+        query = query.filter(MonthlyFinancialRollup.month >= start_month)
+    if end_month:
+        query = query.filter(MonthlyFinancialRollup.month <= end_month)
+    rows = query.order_by(MonthlyFinancialRollup.month.asc()).all()
+
+    totals = dict.fromkeys(ROLLUP_METRICS, 0)
+    months = []
+    for row in rows:
+        values = {name: getattr(row, name) or 0 for name in ROLLUP_METRICS}
+        for name, value in values.items():
+            totals[name] += value
+        months.append({"month": row.month, **{name: _round_2(v) for name, v in values.items()}})
+
+    summary = {name: _round_2(value) for name, value in totals.items()}
+    for name in ROLLUP_COUNTS:
+        summary[name] = int(totals[name])
+        for month in months:
+            month[name] = int(month[name])
+    return {"from": start_month, "to": end_month, "totals": summary, "months": months}
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import case, delete, func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.database.locks import advisory_lock
+from app.database.session import SessionLocal, engine
+from app.models.fleet_alert import FleetAlert
+from app.models.mechanic import MechanicEntry
+from app.models.vehicle_emi import VehicleEMIPlan
+from app.models.vehicle_insurance import VehicleInsurance
+from app.models.vehicle_tax import VehicleTax
+from app.services.finance_status_service import installment_aggregates, insurance_status, tax_status
+
+
+logger = logging.getLogger(__name__)
+
+FINANCE_ALERT_TYPES = ("emi", "insurance", "tax")
+ALERT_TYPES = (*FINANCE_ALERT_TYPES, "service")
+SERVICE_INTERVAL_DAYS = 90
+SERVICE_WARNING_DAYS = 7
+REFRESH_INTERVAL_SECONDS = float(os.getenv("FLEET_ALERTS_REFRESH_SECONDS", "3600"))
+# Arbitrary application-wide key for pg_advisory_lock.
+REFRESH_LOCK_ID = 724_310_002
+
+_UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+
+
+def _latest_active(db: Session, model, vehicle_numbers: list[str] | None) -> dict:
+    query = db.query(model).filter(model.is_active == True)
+    if vehicle_numbers is not None:
+        query = query.filter(model.vehicle_number.in_(vehicle_numbers))
+    latest: dict = {}
+    for record in query.order_by(model.created_at.desc(), model.id.desc()):
+        latest.setdefault(record.vehicle_number, record)
+    return latest
+
+
+def _expiry_alert(vehicle_number: str, alert_type: str, label: str, status: str, remaining_days: int, due_date: date) -> dict | None:
+    if status == "expired":
+        severity, message = "danger", f"{label} expired {abs(remaining_days)} day(s) ago"
+    elif status == "expiring_soon":
+        severity, message = "warning", f"{label} expires in {remaining_days} day(s)"
+    else:
+        return None
+    return {
+        "vehicle_number": vehicle_number,
+        "alert_type": alert_type,
+        "severity": severity,
+        "message": message,
+        "remaining_days": remaining_days,
+        "due_date": due_date,
+    }
+
+
+def compute_vehicle_alerts(db: Session, today: date, vehicle_numbers: list[str] | None = None) -> list[dict]:
+    """Current alerts for the given vehicles (every vehicle when None), as fleet_alerts rows."""
+    alerts: list[dict] = []
+
+    plans = _latest_active(db, VehicleEMIPlan, vehicle_numbers)
+    counts = installment_aggregates(db, today, VehicleEMIPlan.id.in_([plan.id for plan in plans.values()])) if plans else {}
+    for vehicle_number, plan in plans.items():
+        overdue = counts.get(plan.id, {}).get("overdue", 0)
+        if overdue:
+            alerts.append(
+                {
+                    "vehicle_number": vehicle_number,
+                    "alert_type": "emi",
+                    "severity": "warning",
+                    "message": f"EMI overdue: {overdue} installment(s)",
+                    "remaining_days": None,
+                    "due_date": None,
+                }
+            )
+
+    for vehicle_number, record in _latest_active(db, VehicleInsurance, vehicle_numbers).items():
+        remaining_days, status = insurance_status(record, today)
+        alert = _expiry_alert(vehicle_number, "insurance", "Insurance", status, remaining_days, record.end_date)
+        if alert:
+            alerts.append(alert)
+
+    for vehicle_number, record in _latest_active(db, VehicleTax, vehicle_numbers).items():
+        remaining_days, status = tax_status(record, today)
+        alert = _expiry_alert(vehicle_number, "tax", "Tax", status, remaining_days, record.tax_expiry_date)
+        if alert:
+            alerts.append(alert)
+
+    last_services = db.query(MechanicEntry.vehicle_number, func.max(MechanicEntry.service_date))
+    if vehicle_numbers is not None:
+        last_services = last_services.filter(MechanicEntry.vehicle_number.in_(vehicle_numbers))
+    for vehicle_number, last_service_date in last_services.group_by(MechanicEntry.vehicle_number).all():
+        if not vehicle_number or not last_service_date:
+            continue
+        due_date = last_service_date + timedelta(days=SERVICE_INTERVAL_DAYS)
+        remaining_days = (due_date - today).days
+        if remaining_days < 0:
+            severity, message = "danger", "Service overdue"
+        elif remaining_days <= SERVICE_WARNING_DAYS:
+            severity, message = "warning", f"Service due in {remaining_days} day(s)"
+        else:
+            continue
+        alerts.append(
+            {
+                "vehicle_number": vehicle_number,
+                "alert_type": "service",
+                "severity": severity,
+                "message": message,
+                "remaining_days": remaining_days,
+                "due_date": due_date,
+            }
+        )
+    return alerts
+
+
+def _upsert_alerts(db: Session, alerts: list[dict]) -> None:
+    statement = _UPSERT_DIALECTS[db.get_bind().dialect.name].insert(FleetAlert)
+    statement = statement.on_conflict_do_update(
+        index_elements=[FleetAlert.vehicle_number, FleetAlert.alert_type],
+        set_={
+            "severity": statement.excluded.severity,
+            "message": statement.excluded.message,
+            "remaining_days": statement.excluded.remaining_days,
+            "due_date": statement.excluded.due_date,
+            "refreshed_at": func.now(),
+        },
+    )
+    db.execute(statement, alerts)
+
+
+def refresh_vehicle_alerts(db: Session, vehicle_numbers: list[str] | None = None) -> int:
+    """
+    Bring the stored alerts of the given vehicles (every vehicle when None) up to date. The caller commits.
+
+    Rows are upserted on (vehicle_number, alert_type) and only pairs that no
+    longer apply are deleted, so concurrent refreshes of the same vehicle
+    wait on each other's rows instead of colliding on the unique constraint.
+    """
+    db.flush()
+    # Sorted so concurrent refreshes lock rows in the same order.
+    alerts = sorted(
+        compute_vehicle_alerts(db, date.today(), vehicle_numbers),
+        key=lambda alert: (alert["vehicle_number"], alert["alert_type"]),
+    )
+    if alerts:
+        _upsert_alerts(db, alerts)
+    statement = delete(FleetAlert)
+    if vehicle_numbers is not None:
+        statement = statement.where(FleetAlert.vehicle_number.in_(vehicle_numbers))
+    if alerts:
+        current = [(alert["vehicle_number"], alert["alert_type"]) for alert in alerts]
+        statement = statement.where(tuple_(FleetAlert.vehicle_number, FleetAlert.alert_type).not_in(current))
+    db.execute(statement)
+    return len(alerts)
+
+
+def rebuild_fleet_alerts(db: Session) -> int:
+    """Recompute every vehicle's alerts and commit. Returns the alert count."""
+    started = time.perf_counter()
+    count = refresh_vehicle_alerts(db)
+    db.commit()
+    logger.info("Rebuilt %d fleet alerts in %.3fs", count, time.perf_counter() - started)
+    return count
+
+
+def vehicle_alerts(db: Session, vehicle_number: str, alert_types: tuple[str, ...] | None = None) -> list[FleetAlert]:
+    query = db.query(FleetAlert).filter(FleetAlert.vehicle_number == vehicle_number)
+    if alert_types is not None:
+        query = query.filter(FleetAlert.alert_type.in_(alert_types))
+    order = case({alert_type: position for position, alert_type in enumerate(ALERT_TYPES)}, value=FleetAlert.alert_type)
+    return query.order_by(order, FleetAlert.id).all()
+
+
+def fleet_alert_cards(db: Session, alert_types: tuple[str, ...], limit: int) -> list[dict]:
+    rows = (
+        db.query(FleetAlert)
+        .filter(FleetAlert.alert_type.in_(alert_types))
+        .order_by(FleetAlert.alert_type, FleetAlert.remaining_days, FleetAlert.vehicle_number)
+        .limit(limit)
+        .all()
+    )
+    return [
+        {
+            "type": row.alert_type,
+            "vehicle_number": row.vehicle_number,
+            "severity": row.severity,
+            "message": row.message,
+            "remaining_days": row.remaining_days,
+        }
+        for row in rows
+    ]
+
+
+def _run_rebuild() -> None:
+    db = SessionLocal()
+    try:
+        rebuild_fleet_alerts(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def start_fleet_alert_job(interval_seconds: float = REFRESH_INTERVAL_SECONDS) -> threading.Event:
+    """
+    Rebuild fleet alerts now and then every ``interval_seconds`` on a daemon thread.
+
+    Day counts in alert messages age with the calendar, so the table is rebuilt
+    on a timer as well as on writes. Every web worker starts the job, but only
+    the one holding the advisory lock rebuilds: it keeps the lock for as long as
+    the job runs, and the others retry once per interval, so one of them takes
+    over if the leader's process exits. Set the returned event to stop the job;
+    a non-positive interval disables it.
+    """
+    stop = threading.Event()
+    if interval_seconds <= 0:
+        return stop
+
+    def lead() -> None:
+        while not stop.is_set():
+            try:
+                _run_rebuild()
+            except Exception:
+                logger.exception("Fleet alert refresh failed")
+            stop.wait(interval_seconds)
+
+    def run() -> None:
+        while not stop.is_set():
+            try:
+                with advisory_lock(engine, REFRESH_LOCK_ID, wait=False) as leader:
+                    if leader:
+                        lead()
+            except Exception:
+                logger.exception("Fleet alert leader lock failed")
+            stop.wait(interval_seconds)
+
+    threading.Thread(target=run, name="fleet-alert-refresh", daemon=True).start()
+    return stop
@@ -4,10 +4,14 @@ from fastapi import HTTPException
 from app.models.fuel import Fuel
 from app.models.vehicle import Vehicle
 from app.schemas.fuel import FuelCreate
+from app.services.financial_rollup_service import record_fuel
+from app.services.vehicle_snapshot_service import record_vehicle_fuel
+from app.services.vehicle_service import normalize_vehicle_number
 
 def add_fuel(db: Session, data: FuelCreate):
+    vehicle_number = normalize_vehicle_number(data.vehicle_number)
     vehicle = db.query(Vehicle).filter(
-        Vehicle.vehicle_number == data.vehicle_number
+        Vehicle.vehicle_number == vehicle_number
     ).first()
 
     if not vehicle:
@@ -16,7 +20,7 @@ def add_fuel(db: Session, data: FuelCreate):
     total_cost = data.quantity * data.rate_per_litre
 
     fuel = Fuel(
-        vehicle_number=data.vehicle_number,
+        vehicle_number=vehicle_number,
         fuel_type=data.fuel_type,
         quantity=data.quantity,
         rate_per_litre=data.rate_per_litre,
@@ -26,6 +30,8 @@ def add_fuel(db: Session, data: FuelCreate):
     )
 
     db.add(fuel)
+    record_fuel(db, fuel)
+    record_vehicle_fuel(db, fuel)
     db.commit()
     db.refresh(fuel)
     return fuel
@@ -33,7 +39,7 @@ def add_fuel(db: Session, data: FuelCreate):
 
 def fuel_history_by_vehicle(db: Session, vehicle_number: str):
     return db.query(Fuel).filter(
-        Fuel.vehicle_number == vehicle_number
+        Fuel.vehicle_number == normalize_vehicle_number(vehicle_number)
     ).order_by(Fuel.filled_date.desc()).all()
 
 
@@ -56,14 +62,30 @@ def update_fuel(db: Session, fuel_id: int, data):
     if not fuel:
         return None
 
-    fuel.vehicle_number = data.vehicle_number
+    record_fuel(db, fuel, sign=-1)
+    record_vehicle_fuel(db, fuel, sign=-1)
+    fuel.vehicle_number = normalize_vehicle_number(data.vehicle_number)
     fuel.fuel_type = data.fuel_type
     fuel.quantity = data.quantity
     fuel.rate_per_litre = data.rate_per_litre
     fuel.total_cost = data.quantity * data.rate_per_litre
     fuel.filled_date = data.filled_date
     fuel.vendor = data.vendor
+    record_fuel(db, fuel)
+    record_vehicle_fuel(db, fuel)
 
     db.commit()
     db.refresh(fuel)
-    return fuel
\ No newline at end of file
+    return fuel
+
+
+def delete_fuel(db: Session, fuel_id: int):
+    fuel = get_fuel_by_id(db, fuel_id)
+    if not fuel:
+        return None
+
+    record_fuel(db, fuel, sign=-1)
+    record_vehicle_fuel(db, fuel, sign=-1)
+    db.delete(fuel)
+    db.commit()
+    return fuel
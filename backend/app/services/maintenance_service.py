@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from fastapi import HTTPException
 from datetime import datetime, timedelta
 
 from app.models.spare_part import SparePart
 from app.models.vehicle import Vehicle
 from app.models.maintenance import Maintenance, MaintenanceType
+from app.services.financial_rollup_service import record_maintenance, record_spare_part
+from app.services.spare_part_service import add_maintenance_cost
+from app.services.vehicle_snapshot_service import record_vehicle_spare_part
+from app.services.vehicle_service import normalize_vehicle_number
 
 
 # ===============================
@@ -14,17 +17,20 @@ from app.models.maintenance import Maintenance, MaintenanceType
 
 def add_spare_part(db: Session, data):
     vehicle = db.query(Vehicle).filter(
-        func.lower(Vehicle.vehicle_number) == data.vehicle_number.lower()
+        Vehicle.vehicle_number == normalize_vehicle_number(data.vehicle_number)
     ).first()
 
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
     spare = SparePart(**data.dict())
+    spare.vehicle_number = vehicle.vehicle_number
     db.add(spare)
 
     # 🔥 CONNECT TO VEHICLE SUMMARY
-    vehicle.total_maintenance_cost += data.cost * data.quantity
+    add_maintenance_cost(db, vehicle.vehicle_number, data.cost * data.quantity)
+    record_spare_part(db, spare)
+    record_vehicle_spare_part(db, spare)
 
     db.commit()
     db.refresh(spare)
@@ -34,7 +40,7 @@ def add_spare_part(db: Session, data):
 def spare_parts_by_vehicle(db: Session, vehicle_number: str):
     return (
         db.query(SparePart)
-        .filter(func.lower(SparePart.vehicle_number) == vehicle_number.lower())
+        .filter(SparePart.vehicle_number == normalize_vehicle_number(vehicle_number))
         .order_by(SparePart.replaced_date.desc())
         .all()
     )
@@ -46,7 +52,7 @@ def spare_parts_by_vehicle(db: Session, vehicle_number: str):
 
 def add_maintenance(db: Session, data):
     vehicle = db.query(Vehicle).filter(
-        func.lower(Vehicle.vehicle_number) == data.vehicle_number.lower()
+        Vehicle.vehicle_number == normalize_vehicle_number(data.vehicle_number)
     ).first()
 
     if not vehicle:
@@ -56,7 +62,9 @@ def add_maintenance(db: Session, data):
         raise HTTPException(status_code=400, detail="End date cannot be before start date")
 
     maintenance = Maintenance(**data.dict())
+    maintenance.vehicle_number = vehicle.vehicle_number
     db.add(maintenance)
+    record_maintenance(db, maintenance)
     db.commit()
     db.refresh(maintenance)
     return maintenance
@@ -68,7 +76,7 @@ def get_maintenance_by_vehicle(
     maintenance_type: MaintenanceType = None
 ):
     query = db.query(Maintenance).filter(
-        func.lower(Maintenance.vehicle_number) == vehicle_number.lower()
+        Maintenance.vehicle_number == normalize_vehicle_number(vehicle_number)
     )
 
     if maintenance_type:
@@ -106,8 +114,12 @@ def update_maintenance(db: Session, maintenance_id: int, data):
     if end_date and start_date and end_date < start_date:
         raise HTTPException(status_code=400, detail="End date cannot be before start date")
 
+    record_maintenance(db, maintenance, sign=-1)
     for field, value in data.dict(exclude_unset=True).items():
+        if field == "vehicle_number" and value:
+            value = normalize_vehicle_number(value)
         setattr(maintenance, field, value)
+    record_maintenance(db, maintenance)
 
     db.commit()
     db.refresh(maintenance)
@@ -120,6 +132,7 @@ def delete_maintenance(db: Session, maintenance_id: int):
     if not maintenance:
         raise HTTPException(status_code=404, detail="Maintenance record not found")
 
+    record_maintenance(db, maintenance, sign=-1)
     db.delete(maintenance)
     db.commit()
     return {"message": "Maintenance record deleted"}
@@ -150,7 +163,31 @@ def calculate_monthly_maintenance_cost(
     current_date = datetime(year, month, 1)
 
     maintenances = get_maintenance_by_vehicle(db, vehicle_number)
+    return _monthly_cost_of(maintenances, current_date)
 
+
+def calculate_fleet_monthly_maintenance_cost(
+    db: Session,
+    vehicle_numbers: list[str],
+    year: int = None,
+    month: int = None
+) -> dict[str, float]:
+    """Monthly maintenance cost per vehicle (keyed by normalized number) in one query."""
+    if year is None:
+        year = datetime.now().year
+    if month is None:
+        month = datetime.now().month
+
+    current_date = datetime(year, month, 1)
+    keys = [normalize_vehicle_number(number) for number in vehicle_numbers]
+    by_vehicle: dict[str, list[Maintenance]] = {key: [] for key in keys}
+    if keys:
+        for maintenance in db.query(Maintenance).filter(Maintenance.vehicle_number.in_(keys)).all():
+            by_vehicle[maintenance.vehicle_number].append(maintenance)
+    return {key: _monthly_cost_of(records, current_date) for key, records in by_vehicle.items()}
+
+
+def _monthly_cost_of(maintenances, current_date: datetime) -> float:
     total_cost = 0.0
 
     for maintenance in maintenances:
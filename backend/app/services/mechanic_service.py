@@ -1,11 +1,19 @@
 from sqlalchemy.orm import Session
 from app.models.mechanic import MechanicEntry
 from app.schemas.mechanic import MechanicCreate
+from app.services.fleet_alert_service import refresh_vehicle_alerts
+from app.services.financial_rollup_service import record_mechanic_entry
+from app.services.vehicle_snapshot_service import record_vehicle_mechanic_entry
+from app.services.vehicle_service import normalize_vehicle_number
 
 
 def add_mechanic_entry(db: Session, data: MechanicCreate):
     entry = MechanicEntry(**data.model_dump())
+    entry.vehicle_number = normalize_vehicle_number(entry.vehicle_number)
     db.add(entry)
+    record_mechanic_entry(db, entry)
+    record_vehicle_mechanic_entry(db, entry)
+    refresh_vehicle_alerts(db, [entry.vehicle_number])
     db.commit()
     db.refresh(entry)
     return entry
@@ -18,7 +26,7 @@ def get_all_mechanic_entries(db: Session):
 def get_mechanic_by_vehicle(db: Session, vehicle_number: str):
     return (
         db.query(MechanicEntry)
-        .filter(MechanicEntry.vehicle_number == vehicle_number)
+        .filter(MechanicEntry.vehicle_number == normalize_vehicle_number(vehicle_number))
         .order_by(MechanicEntry.service_date.desc())
         .all()
     )
@@ -32,8 +40,15 @@ def update_mechanic_entry(db: Session, entry_id: int, data: MechanicCreate):
     entry = get_mechanic_by_id(db, entry_id)
     if not entry:
         return None
+    previous_vehicle_number = entry.vehicle_number
+    record_mechanic_entry(db, entry, sign=-1)
+    record_vehicle_mechanic_entry(db, entry, sign=-1)
     for key, value in data.model_dump().items():
         setattr(entry, key, value)
+    entry.vehicle_number = normalize_vehicle_number(entry.vehicle_number)
+    record_mechanic_entry(db, entry)
+    record_vehicle_mechanic_entry(db, entry)
+    refresh_vehicle_alerts(db, sorted({previous_vehicle_number, entry.vehicle_number}))
     db.commit()
     db.refresh(entry)
     return entry
@@ -43,6 +58,9 @@ def delete_mechanic_entry(db: Session, entry_id: int):
     entry = get_mechanic_by_id(db, entry_id)
     if not entry:
         return None
+    record_mechanic_entry(db, entry, sign=-1)
+    record_vehicle_mechanic_entry(db, entry, sign=-1)
     db.delete(entry)
+    refresh_vehicle_alerts(db, [entry.vehicle_number])
     db.commit()
     return entry
@@ -10,6 +10,9 @@ from app.models.vendor_payment import VendorPayment
 from app.models.vehicle import Vehicle
 from app.models.vendor import Vendor
 from app.schemas.oil_bill import OilBillCreate
+from app.services.financial_rollup_service import record_oil_bill
+from app.services.vehicle_snapshot_service import record_vehicle_oil_bill
+from app.services.vehicle_service import normalize_vehicle_number
 
 ALLOWED_PAYMENT_STATUS = {"paid", "unpaid", "partial"}
 
@@ -32,14 +35,13 @@ def _validate_vendor(db: Session, vendor_id: int) -> Vendor:
 
 
 def _validate_vehicle(db: Session, vehicle_number: str) -> None:
-    normalized = str(vehicle_number or "").strip().lower()
+    normalized = normalize_vehicle_number(vehicle_number)
     exists = (
         db.query(Vehicle.id)
         .filter(
             Vehicle.is_deleted == False,
-            Vehicle.vehicle_number.isnot(None),
             Vehicle.vehicle_number != "",
-            Vehicle.vehicle_number.ilike(normalized),
+            Vehicle.vehicle_number == normalized,
         )
         .first()
     )
@@ -134,7 +136,7 @@ def create_oil_bill(db: Session, payload: OilBillCreate):
         grand_total += total_amount
         entry_rows.append(
             OilBillEntry(
-                vehicle_number=entry.vehicle_number,
+                vehicle_number=normalize_vehicle_number(entry.vehicle_number),
                 particular_name=(entry.particular_name or "").strip(),
                 liters=float(entry.liters or 0),
                 rate=float(entry.rate or 0),
@@ -157,6 +159,8 @@ def create_oil_bill(db: Session, payload: OilBillCreate):
         entries=entry_rows,
     )
     db.add(bill)
+    record_oil_bill(db, bill)
+    record_vehicle_oil_bill(db, bill)
     db.commit()
     db.refresh(bill)
     bill = (
@@ -231,7 +235,7 @@ def update_oil_bill(db: Session, bill_id: int, payload: OilBillCreate):
         grand_total += total_amount
         new_entries.append(
             OilBillEntry(
-                vehicle_number=entry.vehicle_number,
+                vehicle_number=normalize_vehicle_number(entry.vehicle_number),
                 particular_name=(entry.particular_name or "").strip(),
                 liters=float(entry.liters or 0),
                 rate=float(entry.rate or 0),
@@ -241,6 +245,8 @@ def update_oil_bill(db: Session, bill_id: int, payload: OilBillCreate):
             )
         )
 
+    record_oil_bill(db, bill, sign=-1)
+    record_vehicle_oil_bill(db, bill, sign=-1)
     bill.vendor_id = payload.vendor_id
     bill.bill_number = bill_number
     bill.bill_date = payload.bill_date
@@ -251,6 +257,8 @@ def update_oil_bill(db: Session, bill_id: int, payload: OilBillCreate):
     bill.overall_note = (payload.overall_note or "").strip() or None
     bill.grand_total_amount = grand_total
     bill.entries = new_entries
+    record_oil_bill(db, bill)
+    record_vehicle_oil_bill(db, bill)
 
     db.commit()
     db.refresh(bill)
@@ -261,6 +269,8 @@ def delete_oil_bill(db: Session, bill_id: int):
     bill = db.query(OilBill).filter(OilBill.id == bill_id).first()
     if not bill:
         return None
+    record_oil_bill(db, bill, sign=-1)
+    record_vehicle_oil_bill(db, bill, sign=-1)
     db.delete(bill)
     db.commit()
     return bill
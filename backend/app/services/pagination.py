@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque, URL-safe token for a keyset position (dates are stored as ISO strings)."""
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def descending_after(sort_column, id_column, sort_value, id_value):
+    """Rows strictly after (sort_value, id_value) in ``ORDER BY sort DESC, id DESC`` order."""
+    return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < id_value))
+
+
+def ascending_after(sort_column, id_column, sort_value, id_value):
+    """Rows strictly after (sort_value, id_value) in ``ORDER BY sort, id`` order."""
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > id_value))
+
+
+def paginate_descending(query, sort_column, id_column, *, limit: int | None, after: tuple | None = None):
+    """
+    Keyset-paginate a query newest first (``ORDER BY sort DESC, id DESC``).
+
+    ``after`` is the decoded ``(sort_value, id)`` of the previous page's last
+    row. Returns ``(rows, has_more)``; without a limit every row is returned.
+    """
+    if after is not None:
+        query = query.filter(descending_after(sort_column, id_column, *after))
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if limit is None:
+        return query.all(), False
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def paginate_ascending(query, sort_column, id_column, *, limit: int | None, after: tuple | None = None):
+    """Keyset-paginate a query oldest first (``ORDER BY sort, id``); see paginate_descending."""
+    if after is not None:
+        query = query.filter(ascending_after(sort_column, id_column, *after))
+    query = query.order_by(sort_column.asc(), id_column.asc())
+    if limit is None:
+        return query.all(), False
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.models.payment import Payment
 from app.models.trip import Trip
 from app.schemas.payment import PaymentCreate
+from app.services.financial_rollup_service import record_trip
 from fastapi import HTTPException
 
 
@@ -37,8 +38,10 @@ def create_payment(db: Session, payment: PaymentCreate):
     db.flush()
 
     # 5️⃣ Update trip amounts
+    record_trip(db, trip, party_fuel_credit, sign=-1)
     trip.amount_received = received + payment.amount
     trip.calculate_pending_amount()
+    record_trip(db, trip, party_fuel_credit)
 
     db.commit()
     db.refresh(db_payment)
@@ -69,10 +72,12 @@ def delete_payment(db: Session, payment_id: int):
 
     trip = db.query(Trip).filter(Trip.id == payment.trip_id).first()
     if trip:
+        record_trip(db, trip, sign=-1)
         trip.amount_received = max(
             0, (trip.amount_received or 0) - payment.amount
         )
         trip.calculate_pending_amount()
+        record_trip(db, trip)
 
     db.delete(payment)
     db.commit()
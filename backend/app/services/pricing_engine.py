@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+def _value(item, key, default=None):
+    """Read ``key`` from a dict (stored rows, validated entries) or an object (request schemas)."""
+    if isinstance(item, dict):
+        return item.get(key, default)
+    return getattr(item, key, default)
+
+
+def calculate_trip_days(departure_datetime, return_datetime):
+    """Calendar days the trip spans; raises ValueError when it returns before it departs."""
+    if not departure_datetime or not return_datetime:
+        return 1
+    if return_datetime < departure_datetime:
+        raise ValueError("Return date/time cannot be before departure date/time")
+    return (return_datetime.date() - departure_datetime.date()).days + 1
+
+
+def calculate_base_pricing(pricing_type, package_amount, trip_days, distance_km, cost_per_km, number_of_vehicles):
+    base_amount = (
+        package_amount
+        if pricing_type == "package"
+        else (distance_km or 0) * cost_per_km
+    )
+    return base_amount * number_of_vehicles
+
+
+def calculate_vehicle_base_pricing(trip_vehicles, default_pricing_type, default_package_amount, default_cost_per_km):
+    total = 0
+    for entry in trip_vehicles or []:
+        pricing_type = entry.get("pricing_type") or default_pricing_type
+        package_amount = entry.get("package_amount")
+        cost_per_km = entry.get("cost_per_km")
+        distance_km = entry.get("distance_km") or 0
+
+        package_value = default_package_amount if package_amount is None else package_amount
+        rate_value = default_cost_per_km if cost_per_km is None else cost_per_km
+
+        if pricing_type == "package":
+            total += package_value or 0
+        else:
+            total += (distance_km or 0) * (rate_value or 0)
+    return total
+
+
+def item_amount(item):
+    amount = _value(item, "amount")
+    return amount if amount else (_value(item, "quantity") or 1) * (_value(item, "rate") or 0)
+
+
+def calculate_pricing_items_total(pricing_items, number_of_vehicles):
+    return sum(item_amount(item) for item in pricing_items) * number_of_vehicles
+
+
+def calculate_total_fuel_cost(trip_vehicles, default_diesel_used=0, default_petrol_used=0):
+    if trip_vehicles:
+        total = 0
+        for entry in trip_vehicles:
+            fuel_cost = entry.get("fuel_cost", 0) or 0
+            if fuel_cost > 0:
+                total += fuel_cost
+                continue
+            total += (entry.get("diesel_used", 0) or 0) + (entry.get("petrol_used", 0) or 0)
+        return total
+    return (default_diesel_used or 0) + (default_petrol_used or 0)
+
+
+def calculate_party_fuel_credit(trip_vehicles):
+    total = 0
+    for entry in trip_vehicles or []:
+        total += entry.get("vendor_deduction_amount", 0) or 0
+        total += sum((_value(exp, "amount", 0) or 0) for exp in entry.get("expenses", []))
+    return total
+
+
+@dataclass(frozen=True)
+class TripPricing:
+    total_charged: float
+    pending_amount: float
+    party_fuel_credit: float
+
+
+def price_trip(trip, trip_vehicles, pricing_items, charge_items, number_of_vehicles) -> TripPricing:
+    """
+    Price one trip from plain inputs, with no database access.
+
+    ``trip`` is anything carrying the trip's pricing fields (a TripCreate, a
+    Trip row or a dict), ``trip_vehicles`` are vehicle entry dicts with their
+    ``expenses``, and the item lists hold pricing/charge items as objects or
+    dicts. ``number_of_vehicles`` is the count stored on the trip. Both the
+    trip service and the recalculation job price trips through here. Trips
+    that cannot be priced raise ValueError.
+    """
+    trip_days = calculate_trip_days(_value(trip, "departure_datetime"), _value(trip, "return_datetime"))
+    if trip_vehicles:
+        base_pricing_total = calculate_vehicle_base_pricing(
+            trip_vehicles,
+            _value(trip, "pricing_type"),
+            _value(trip, "package_amount"),
+            _value(trip, "cost_per_km"),
+        )
+    else:
+        base_pricing_total = calculate_base_pricing(
+            _value(trip, "pricing_type"),
+            _value(trip, "package_amount") or 0,
+            trip_days,
+            _value(trip, "distance_km") or 0,
+            _value(trip, "cost_per_km") or 0,
+            number_of_vehicles,
+        )
+    total_charged = (
+        base_pricing_total +
+        calculate_pricing_items_total(pricing_items, number_of_vehicles) +
+        (_value(trip, "charged_toll_amount") or 0) +
+        (_value(trip, "charged_parking_amount") or 0) +
+        sum(item_amount(item) for item in charge_items) +
+        (_value(trip, "other_expenses") or 0) -
+        (_value(trip, "discount_amount") or 0)
+    )
+    party_fuel_credit = calculate_party_fuel_credit(trip_vehicles)
+    pending_amount = max(total_charged - ((_value(trip, "amount_received") or 0) + party_fuel_credit), 0)
+    return TripPricing(total_charged, pending_amount, party_fuel_credit)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+
+
+_DIRTY_KEY = "response_cache_dirty"
+_VERSION_ROW_ID = 1
+_UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
+# Engines whose database is known to have the data_version table.
+_versioned_engines: weakref.WeakSet = weakref.WeakSet()
+
+
+def _has_version_table(session: Session) -> bool:
+    # Migrations that run before the table exists commit through sessions too.
+    engine = session.get_bind()
+    if engine in _versioned_engines:
+        return True
+    if inspect(session.connection()).has_table(DataVersion.__tablename__):
+        _versioned_engines.add(engine)
+        return True
+    return False
+
+
+def read_data_version(db: Session) -> int:
+    """The shared data version, as committed by any worker process."""
+    if not _has_version_table(db):
+        return 0
+    return db.execute(select(DataVersion.version).where(DataVersion.id == _VERSION_ROW_ID)).scalar() or 0
+
+
+def bump_data_version(db: Session) -> None:
+    """Increment the shared data version inside the caller's transaction."""
+    if not _has_version_table(db):
+        return
+    table = DataVersion.__table__
+    statement = _UPSERT_DIALECTS[db.get_bind().dialect.name].insert(table).values(id=_VERSION_ROW_ID, version=1)
+    # Executed on the connection so the bump itself does not mark the session dirty again.
+    db.connection().execute(
+        statement.on_conflict_do_update(index_elements=[table.c.id], set_={"version": table.c.version + 1})
+    )
+
+
+class ResponseCache:
+    """
+    Bounded in-process LRU for computed endpoint payloads.
+
+    Keys are combined with the data version read from the database, so a write
+    committed by any worker process makes older entries unreachable; they then
+    age out through LRU eviction. The TTL only bounds how long an entry lives.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 30.0):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def data_version(self) -> int:
+        """The data version seen by the most recent lookup."""
+        return self._version
+
+    def get_or_compute(self, db: Session | None, key: Hashable, compute: Callable[[], Any]) -> Any:
+        # The version is read before computing, so a write that lands mid-compute
+        # stores the result under the old version and the next read recomputes.
+        # Without a session only the TTL limits staleness.
+        version = read_data_version(db) if db is not None else self._version
+        self._version = version
+        versioned_key = (key, version)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(versioned_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(versioned_key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[versioned_key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(versioned_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "data_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30")),
+)
+
+
+# Every write service commits through a Session, so the data version is bumped
+# from session events instead of a call in each service. The bump runs in the
+# committing transaction: it is shared by all workers and rolled back with it.
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_changes(session, _flush_context):
+    session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_changes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session):
+    # Pending objects are only flushed after this hook, so flush them here to see them.
+    session.flush()
+    if session.info.pop(_DIRTY_KEY, False):
+        bump_data_version(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -2,21 +2,31 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.spare_part import SparePart
 from app.models.vehicle import Vehicle
+from app.services.financial_rollup_service import apply_row_deltas, record_spare_part
+from app.services.vehicle_snapshot_service import record_vehicle_spare_part
+from app.services.vehicle_service import normalize_vehicle_number
+
+
+def add_maintenance_cost(db: Session, vehicle_number: str, delta: float) -> None:
+    apply_row_deltas(db, Vehicle.__table__, "vehicle_number", {vehicle_number: {"total_maintenance_cost": delta}})
 
 
 # ---------------- ADD ----------------
 def add_spare_part(db: Session, data):
     vehicle = db.query(Vehicle).filter(
-        Vehicle.vehicle_number == data.vehicle_number
+        Vehicle.vehicle_number == normalize_vehicle_number(data.vehicle_number)
     ).first()
 
     if not vehicle:
         raise HTTPException(404, "Vehicle not found")
 
     spare = SparePart(**data.dict())
+    spare.vehicle_number = vehicle.vehicle_number
     db.add(spare)
 
-    vehicle.total_maintenance_cost += data.cost * data.quantity
+    add_maintenance_cost(db, vehicle.vehicle_number, data.cost * data.quantity)
+    record_spare_part(db, spare)
+    record_vehicle_spare_part(db, spare)
 
     db.commit()
     db.refresh(spare)
@@ -25,25 +35,25 @@ def add_spare_part(db: Session, data):
 
 # ---------------- UPDATE ----------------
 def update_spare_part(db: Session, spare_id: int, data):
-    spare = db.query(SparePart).filter(SparePart.id == spare_id).first()
+    # Locked so the old cost stays valid until the vehicle delta commits.
+    spare = db.query(SparePart).filter(SparePart.id == spare_id).with_for_update().first()
     if not spare:
         raise HTTPException(404, "Spare part not found")
 
-    vehicle = db.query(Vehicle).filter(
-        Vehicle.vehicle_number == spare.vehicle_number
-    ).first()
-
     old_cost = spare.cost * spare.quantity
     new_cost = data.cost * data.quantity
 
+    record_spare_part(db, spare, sign=-1)
+    record_vehicle_spare_part(db, spare, sign=-1)
     spare.part_name = data.part_name
     spare.cost = data.cost
     spare.quantity = data.quantity
     spare.vendor = data.vendor
     spare.replaced_date = data.replaced_date
 
-    if vehicle:
-        vehicle.total_maintenance_cost += (new_cost - old_cost)
+    add_maintenance_cost(db, spare.vehicle_number, new_cost - old_cost)
+    record_spare_part(db, spare)
+    record_vehicle_spare_part(db, spare)
 
     db.commit()
     db.refresh(spare)
@@ -52,17 +62,14 @@ def update_spare_part(db: Session, spare_id: int, data):
 
 # ---------------- DELETE ----------------
 def delete_spare_part(db: Session, spare_id: int):
-    spare = db.query(SparePart).filter(SparePart.id == spare_id).first()
+    spare = db.query(SparePart).filter(SparePart.id == spare_id).with_for_update().first()
     if not spare:
         raise HTTPException(404, "Spare part not found")
 
-    vehicle = db.query(Vehicle).filter(
-        Vehicle.vehicle_number == spare.vehicle_number
-    ).first()
-
-    if vehicle:
-        vehicle.total_maintenance_cost -= spare.cost * spare.quantity
+    add_maintenance_cost(db, spare.vehicle_number, -spare.cost * spare.quantity)
 
+    record_spare_part(db, spare, sign=-1)
+    record_vehicle_spare_part(db, spare, sign=-1)
     db.delete(spare)
     db.commit()
     return {"message": "Spare part deleted"}
@@ -72,7 +79,7 @@ def delete_spare_part(db: Session, spare_id: int):
 def spare_parts_by_vehicle(db: Session, vehicle_number: str):
     return (
         db.query(SparePart)
-        .filter(SparePart.vehicle_number == vehicle_number)
+        .filter(SparePart.vehicle_number == normalize_vehicle_number(vehicle_number))
         .order_by(SparePart.replaced_date.desc())
         .all()
     )
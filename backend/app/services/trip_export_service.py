@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections import defaultdict
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models.trip import Trip
+from app.models.trip_vehicle import TripVehicle
+from app.services.trip_service import _trip_list_criteria
+
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_TRIP_COLUMNS = list(Trip.__table__.columns)
+_LINE_COLUMNS = [column for column in TripVehicle.__table__.columns if column.key != "trip_id"]
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _trip_batches(db, criteria):
+    """
+    Yield (trips, vehicle lines by trip id) one batch at a time.
+
+    Trips are read through ``yield_per`` (a server-side cursor on Postgres),
+    and each batch's vehicle lines come from one IN query, so only a single
+    batch is ever held in memory.
+    """
+    trips = db.execute(
+        select(*_TRIP_COLUMNS)
+        .where(*criteria)
+        .order_by(Trip.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    ).mappings()
+    for batch in trips.partitions():
+        lines = defaultdict(list)
+        for line in db.execute(
+            select(TripVehicle.trip_id, *_LINE_COLUMNS)
+            .where(TripVehicle.trip_id.in_([trip["id"] for trip in batch]))
+            .order_by(TripVehicle.id)
+        ).mappings():
+            lines[line["trip_id"]].append(line)
+        yield batch, lines
+
+
+def _ndjson_chunks(batches):
+    for trips, lines in batches:
+        yield "".join(
+            json.dumps(
+                {
+                    **{key: _plain(value) for key, value in trip.items()},
+                    "vehicles": [
+                        {column.key: _plain(line[column.key]) for column in _LINE_COLUMNS}
+                        for line in lines.get(trip["id"], [])
+                    ],
+                }
+            )
+            + "\n"
+            for trip in trips
+        )
+
+
+def _csv_chunks(batches):
+    """One CSV row per vehicle line; trips without lines get a single row with empty line columns."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in _TRIP_COLUMNS] + [f"line_{column.key}" for column in _LINE_COLUMNS])
+    empty_line = [None] * len(_LINE_COLUMNS)
+    for trips, lines in batches:
+        for trip in trips:
+            trip_values = [_plain(trip[column.key]) for column in _TRIP_COLUMNS]
+            trip_lines = lines.get(trip["id"])
+            if not trip_lines:
+                writer.writerow(trip_values + empty_line)
+            for line in trip_lines or []:
+                writer.writerow(trip_values + [_plain(line[column.key]) for column in _LINE_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _stream(session_factory, chunks, criteria):
+    db = session_factory()
+    try:
+        yield from chunks(_trip_batches(db, criteria))
+    finally:
+        db.close()
+
+
+def export_trips(session_factory, export_format: str = "ndjson", **filters):
+    """
+    Export every trip matching ``filters`` (see list_trips) with its vehicle lines.
+
+    Filters are checked up front; the returned generator yields NDJSON or CSV
+    text chunks and opens its own session from ``session_factory``, because
+    it runs after the request's dependencies have been torn down.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(400, f"Invalid export format; use one of {', '.join(EXPORT_FORMATS)}")
+    criteria = _trip_list_criteria(**filters)
+    return _stream(session_factory, _csv_chunks if export_format == "csv" else _ndjson_chunks, criteria)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections import defaultdict
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.customer import Customer
+from app.models.trip import Trip
+from app.models.trip_driver_change import TripDriverChange
+from app.models.trip_pricing_item import TripPricingItem
+from app.schemas.trip import TripCreate
+from app.services.document_number_service import is_duplicate_number, next_document_numbers
+from app.services.financial_rollup_service import record_trips
+from app.services.pricing_engine import calculate_party_fuel_credit
+from app.services.trip_service import (
+    apply_trip_counters,
+    build_trip,
+    check_new_trip,
+    check_trip_vehicles,
+    customer_trip_deltas,
+    driver_change_values,
+    insert_trip_vehicles,
+    normalize_trip_vehicles,
+    pricing_item_values,
+    trip_vehicle_references,
+    trip_vehicle_values,
+)
+from app.services.vehicle_snapshot_service import record_vehicle_trips
+
+
+IMPORT_CHUNK_SIZE = 1000
+# CSV cells holding nested lists are JSON encoded, e.g. vehicles='[{"vehicle_number": ...}]'.
+_JSON_COLUMNS = ("pricing_items", "charge_items", "driver_changes", "vehicles")
+
+
+def _chunks(values: list, size: int = IMPORT_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _parse_jsonl(text: str) -> list[tuple[int, dict | None, str | None]]:
+    rows = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as exc:
+            rows.append((line_number, None, f"Invalid JSON: {exc.msg}"))
+            continue
+        if not isinstance(data, dict):
+            rows.append((line_number, None, "Each line must be a JSON object"))
+            continue
+        rows.append((line_number, data, None))
+    return rows
+
+
+def _parse_csv(text: str) -> list[tuple[int, dict | None, str | None]]:
+    rows = []
+    # Row numbers count the header as row 1, matching what spreadsheets show.
+    for row_number, record in enumerate(csv.DictReader(io.StringIO(text)), 2):
+        data = {}
+        error = None
+        for column, value in record.items():
+            value = value.strip() if isinstance(value, str) else None
+            if not column or not value:
+                continue
+            column = column.strip()
+            if column in _JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except json.JSONDecodeError:
+                    error = f"Invalid JSON in column {column}"
+                    break
+            data[column] = value
+        if error:
+            rows.append((row_number, data, error))
+        elif data:
+            rows.append((row_number, data, None))
+    return rows
+
+
+def parse_trip_rows(content: bytes, filename: str | None = None) -> list[tuple[int, dict | None, str | None]]:
+    """
+    Split a JSON-lines or CSV upload into (row number, data, parse error) tuples.
+
+    The format follows the file extension (.csv, or .jsonl/.ndjson/.json);
+    without one, a file whose first character is ``{`` is read as JSON lines.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(400, "File must be UTF-8 encoded")
+
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        rows = _parse_csv(text)
+    elif name.endswith((".jsonl", ".ndjson", ".json")) or text.lstrip().startswith("{"):
+        rows = _parse_jsonl(text)
+    else:
+        rows = _parse_csv(text)
+    if not rows:
+        raise HTTPException(400, "File contains no trips")
+    return rows
+
+
+def _row_error(row: int, data, messages: list[str]) -> dict:
+    invoice_number = data.get("invoice_number") if isinstance(data, dict) else None
+    return {
+        "row": row,
+        "invoice_number": str(invoice_number) if invoice_number is not None else None,
+        "errors": messages,
+    }
+
+
+def _existing_invoice_numbers(db: Session, invoice_numbers: set[str]) -> set[str]:
+    existing = set()
+    for chunk in _chunks(sorted(invoice_numbers)):
+        existing.update(number for (number,) in db.query(Trip.invoice_number).filter(Trip.invoice_number.in_(chunk)))
+    return existing
+
+
+def _existing_customer_ids(db: Session, customer_ids: set[int]) -> set[int]:
+    existing = set()
+    for chunk in _chunks(sorted(customer_ids)):
+        existing.update(customer_id for (customer_id,) in db.query(Customer.id).filter(Customer.id.in_(chunk)))
+    return existing
+
+
+def _rejected_chunk_errors(db: Session, chunk: list[tuple[int, dict, TripCreate, list, Trip]]) -> list[dict]:
+    # Another request stored one of the chunk's invoice numbers after the file was checked.
+    typed = {(trip_data.invoice_number or "").strip() for _, _, trip_data, _, _ in chunk} - {""}
+    taken = _existing_invoice_numbers(db, typed)
+    return [
+        _row_error(
+            row,
+            data,
+            ["Invoice number already exists"]
+            if (trip_data.invoice_number or "").strip() in taken
+            else ["Not imported: another row in the same chunk has an invoice number that was taken during the import"],
+        )
+        for row, data, trip_data, _, _ in chunk
+    ]
+
+
+def _insert_chunk(db: Session, chunk: list[tuple[int, dict, TripCreate, list, Trip]]) -> list[dict]:
+    """Insert and commit one chunk; when a taken invoice number rejects it, roll it back and return row errors."""
+    trips = [trip for *_, trip in chunk]
+    unnumbered = [trip for trip in trips if not trip.invoice_number]
+    for trip, number in zip(unnumbered, next_document_numbers(db, "invoice", [trip.trip_date for trip in unnumbered])):
+        trip.invoice_number = number
+    db.add_all(trips)
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_duplicate_number(exc, "invoice_number"):
+            return _rejected_chunk_errors(db, chunk)
+        raise
+
+    vehicle_entries = []
+    pricing_items = []
+    driver_changes = []
+    customer_deltas = defaultdict(lambda: {"total_trips": 0, "total_billed": 0, "pending_balance": 0})
+    vehicle_deltas = defaultdict(lambda: {"total_trips": 0, "total_km": 0})
+    for _, _, trip_data, validated_trip_vehicles, trip in chunk:
+        for entry in validated_trip_vehicles:
+            vehicle_entries.append((trip_vehicle_values(trip.id, entry), entry["expenses"]))
+            vehicle_deltas[entry["vehicle_number"]]["total_trips"] += 1
+            vehicle_deltas[entry["vehicle_number"]]["total_km"] += entry["distance_km"] or 0
+        pricing_items.extend(
+            pricing_item_values(trip.id, trip_data.pricing_items or [], trip_data.charge_items or [])
+        )
+        driver_changes.extend(driver_change_values(trip.id, trip_data.driver_changes or [], validated_trip_vehicles))
+        for name, delta in customer_trip_deltas(trip).items():
+            customer_deltas[trip.customer_id][name] += delta
+
+    insert_trip_vehicles(db, vehicle_entries)
+    if pricing_items:
+        db.execute(insert(TripPricingItem), pricing_items)
+    if driver_changes:
+        db.execute(insert(TripDriverChange), driver_changes)
+
+    apply_trip_counters(db, customer_deltas, vehicle_deltas)
+
+    record_trips(
+        db,
+        [(trip, calculate_party_fuel_credit(validated_trip_vehicles)) for *_, validated_trip_vehicles, trip in chunk],
+    )
+    record_vehicle_trips(db, [trip.id for trip in trips])
+    db.commit()
+    return []
+
+
+def import_trips(db: Session, rows: list[tuple[int, dict | None, str | None]]) -> dict:
+    """
+    Create trips from parsed upload rows and report the rows that were rejected.
+
+    Invoice numbers, customers, vehicles and drivers are checked with a few IN
+    queries for the whole file, then every row is validated and priced the
+    same way ``create_trip`` does it. Valid rows are inserted in chunks of
+    ``IMPORT_CHUNK_SIZE`` trips, each committed on its own, so re-running an
+    interrupted import only reports the already imported invoice numbers.
+    Rows without an invoice number are numbered as their chunk is inserted.
+    If another request takes one of a chunk's invoice numbers in the meantime,
+    that chunk is rolled back and its rows are reported; later chunks still run.
+    """
+    errors = []
+    parsed = []
+    for row, data, parse_error in rows:
+        if parse_error:
+            errors.append(_row_error(row, data, [parse_error]))
+            continue
+        try:
+            trip_data = TripCreate.model_validate(data)
+        except ValidationError as exc:
+            messages = [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+                for error in exc.errors()
+            ]
+            errors.append(_row_error(row, data, messages))
+            continue
+        parsed.append((row, data, trip_data, normalize_trip_vehicles(trip_data)))
+
+    existing_invoices = _existing_invoice_numbers(
+        db,
+        {(trip_data.invoice_number or "").strip() for _, _, trip_data, _ in parsed} - {""},
+    )
+    customer_ids = _existing_customer_ids(db, {trip_data.customer_id for _, _, trip_data, _ in parsed})
+    vehicles_by_number, drivers_by_id = trip_vehicle_references(
+        db, [entry for _, _, _, entries in parsed for entry in entries]
+    )
+
+    valid = []
+    seen_invoices = set()
+    for row, data, trip_data, entries in parsed:
+        try:
+            check_new_trip(trip_data, lambda number: number in existing_invoices or number in seen_invoices)
+            validated_trip_vehicles = check_trip_vehicles(entries, vehicles_by_number, drivers_by_id) if entries else []
+            trip = build_trip(trip_data, validated_trip_vehicles)
+            if trip_data.customer_id not in customer_ids:
+                raise HTTPException(404, "Customer not found")
+        except HTTPException as exc:
+            errors.append(_row_error(row, data, [str(exc.detail)]))
+            continue
+        if trip.invoice_number:
+            seen_invoices.add(trip.invoice_number)
+        valid.append((row, data, trip_data, validated_trip_vehicles, trip))
+
+    imported = 0
+    for chunk in _chunks(valid, IMPORT_CHUNK_SIZE):
+        chunk_errors = _insert_chunk(db, chunk)
+        errors.extend(chunk_errors)
+        if not chunk_errors:
+            imported += len(chunk)
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "total_rows": len(rows),
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors,
+    }
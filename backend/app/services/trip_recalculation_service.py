@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.customer import Customer
+from app.models.trip import Trip
+from app.models.trip_pricing_item import TripPricingItem
+from app.models.trip_vehicle import TripVehicle
+from app.models.trip_vehicle_expense import TripVehicleExpense
+from app.services.pricing_engine import price_trip
+
+
+RECALCULATION_CHUNK_SIZE = 2000
+
+_TRIP_PRICING_COLUMNS = (
+    Trip.id,
+    Trip.invoice_number,
+    Trip.pricing_type,
+    Trip.package_amount,
+    Trip.cost_per_km,
+    Trip.distance_km,
+    Trip.number_of_vehicles,
+    Trip.departure_datetime,
+    Trip.return_datetime,
+    Trip.charged_toll_amount,
+    Trip.charged_parking_amount,
+    Trip.other_expenses,
+    Trip.discount_amount,
+    Trip.amount_received,
+    Trip.total_charged,
+    Trip.pending_amount,
+)
+_VEHICLE_PRICING_COLUMNS = (
+    TripVehicle.id,
+    TripVehicle.trip_id,
+    TripVehicle.distance_km,
+    TripVehicle.pricing_type,
+    TripVehicle.package_amount,
+    TripVehicle.cost_per_km,
+    TripVehicle.vendor_deduction_amount,
+)
+
+
+def _money_changed(old, new) -> bool:
+    return round(float(old or 0), 2) != round(float(new or 0), 2)
+
+
+def _pricing_chunks(db: Session, chunk_size: int):
+    """
+    Yield lists of (trip, vehicle entries, pricing items, charge items) as plain dicts.
+
+    Trips stream through ``yield_per``; each chunk's vehicle lines, their
+    expenses and the pricing items come from one IN query apiece.
+    """
+    trips = db.execute(
+        select(*_TRIP_PRICING_COLUMNS).order_by(Trip.id).execution_options(yield_per=chunk_size)
+    ).mappings()
+    for batch in trips.partitions():
+        trip_ids = [trip["id"] for trip in batch]
+
+        entries_by_trip = defaultdict(list)
+        entries_by_id = {}
+        for row in db.execute(
+            select(*_VEHICLE_PRICING_COLUMNS).where(TripVehicle.trip_id.in_(trip_ids)).order_by(TripVehicle.id)
+        ).mappings():
+            entry = {**row, "expenses": []}
+            entries_by_trip[row["trip_id"]].append(entry)
+            entries_by_id[row["id"]] = entry
+        if entries_by_id:
+            for trip_vehicle_id, amount in db.execute(
+                select(TripVehicleExpense.trip_vehicle_id, TripVehicleExpense.amount)
+                .where(TripVehicleExpense.trip_vehicle_id.in_(list(entries_by_id)))
+                .order_by(TripVehicleExpense.id)
+            ):
+                entries_by_id[trip_vehicle_id]["expenses"].append({"amount": amount})
+
+        items_by_trip = defaultdict(lambda: defaultdict(list))
+        for row in db.execute(
+            select(
+                TripPricingItem.trip_id,
+                TripPricingItem.item_type,
+                TripPricingItem.quantity,
+                TripPricingItem.rate,
+                TripPricingItem.amount,
+            )
+            .where(TripPricingItem.trip_id.in_(trip_ids))
+            .order_by(TripPricingItem.id)
+        ).mappings():
+            items_by_trip[row["trip_id"]][row["item_type"]].append(dict(row))
+
+        yield [
+            (
+                dict(trip),
+                entries_by_trip.get(trip["id"], []),
+                items_by_trip[trip["id"]]["pricing"],
+                items_by_trip[trip["id"]]["charge"],
+            )
+            for trip in batch
+        ]
+
+
+def _price_chunk(chunk) -> tuple[list[dict], int, int, list[dict]]:
+    """
+    Reprice one chunk in a worker.
+
+    Returns (changed trips, repriced count, skipped count, invalid trips);
+    invalid trips are ones the pricing engine rejects, such as a return
+    before the departure, and are left as stored.
+    """
+    changes = []
+    invalid = []
+    skipped = 0
+    for trip, entries, pricing_items, charge_items in chunk:
+        # A trip without vehicle lines keeps no distance of its own, so a
+        # per-km price cannot be reproduced from what is stored.
+        if not entries and trip["pricing_type"] != "package":
+            skipped += 1
+            continue
+        try:
+            pricing = price_trip(trip, entries, pricing_items, charge_items, trip["number_of_vehicles"] or 1)
+        except ValueError as exc:
+            invalid.append({"id": trip["id"], "invoice_number": trip["invoice_number"], "error": str(exc)})
+            continue
+        if _money_changed(trip["total_charged"], pricing.total_charged) or _money_changed(
+            trip["pending_amount"], pricing.pending_amount
+        ):
+            changes.append(
+                {
+                    "id": trip["id"],
+                    "invoice_number": trip["invoice_number"],
+                    "old_total_charged": trip["total_charged"],
+                    "total_charged": pricing.total_charged,
+                    "old_pending_amount": trip["pending_amount"],
+                    "pending_amount": pricing.pending_amount,
+                }
+            )
+    return changes, len(chunk) - skipped - len(invalid), skipped, invalid
+
+
+def _priced_chunks(chunks, workers: int):
+    if workers <= 1:
+        yield from map(_price_chunk, chunks)
+        return
+    # Submit lazily with a bounded backlog so streaming still caps memory.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append(pool.submit(_price_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+
+def _customer_changes(db: Session) -> list[dict]:
+    """Customers whose stored totals differ from one grouped aggregate over their trips."""
+    totals = (
+        select(
+            Trip.customer_id,
+            func.count(Trip.id).label("total_trips"),
+            func.coalesce(func.sum(Trip.total_charged), 0).label("total_billed"),
+            func.coalesce(func.sum(Trip.pending_amount), 0).label("pending_balance"),
+        )
+        .group_by(Trip.customer_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Customer.id,
+            Customer.name,
+            Customer.total_trips,
+            Customer.total_billed,
+            Customer.pending_balance,
+            func.coalesce(totals.c.total_trips, 0).label("new_total_trips"),
+            func.coalesce(totals.c.total_billed, 0).label("new_total_billed"),
+            func.coalesce(totals.c.pending_balance, 0).label("new_pending_balance"),
+        )
+        .outerjoin(totals, totals.c.customer_id == Customer.id)
+        .order_by(Customer.id)
+    ).mappings()
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "old_total_trips": row["total_trips"],
+            "total_trips": row["new_total_trips"],
+            "old_total_billed": row["total_billed"],
+            "total_billed": float(row["new_total_billed"]),
+            "old_pending_balance": row["pending_balance"],
+            "pending_balance": float(row["new_pending_balance"]),
+        }
+        for row in rows
+        if (row["total_trips"] or 0) != row["new_total_trips"]
+        or _money_changed(row["total_billed"], row["new_total_billed"])
+        or _money_changed(row["pending_balance"], row["new_pending_balance"])
+    ]
+
+
+def _bulk_update(db: Session, model, changes: list[dict], columns: tuple[str, ...]) -> None:
+    for start in range(0, len(changes), RECALCULATION_CHUNK_SIZE):
+        db.execute(
+            update(model),
+            [
+                {"id": change["id"], **{column: change[column] for column in columns}}
+                for change in changes[start:start + RECALCULATION_CHUNK_SIZE]
+            ],
+        )
+
+
+def recalculate_trip_totals(
+    db: Session,
+    workers: int = 1,
+    dry_run: bool = False,
+    chunk_size: int = RECALCULATION_CHUNK_SIZE,
+) -> dict:
+    """
+    Reprice every stored trip with the pricing engine and fix drifted totals.
+
+    Trips are streamed in chunks and priced on ``workers`` processes; only
+    trips and customers whose totals change are written, by primary key in
+    bulk. With ``dry_run`` the writes are rolled back and only the diff is
+    returned. Trips the engine rejects are listed under ``invalid`` and left
+    unchanged. Rollups and snapshots are left to the caller.
+    """
+    trip_changes = []
+    invalid_trips = []
+    repriced = skipped = 0
+    for changes, chunk_repriced, chunk_skipped, invalid in _priced_chunks(_pricing_chunks(db, chunk_size), workers):
+        trip_changes.extend(changes)
+        invalid_trips.extend(invalid)
+        repriced += chunk_repriced
+        skipped += chunk_skipped
+
+    _bulk_update(db, Trip, trip_changes, ("total_charged", "pending_amount"))
+    db.flush()
+    customer_changes = _customer_changes(db)
+    _bulk_update(db, Customer, customer_changes, ("total_trips", "total_billed", "pending_balance"))
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return {
+        "repriced": repriced,
+        "skipped": skipped,
+        "invalid": invalid_trips,
+        "trips": trip_changes,
+        "customers": customer_changes,
+    }
@@ -1,5 +1,9 @@
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import case, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from fastapi import HTTPException
 
 from app.models.customer import Customer
@@ -8,80 +12,27 @@ from app.models.trip import Trip
 from app.models.trip_driver_change import TripDriverChange
 from app.models.trip_pricing_item import TripPricingItem
 from app.models.trip_vehicle import TripVehicle
+from app.models.trip_vehicle_expense import TripVehicleExpense
 from app.models.vehicle import Vehicle
 from app.schemas.trip import TripCreate, TripUpdate
+from app.services.dashboard_service import trip_effective_date
+from app.services.document_number_service import check_manual_number, is_duplicate_number, next_document_number
+from app.services.financial_rollup_service import apply_row_deltas, record_trip
+from app.services.vehicle_snapshot_service import record_vehicle_trip
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.pricing_engine import calculate_party_fuel_credit, price_trip
+from app.services.vehicle_service import normalize_vehicle_number
 
 
-def _calculate_trip_days(departure_datetime, return_datetime):
-    if not departure_datetime or not return_datetime:
-        return 1
-    if return_datetime < departure_datetime:
-        raise HTTPException(400, "Return date/time cannot be before departure date/time")
-    return (return_datetime.date() - departure_datetime.date()).days + 1
-
-
-def _calculate_base_pricing(pricing_type, package_amount, trip_days, distance_km, cost_per_km, number_of_vehicles):
-    base_amount = (
-        package_amount
-        if pricing_type == "package"
-        else (distance_km or 0) * cost_per_km
-    )
-    return base_amount * number_of_vehicles
-
-
-def _calculate_vehicle_base_pricing(trip_vehicles, default_pricing_type, default_package_amount, default_cost_per_km):
-    total = 0
-    for entry in trip_vehicles or []:
-        pricing_type = entry.get("pricing_type") or default_pricing_type
-        package_amount = entry.get("package_amount")
-        cost_per_km = entry.get("cost_per_km")
-        distance_km = entry.get("distance_km") or 0
-
-        package_value = default_package_amount if package_amount is None else package_amount
-        rate_value = default_cost_per_km if cost_per_km is None else cost_per_km
-
-        if pricing_type == "package":
-            total += package_value or 0
-        else:
-            total += (distance_km or 0) * (rate_value or 0)
-    return total
-
-
-def _calculate_pricing_items_total(pricing_items, number_of_vehicles):
-    return sum(
-        (i.amount if i.amount else (i.quantity or 1) * (i.rate or 0))
-        for i in pricing_items
-    ) * number_of_vehicles
-
-
-def _calculate_total_fuel_cost(trip_vehicles, default_diesel_used=0, default_petrol_used=0):
-    if trip_vehicles:
-        total = 0
-        for entry in trip_vehicles:
-            fuel_cost = entry.get("fuel_cost", 0) or 0
-            if fuel_cost > 0:
-                total += fuel_cost
-                continue
-            total += (entry.get("diesel_used", 0) or 0) + (entry.get("petrol_used", 0) or 0)
-        return total
-    return (default_diesel_used or 0) + (default_petrol_used or 0)
-
-
-def _calculate_party_fuel_credit(trip_vehicles):
-    total = 0
-    for entry in trip_vehicles or []:
-        total += entry.get("vendor_deduction_amount", 0) or 0
-        total += sum(
-            (exp.get("amount", 0) if isinstance(exp, dict) else (exp.amount or 0))
-            for exp in entry.get("expenses", [])
-        )
-    return total
-
-
+_EXPENSE_COLUMNS = ("expense_type", "amount", "vendor", "notes")
+_PRICING_ITEM_COLUMNS = ("description", "quantity", "rate", "amount", "item_type")
+_DRIVER_CHANGE_COLUMNS = ("driver_id", "start_time", "end_time", "vehicle_number", "notes")
 
+TRIP_PAYMENT_STATUSES = ("settled", "partial", "outstanding")
+TRIP_VIEWS = ("full", "compact")
 
 
-def _normalize_trip_vehicles(trip_data):
+def normalize_trip_vehicles(trip_data):
     if trip_data.vehicles:
         return trip_data.vehicles
     if trip_data.vehicle_number or trip_data.driver_id:
@@ -113,9 +64,32 @@ def _get_entry_value(item, key, default=None):
     return default if value is None else value
 
 
+def trip_vehicle_references(db: Session, trip_vehicles):
+    """Fetch every vehicle and driver the entries refer to, with one IN query each."""
+    vehicle_numbers = {
+        normalize_vehicle_number(value)
+        for value in (_get_entry_value(item, "vehicle_number") for item in trip_vehicles)
+        if value
+    }
+    driver_ids = {value for value in (_get_entry_value(item, "driver_id") for item in trip_vehicles) if value}
+    vehicles_by_number = {
+        vehicle.vehicle_number: vehicle
+        for vehicle in db.query(Vehicle).filter(Vehicle.vehicle_number.in_(vehicle_numbers)).all()
+    } if vehicle_numbers else {}
+    drivers_by_id = {
+        driver.id: driver for driver in db.query(Driver).filter(Driver.id.in_(driver_ids)).all()
+    } if driver_ids else {}
+    return vehicles_by_number, drivers_by_id
+
+
 def _validate_trip_vehicles(db: Session, trip_vehicles):
     if not trip_vehicles:
         return []
+    # Fetch every referenced vehicle and driver up front; errors are still raised per entry.
+    return check_trip_vehicles(trip_vehicles, *trip_vehicle_references(db, trip_vehicles))
+
+
+def check_trip_vehicles(trip_vehicles, vehicles_by_number, drivers_by_id):
     validated = []
     seen_vehicle_numbers = set()
 
@@ -134,6 +108,7 @@ def _validate_trip_vehicles(db: Session, trip_vehicles):
 
         if not vehicle_number:
             raise HTTPException(400, "Vehicle is required for every vehicle entry")
+        vehicle_number = normalize_vehicle_number(vehicle_number)
         if not driver_id:
             raise HTTPException(400, f"Driver is required for vehicle {vehicle_number}")
         if start_km is not None and end_km is not None and end_km < start_km:
@@ -142,11 +117,11 @@ def _validate_trip_vehicles(db: Session, trip_vehicles):
             raise HTTPException(400, f"Duplicate vehicle selected: {vehicle_number}")
         seen_vehicle_numbers.add(vehicle_number)
 
-        vehicle = db.query(Vehicle).filter(Vehicle.vehicle_number == vehicle_number).first()
+        vehicle = vehicles_by_number.get(vehicle_number)
         if not vehicle:
             raise HTTPException(404, f"Vehicle not found: {vehicle_number}")
 
-        driver = db.query(Driver).filter(Driver.id == driver_id).first()
+        driver = drivers_by_id.get(driver_id)
         if not driver:
             raise HTTPException(404, f"Driver not found: {driver_id}")
 
@@ -217,131 +192,241 @@ def _assign_trip_primary_fields(trip: Trip, trip_vehicles, number_of_vehicles=No
     trip.driver_bhatta = total_driver_bhatta
 
 
-def _replace_trip_vehicles(db: Session, trip: Trip, trip_vehicles):
-    existing_entries = list(trip.vehicles or [])
-    for entry in existing_entries:
-        vehicle = db.query(Vehicle).filter(Vehicle.vehicle_number == entry.vehicle_number).first()
-        if vehicle:
-            vehicle.total_trips = max((vehicle.total_trips or 0) - 1, 0)
-            vehicle.total_km = max((vehicle.total_km or 0) - (entry.distance_km or 0), 0)
-        db.delete(entry)
-    db.flush()
+def _sync_child_rows(db: Session, model, existing_rows, desired_rows, columns):
+    """
+    Make a set of child rows match ``desired_rows`` (dicts of column values).
 
-    from app.models.trip_vehicle_expense import TripVehicleExpense
+    Rows are matched on ``columns``; matching rows are left untouched, the
+    leftovers are deleted and the missing ones inserted in one statement.
+    """
+    unmatched = defaultdict(list)
+    for row in existing_rows:
+        unmatched[tuple(getattr(row, column) for column in columns)].append(row)
 
+    inserts = []
+    for values in desired_rows:
+        matches = unmatched.get(tuple(values[column] for column in columns))
+        if matches:
+            matches.pop()
+        else:
+            inserts.append(values)
+
+    for rows in unmatched.values():
+        for row in rows:
+            db.delete(row)
+    if inserts:
+        db.execute(insert(model), inserts)
+
+
+def trip_vehicle_values(trip_id: int, entry) -> dict:
+    return {
+        "trip_id": trip_id,
+        "vehicle_number": entry["vehicle_number"],
+        "driver_id": entry["driver_id"],
+        "start_km": entry["start_km"] or 0,
+        "end_km": entry["end_km"] or 0,
+        "distance_km": entry["distance_km"],
+        "driver_bhatta": entry["driver_bhatta"] or 0,
+        "vehicle_type": entry.get("vehicle_type"),
+        "seat_count": entry.get("seat_count"),
+        "pricing_type": entry.get("pricing_type", "per_km"),
+        "package_amount": entry.get("package_amount", 0),
+        "cost_per_km": entry.get("cost_per_km", 0),
+        "fuel_cost": entry["fuel_cost"],
+        "fuel_litres": entry["fuel_litres"],
+        "diesel_used": entry.get("diesel_used", 0),
+        "petrol_used": entry.get("petrol_used", 0),
+        "fuel_price": entry.get("fuel_price", 0),
+        "fuel_vendor": entry.get("fuel_vendor"),
+        "toll_amount": entry["toll_amount"],
+        "parking_amount": entry["parking_amount"],
+        "other_expenses": entry["other_expenses"],
+        "bus_type": entry.get("bus_type"),
+        "vendor_deduction_description": entry.get("vendor_deduction_description"),
+        "vendor_deduction_amount": entry.get("vendor_deduction_amount", 0),
+        "vendor_deduction_note": entry.get("vendor_deduction_note"),
+        "vendor_deduction_vendor": entry.get("vendor_deduction_vendor"),
+    }
+
+
+def _trip_vehicle_expense_values(trip_vehicle_id: int, expenses) -> list[dict]:
+    return [
+        {
+            "trip_vehicle_id": trip_vehicle_id,
+            "expense_type": _get_entry_value(exp, "expense_type") or "Party Fuel Entry",
+            "amount": _get_entry_value(exp, "amount", 0),
+            "vendor": _get_entry_value(exp, "vendor"),
+            "notes": _get_entry_value(exp, "notes"),
+        }
+        for exp in expenses
+    ]
+
+
+def _sync_trip_vehicles(db: Session, trip: Trip, trip_vehicles) -> dict:
+    """
+    Bring a trip's vehicle entries in line with the validated payload.
+
+    Entries are matched by vehicle number: unchanged entries are not written,
+    changed ones are updated in place and new ones are inserted together with
+    their expenses. Returns the vehicle counter deltas for apply_trip_counters.
+    """
+    existing = {entry.vehicle_number: entry for entry in (trip.vehicles or [])}
+    desired = {entry["vehicle_number"] for entry in trip_vehicles}
+    vehicle_deltas = defaultdict(lambda: {"total_trips": 0, "total_km": 0})
+
+    for number, entry in existing.items():
+        if number not in desired:
+            vehicle_deltas[number]["total_trips"] -= 1
+            vehicle_deltas[number]["total_km"] -= entry.distance_km or 0
+            db.delete(entry)
+
+    added = []
     for entry in trip_vehicles:
-        tv = TripVehicle(
-            trip_id=trip.id,
-            vehicle_number=entry["vehicle_number"],
-            driver_id=entry["driver_id"],
-            start_km=entry["start_km"] or 0,
-            end_km=entry["end_km"] or 0,
-            distance_km=entry["distance_km"],
-            driver_bhatta=entry["driver_bhatta"] or 0,
-            vehicle_type=entry.get("vehicle_type"),
-            seat_count=entry.get("seat_count"),
-            pricing_type=entry.get("pricing_type", "per_km"),
-            package_amount=entry.get("package_amount", 0),
-            cost_per_km=entry.get("cost_per_km", 0),
-            fuel_cost=entry["fuel_cost"],
-            fuel_litres=entry["fuel_litres"],
-            diesel_used=entry.get("diesel_used", 0) if isinstance(entry, dict) else (entry.diesel_used or 0),
-            petrol_used=entry.get("petrol_used", 0) if isinstance(entry, dict) else (entry.petrol_used or 0),
-            fuel_price=entry.get("fuel_price", 0) if isinstance(entry, dict) else (entry.fuel_price or 0),
-            fuel_vendor=entry.get("fuel_vendor") if isinstance(entry, dict) else entry.fuel_vendor,
-            toll_amount=entry["toll_amount"],
-            parking_amount=entry["parking_amount"],
-            other_expenses=entry["other_expenses"],
-            bus_type=entry.get("bus_type") if isinstance(entry, dict) else entry.bus_type,
-            vendor_deduction_description=entry.get("vendor_deduction_description") if isinstance(entry, dict) else entry.vendor_deduction_description,
-            vendor_deduction_amount=entry.get("vendor_deduction_amount", 0) if isinstance(entry, dict) else (entry.vendor_deduction_amount or 0),
-            vendor_deduction_note=entry.get("vendor_deduction_note") if isinstance(entry, dict) else entry.vendor_deduction_note,
-            vendor_deduction_vendor=entry.get("vendor_deduction_vendor") if isinstance(entry, dict) else entry.vendor_deduction_vendor,
+        values = trip_vehicle_values(trip.id, entry)
+        deltas = vehicle_deltas[entry["vehicle_number"]]
+        deltas["total_km"] += entry["distance_km"] or 0
+        tv = existing.get(entry["vehicle_number"])
+        if tv is None:
+            added.append((values, entry["expenses"]))
+            deltas["total_trips"] += 1
+            continue
+
+        deltas["total_km"] -= tv.distance_km or 0
+        for name, value in values.items():
+            if getattr(tv, name) != value:
+                setattr(tv, name, value)
+        _sync_child_rows(
+            db,
+            TripVehicleExpense,
+            tv.expenses,
+            _trip_vehicle_expense_values(tv.id, entry["expenses"]),
+            _EXPENSE_COLUMNS,
         )
-        db.add(tv)
-        db.flush() # Get tv.id for nested expenses
-
-        # Save per-vehicle expenses
-        for exp in entry["expenses"]:
-            db.add(TripVehicleExpense(
-                trip_vehicle_id=tv.id,
-                expense_type=(exp.expense_type if hasattr(exp, "expense_type") else exp.get("expense_type")) or "Party Fuel Entry",
-                amount=exp.amount if hasattr(exp, "amount") else exp.get("amount", 0),
-                vendor=exp.vendor if hasattr(exp, "vendor") else exp.get("vendor"),
-                notes=exp.notes if hasattr(exp, "notes") else exp.get("notes"),
-            ))
-        
-        # Save per-vehicle driver changes
-        for dc in entry["driver_changes"]:
-            db.add(TripDriverChange(
-                trip_id=trip.id,
-                driver_id=dc.driver_id if hasattr(dc, "driver_id") else dc.get("driver_id"),
-                start_time=dc.start_time if hasattr(dc, "start_time") else dc.get("start_time"),
-                end_time=dc.end_time if hasattr(dc, "end_time") else dc.get("end_time"),
-                vehicle_number=entry["vehicle_number"], # Linked by number
-                notes=dc.notes if hasattr(dc, "notes") else dc.get("notes"),
-            ))
-
-        entry["vehicle"].total_trips += 1
-        entry["vehicle"].total_km += (entry["distance_km"] or 0)
+
+    insert_trip_vehicles(db, added)
+    return vehicle_deltas
+
+
+def apply_trip_counters(db: Session, customer_deltas: dict, vehicle_deltas: dict) -> None:
+    """
+    Add trip deltas to the customer and vehicle counters atomically.
+
+    Customers are always updated before vehicles, each in key order, so every
+    trip write locks counter rows in the same order.
+    """
+    apply_row_deltas(db, Customer.__table__, "id", customer_deltas)
+    apply_row_deltas(db, Vehicle.__table__, "vehicle_number", vehicle_deltas)
+
+
+def customer_trip_deltas(trip: Trip, sign: int = 1) -> dict:
+    return {
+        "total_trips": sign,
+        "total_billed": sign * (trip.total_charged or 0),
+        "pending_balance": sign * (trip.pending_amount or 0),
+    }
+
+
+def insert_trip_vehicles(db: Session, entries) -> None:
+    """Insert (trip vehicle values, expenses) pairs with one statement per table."""
+    if not entries:
+        return
+    ids = db.execute(
+        insert(TripVehicle).returning(TripVehicle.id, sort_by_parameter_order=True),
+        [values for values, _ in entries],
+    ).scalars().all()
+    expenses = [
+        row
+        for trip_vehicle_id, (_, entry_expenses) in zip(ids, entries)
+        for row in _trip_vehicle_expense_values(trip_vehicle_id, entry_expenses)
+    ]
+    if expenses:
+        db.execute(insert(TripVehicleExpense), expenses)
+
+
+def pricing_item_values(trip_id: int, pricing_items, charge_items) -> list[dict]:
+    return [
+        {
+            "trip_id": trip_id,
+            "description": item.description,
+            "quantity": item.quantity or 1,
+            "rate": item.rate or 0,
+            "amount": item.amount if item.amount else (item.quantity or 1) * (item.rate or 0),
+            "item_type": item_type,
+        }
+        for items, item_type in ((pricing_items, "pricing"), (charge_items, "charge"))
+        for item in items
+    ]
 
 
 def _save_pricing_items(db: Session, trip_id: int, pricing_items, charge_items):
-    db.query(TripPricingItem).filter(TripPricingItem.trip_id == trip_id).delete()
-
-    for item in pricing_items:
-        amount = item.amount if item.amount else (item.quantity or 1) * (item.rate or 0)
-        db.add(TripPricingItem(
-            trip_id=trip_id,
-            description=item.description,
-            quantity=item.quantity or 1,
-            rate=item.rate or 0,
-            amount=amount,
-            item_type="pricing"
-        ))
-
-    for item in charge_items:
-        amount = item.amount if item.amount else (item.quantity or 1) * (item.rate or 0)
-        db.add(TripPricingItem(
-            trip_id=trip_id,
-            description=item.description,
-            quantity=item.quantity or 1,
-            rate=item.rate or 0,
-            amount=amount,
-            item_type="charge"
-        ))
-
-
-def _save_driver_changes(db: Session, trip_id: int, driver_changes):
-    db.query(TripDriverChange).filter(TripDriverChange.trip_id == trip_id).delete()
-    for dc in (driver_changes or []):
-        db.add(TripDriverChange(
-            trip_id=trip_id,
-            driver_id=dc.driver_id if hasattr(dc, "driver_id") else dc.get("driver_id"),
-            start_time=dc.start_time if hasattr(dc, "start_time") else dc.get("start_time"),
-            end_time=dc.end_time if hasattr(dc, "end_time") else dc.get("end_time"),
-            vehicle_number=dc.vehicle_number if hasattr(dc, "vehicle_number") else dc.get("vehicle_number"),
-            notes=dc.notes if hasattr(dc, "notes") else dc.get("notes")
-        ))
+    desired = pricing_item_values(trip_id, pricing_items, charge_items)
+    existing = db.query(TripPricingItem).filter(TripPricingItem.trip_id == trip_id).all()
+    _sync_child_rows(db, TripPricingItem, existing, desired, _PRICING_ITEM_COLUMNS)
+
+
+def driver_change_values(trip_id: int, driver_changes, trip_vehicles=()) -> list[dict]:
+    """The trip's driver changes: trip level ones plus each vehicle entry's own."""
+    changes = [
+        (dc, _normalize_optional_vehicle_number(_get_entry_value(dc, "vehicle_number")))
+        for dc in (driver_changes or [])
+    ]
+    changes.extend((dc, entry["vehicle_number"]) for entry in trip_vehicles for dc in entry["driver_changes"])
+    return [
+        {
+            "trip_id": trip_id,
+            "driver_id": _get_entry_value(dc, "driver_id"),
+            "start_time": _get_entry_value(dc, "start_time"),
+            "end_time": _get_entry_value(dc, "end_time"),
+            "vehicle_number": vehicle_number,
+            "notes": _get_entry_value(dc, "notes"),
+        }
+        for dc, vehicle_number in changes
+    ]
 
 
-def create_trip(db: Session, trip_data: TripCreate):
+def _save_driver_changes(db: Session, trip_id: int, driver_changes, trip_vehicles=()):
+    desired = driver_change_values(trip_id, driver_changes, trip_vehicles)
+    existing = db.query(TripDriverChange).filter(TripDriverChange.trip_id == trip_id).all()
+    _sync_child_rows(db, TripDriverChange, existing, desired, _DRIVER_CHANGE_COLUMNS)
+
+
+def _normalize_optional_vehicle_number(value):
+    return normalize_vehicle_number(value) if value else value
+
+
+def check_new_trip(trip_data: TripCreate, invoice_exists=None) -> None:
+    """Request-level checks; a blank invoice number is allocated on insert."""
     if trip_data.discount_amount and not (500 <= trip_data.discount_amount <= 1000):
         raise HTTPException(400, "Discount must be between ₹500 and ₹1000")
-    if not trip_data.invoice_number or trip_data.invoice_number.strip() == "":
-        raise HTTPException(400, "Invoice number is required")
-    existing_invoice = (
-        db.query(Trip)
-        .filter(Trip.invoice_number == trip_data.invoice_number.strip())
-        .first()
-    )
-    if existing_invoice:
+    check_manual_number("invoice", trip_data.invoice_number)
+    invoice_number = (trip_data.invoice_number or "").strip()
+    if invoice_number and invoice_exists and invoice_exists(invoice_number):
         raise HTTPException(400, "Invoice number already exists")
     if trip_data.pricing_type not in {"per_km", "package"}:
         raise HTTPException(400, "Invalid pricing type")
 
+
+def _flush_invoice_number(db: Session) -> None:
+    """Flush the trip, turning a rejection by the invoice number's unique index into a 400."""
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if is_duplicate_number(exc, "invoice_number"):
+            raise HTTPException(400, "Invoice number already exists")
+        raise
+
+
+def _price_trip(trip, trip_vehicles, pricing_items, charge_items, number_of_vehicles):
+    try:
+        return price_trip(trip, trip_vehicles, pricing_items, charge_items, number_of_vehicles)
+    except ValueError as exc:
+        raise HTTPException(400, str(exc)) from exc
+
+
+def build_trip(trip_data: TripCreate, validated_trip_vehicles) -> Trip:
+    """Price a new trip from its validated vehicle entries. The trip is not added to the session."""
     uses_explicit_vehicle_entries = bool(trip_data.vehicles)
-    validated_trip_vehicles = _validate_trip_vehicles(db, _normalize_trip_vehicles(trip_data))
     has_vehicle_entries = len(validated_trip_vehicles) > 0
     total_distance_km = (
         sum(entry["distance_km"] or 0 for entry in validated_trip_vehicles)
@@ -362,61 +447,22 @@ def create_trip(db: Session, trip_data: TripCreate):
     elif trip_data.package_amount <= 0 and has_vehicle_entries:
         raise HTTPException(400, "Package amount must be greater than zero")
 
-    customer = db.query(Customer).filter(Customer.id == trip_data.customer_id).first()
-    if not customer:
-        raise HTTPException(404, "Customer not found")
-
     total_vehicle_expenses = sum(
         entry["fuel_cost"] + entry["toll_amount"] + entry["parking_amount"] + entry["other_expenses"] + entry["driver_bhatta"]
         for entry in validated_trip_vehicles
     )
 
     total_cost = total_vehicle_expenses
-
-    pricing_items = trip_data.pricing_items or []
-    charge_items = trip_data.charge_items or []
-    trip_days = _calculate_trip_days(trip_data.departure_datetime, trip_data.return_datetime)
-    base_pricing_vehicle_count = 1 if uses_explicit_vehicle_entries and trip_data.pricing_type == "per_km" else number_of_vehicles
-
-    base_pricing_total = (
-        _calculate_vehicle_base_pricing(
-            validated_trip_vehicles,
-            trip_data.pricing_type,
-            trip_data.package_amount,
-            trip_data.cost_per_km,
-        )
-        if has_vehicle_entries
-        else _calculate_base_pricing(
-            trip_data.pricing_type,
-            trip_data.package_amount,
-            trip_days,
-            total_distance_km,
-            trip_data.cost_per_km,
-            base_pricing_vehicle_count,
-        )
-    )
-    pricing_items_total = _calculate_pricing_items_total(
-        pricing_items,
+    pricing = _price_trip(
+        trip_data,
+        validated_trip_vehicles,
+        trip_data.pricing_items or [],
+        trip_data.charge_items or [],
         number_of_vehicles,
     )
-    charges_total = sum(
-        (i.amount if i.amount else (i.quantity or 1) * (i.rate or 0))
-        for i in charge_items
-    )
-    total_charged = (
-        base_pricing_total +
-        pricing_items_total +
-        trip_data.charged_toll_amount +
-        trip_data.charged_parking_amount +
-        charges_total +
-        trip_data.other_expenses -
-        (trip_data.discount_amount or 0)
-    )
-    total_credits = (trip_data.amount_received or 0) + _calculate_party_fuel_credit(validated_trip_vehicles)
-    pending_amount = max(total_charged - total_credits, 0)
 
     trip = Trip(
-        invoice_number=trip_data.invoice_number,
+        invoice_number=(trip_data.invoice_number or "").strip() or None,
         trip_date=trip_data.trip_date,
         booking_id=trip_data.booking_id,
         departure_datetime=trip_data.departure_datetime,
@@ -446,56 +492,243 @@ def create_trip(db: Session, trip_data: TripCreate):
         estimate_amount=trip_data.estimate_amount,
         amount_received=trip_data.amount_received,
         advance_payment=trip_data.advance_payment,
-        total_charged=total_charged,
-        pending_amount=pending_amount,
+        total_charged=pricing.total_charged,
+        pending_amount=pricing.pending_amount,
     )
 
+    _assign_trip_primary_fields(trip, validated_trip_vehicles, number_of_vehicles)
+    return trip
+
+
+def create_trip(db: Session, trip_data: TripCreate):
+    check_new_trip(trip_data)
+    validated_trip_vehicles = _validate_trip_vehicles(db, normalize_trip_vehicles(trip_data))
+    trip = build_trip(trip_data, validated_trip_vehicles)
+
+    customer = db.query(Customer).filter(Customer.id == trip_data.customer_id).first()
+    if not customer:
+        raise HTTPException(404, "Customer not found")
+
+    if not trip.invoice_number:
+        trip.invoice_number = next_document_number(db, "invoice", trip.trip_date)
     db.add(trip)
-    db.flush()
+    _flush_invoice_number(db)
 
-    _assign_trip_primary_fields(trip, validated_trip_vehicles, number_of_vehicles)
-    _replace_trip_vehicles(db, trip, validated_trip_vehicles)
-    _save_pricing_items(db, trip.id, pricing_items, charge_items)
-    _save_driver_changes(db, trip.id, trip_data.driver_changes or [])
+    vehicle_deltas = _sync_trip_vehicles(db, trip, validated_trip_vehicles)
+    _save_pricing_items(db, trip.id, trip_data.pricing_items or [], trip_data.charge_items or [])
+    _save_driver_changes(db, trip.id, trip_data.driver_changes or [], validated_trip_vehicles)
 
-    customer.total_trips += 1
-    customer.total_billed += total_charged
-    customer.pending_balance += pending_amount
+    apply_trip_counters(db, {customer.id: customer_trip_deltas(trip)}, vehicle_deltas)
+    record_trip(db, trip, calculate_party_fuel_credit(validated_trip_vehicles))
+    record_vehicle_trip(db, trip)
 
     db.commit()
     db.refresh(trip)
     return trip
 
 
-def get_trips_by_vehicle(db: Session, vehicle_number: str):
+def is_compact_view(view: str | None) -> bool:
+    if view and view not in TRIP_VIEWS:
+        raise HTTPException(400, f"Invalid view; use one of {', '.join(TRIP_VIEWS)}")
+    return view == "compact"
+
+
+def _trip_list_columns():
+    deductions = (
+        select(func.coalesce(func.sum(TripVehicle.vendor_deduction_amount), 0))
+        .where(TripVehicle.trip_id == Trip.id)
+        .scalar_subquery()
+    )
+    expenses = (
+        select(func.coalesce(func.sum(TripVehicleExpense.amount), 0))
+        .join(TripVehicle, TripVehicle.id == TripVehicleExpense.trip_vehicle_id)
+        .where(TripVehicle.trip_id == Trip.id)
+        .scalar_subquery()
+    )
     return (
-        db.query(Trip)
-        .join(TripVehicle, TripVehicle.trip_id == Trip.id)
-        .filter(TripVehicle.vehicle_number == vehicle_number)
-        .order_by(Trip.trip_date.desc())
-        .distinct()
-        .all()
+        Trip.id,
+        Trip.invoice_number,
+        Trip.booking_id,
+        Trip.trip_date,
+        Trip.departure_datetime,
+        Trip.from_location,
+        Trip.to_location,
+        Trip.vehicle_number,
+        Trip.driver_id,
+        Trip.customer_id,
+        Trip.number_of_vehicles,
+        Trip.distance_km,
+        Trip.total_charged,
+        Trip.amount_received,
+        Trip.pending_amount,
+        (deductions + expenses).label("party_fuel_credit"),
+        Trip.created_at,
     )
 
 
-def get_trips_by_driver(db: Session, driver_id: int):
-    return (
-        db.query(Trip)
-        .outerjoin(TripVehicle, TripVehicle.trip_id == Trip.id)
-        .filter(
-            or_(
-                TripVehicle.driver_id == driver_id,
-                Trip.driver_id == driver_id,
-            )
+def query_trips(
+    db: Session,
+    *criteria,
+    order_by=(Trip.trip_date.desc(), Trip.id.desc()),
+    compact: bool = False,
+    limit: int | None = None,
+):
+    """
+    Trips matching ``criteria``, as Trip objects or, with ``compact``, as TripListItem rows.
+
+    Compact rows come from a single Core select of the list columns (the party
+    fuel credit is summed per returned row) and load no relationships.
+    """
+    statement = select(*_trip_list_columns()) if compact else select(Trip)
+    statement = statement.where(*criteria).order_by(*order_by)
+    if limit is not None:
+        statement = statement.limit(limit)
+    result = db.execute(statement)
+    return result.mappings().all() if compact else result.scalars().all()
+
+
+def _payment_status_criterion(payment_status: str):
+    pending = func.coalesce(Trip.pending_amount, 0)
+    if payment_status == "settled":
+        return pending <= 0
+    if payment_status == "outstanding":
+        return (pending > 0) & (pending >= func.coalesce(Trip.total_charged, 0))
+    if payment_status == "partial":
+        return (pending > 0) & (pending < func.coalesce(Trip.total_charged, 0))
+    raise HTTPException(400, f"Invalid payment status; use one of {', '.join(TRIP_PAYMENT_STATUSES)}")
+
+
+def _trip_list_criteria(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = None,
+) -> list:
+    criteria = []
+    if start_date:
+        criteria.append(trip_effective_date() >= start_date)
+    if end_date:
+        criteria.append(trip_effective_date() <= end_date)
+    if customer_id is not None:
+        criteria.append(Trip.customer_id == customer_id)
+    if vehicle_number:
+        vehicle_key = normalize_vehicle_number(vehicle_number)
+        criteria.append(
+            or_(Trip.vehicle_number == vehicle_key, Trip.vehicles.any(TripVehicle.vehicle_number == vehicle_key))
         )
-        .order_by(Trip.trip_date.desc())
-        .distinct()
-        .all()
+    if driver_id is not None:
+        criteria.append(or_(Trip.driver_id == driver_id, Trip.vehicles.any(TripVehicle.driver_id == driver_id)))
+    if invoice_prefix and invoice_prefix.strip():
+        criteria.append(Trip.invoice_number.startswith(invoice_prefix.strip(), autoescape=True))
+    if payment_status:
+        criteria.append(_payment_status_criterion(payment_status.strip().lower()))
+    return criteria
+
+
+def list_trips(
+    db: Session,
+    limit: int | None = None,
+    cursor: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = None,
+    compact: bool = False,
+):
+    """
+    Trips newest first, optionally filtered and keyset-paginated.
+
+    Trips are ordered by id, which follows creation order and keeps each page
+    a primary-key range scan. Dates filter on the departure date, falling back
+    to the trip date. With ``limit`` at most that many trips are returned and
+    ``next_cursor`` is the token for the following page. Returns
+    ``(trips, next_cursor, total)`` where ``total`` counts every trip that
+    matches the filters; ``compact`` returns TripListItem rows (see query_trips).
+    """
+    criteria = _trip_list_criteria(
+        start_date, end_date, customer_id, vehicle_number, driver_id, invoice_prefix, payment_status
+    )
+    total = db.query(func.count(Trip.id)).filter(*criteria).scalar()
+
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        if not isinstance(after_id, int):
+            raise HTTPException(400, "Invalid cursor")
+        criteria.append(Trip.id < after_id)
+    trips = query_trips(
+        db,
+        *criteria,
+        order_by=(Trip.id.desc(),),
+        compact=compact,
+        limit=None if limit is None else limit + 1,
+    )
+    if limit is None or len(trips) <= limit:
+        return trips, None, total
+    last = trips[limit - 1]
+    return trips[:limit], encode_cursor([last["id"] if compact else last.id]), total
+
+
+def trip_list_totals(
+    db: Session,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    customer_id: int | None = None,
+    vehicle_number: str | None = None,
+    driver_id: int | None = None,
+    invoice_prefix: str | None = None,
+    payment_status: str | None = None,
+) -> dict:
+    """Billed, received and pending sums over every trip matching the list_trips filters."""
+    criteria = _trip_list_criteria(
+        start_date, end_date, customer_id, vehicle_number, driver_id, invoice_prefix, payment_status
+    )
+    pending = func.coalesce(Trip.pending_amount, 0)
+    row = db.execute(
+        select(
+            func.count(Trip.id).label("trip_count"),
+            func.sum(func.coalesce(Trip.total_charged, 0)).label("total_charged"),
+            func.sum(func.coalesce(Trip.amount_received, 0)).label("amount_received"),
+            func.sum(case((pending > 0, pending), else_=0)).label("pending_amount"),
+        ).where(*criteria)
+    ).mappings().one()
+    return {
+        "trip_count": int(row["trip_count"] or 0),
+        **{name: round(float(row[name] or 0), 2) for name in ("total_charged", "amount_received", "pending_amount")},
+    }
+
+
+def get_trips_by_vehicle(db: Session, vehicle_number: str, compact: bool = False):
+    return query_trips(
+        db,
+        Trip.vehicles.any(TripVehicle.vehicle_number == normalize_vehicle_number(vehicle_number)),
+        compact=compact,
+    )
+
+
+def get_trips_by_driver(db: Session, driver_id: int, compact: bool = False):
+    return query_trips(
+        db,
+        or_(Trip.driver_id == driver_id, Trip.vehicles.any(TripVehicle.driver_id == driver_id)),
+        compact=compact,
     )
 
 
 def update_trip(db: Session, trip_id: int, data: TripUpdate, current_user=None):
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    # Locking the trip keeps its prior totals valid until the counter deltas commit.
+    # Vehicle entries and their expenses come in one IN query each, which the diff sync relies on.
+    trip = (
+        db.query(Trip)
+        .options(selectinload(Trip.vehicles).selectinload(TripVehicle.expenses))
+        .filter(Trip.id == trip_id)
+        .with_for_update()
+        .first()
+    )
     if not trip:
         raise HTTPException(404, "Trip not found")
     is_admin = (getattr(current_user, "role", "") or "").lower() == "admin"
@@ -505,17 +738,10 @@ def update_trip(db: Session, trip_id: int, data: TripUpdate, current_user=None):
         raise HTTPException(400, "Invalid pricing type")
     if not data.invoice_number or data.invoice_number.strip() == "":
         raise HTTPException(400, "Invoice number is required")
-    if data.invoice_number.strip() != (trip.invoice_number or ""):
-        existing_invoice = (
-            db.query(Trip)
-            .filter(Trip.invoice_number == data.invoice_number.strip(), Trip.id != trip.id)
-            .first()
-        )
-        if existing_invoice:
-            raise HTTPException(400, "Invoice number already exists")
+    check_manual_number("invoice", data.invoice_number, trip.invoice_number)
 
     uses_explicit_vehicle_entries = bool(data.vehicles)
-    validated_trip_vehicles = _validate_trip_vehicles(db, _normalize_trip_vehicles(data))
+    validated_trip_vehicles = _validate_trip_vehicles(db, normalize_trip_vehicles(data))
     has_vehicle_entries = len(validated_trip_vehicles) > 0
     total_distance_km = (
         sum(entry["distance_km"] or 0 for entry in validated_trip_vehicles)
@@ -538,6 +764,11 @@ def update_trip(db: Session, trip_id: int, data: TripUpdate, current_user=None):
 
     prior_total_charged = trip.total_charged
     prior_pending = trip.pending_amount
+    customer_deltas = defaultdict(lambda: {"total_trips": 0, "total_billed": 0, "pending_balance": 0})
+    for name, delta in customer_trip_deltas(trip, sign=-1).items():
+        customer_deltas[trip.customer_id][name] += delta
+    record_trip(db, trip, sign=-1)
+    record_vehicle_trip(db, trip, sign=-1)
 
     trip.invoice_number = data.invoice_number.strip()
     trip.trip_date = data.trip_date
@@ -577,57 +808,27 @@ def update_trip(db: Session, trip_id: int, data: TripUpdate, current_user=None):
         total_driver_bhatta
     )
     _assign_trip_primary_fields(trip, validated_trip_vehicles, number_of_vehicles)
+    _flush_invoice_number(db)
 
     pricing_items = data.pricing_items or []
     charge_items = data.charge_items or []
-    trip_days = _calculate_trip_days(data.departure_datetime, data.return_datetime)
-    base_pricing_vehicle_count = 1 if uses_explicit_vehicle_entries and data.pricing_type == "per_km" else number_of_vehicles
-    base_pricing_total = (
-        _calculate_vehicle_base_pricing(
-            validated_trip_vehicles,
-            data.pricing_type,
-            data.package_amount,
-            data.cost_per_km,
-        )
-        if has_vehicle_entries
-        else _calculate_base_pricing(
-            data.pricing_type,
-            data.package_amount,
-            trip_days,
-            total_distance_km,
-            data.cost_per_km,
-            base_pricing_vehicle_count,
-        )
-    )
-    pricing_items_total = _calculate_pricing_items_total(pricing_items, number_of_vehicles)
-    charges_total = sum(
-        (i.amount if i.amount else (i.quantity or 1) * (i.rate or 0))
-        for i in charge_items
-    )
-    trip.total_charged = (
-        base_pricing_total +
-        pricing_items_total +
-        data.charged_toll_amount +
-        data.charged_parking_amount +
-        charges_total +
-        data.other_expenses -
-        (data.discount_amount or 0)
-    )
-    total_credits = (data.amount_received or 0) + _calculate_party_fuel_credit(validated_trip_vehicles)
-    trip.pending_amount = max(trip.total_charged - total_credits, 0)
+    pricing = _price_trip(data, validated_trip_vehicles, pricing_items, charge_items, number_of_vehicles)
+    trip.total_charged = pricing.total_charged
+    trip.pending_amount = pricing.pending_amount
 
-    _replace_trip_vehicles(db, trip, validated_trip_vehicles)
+    vehicle_deltas = _sync_trip_vehicles(db, trip, validated_trip_vehicles)
     if is_admin:
         _save_pricing_items(db, trip.id, pricing_items, charge_items)
-    _save_driver_changes(db, trip.id, data.driver_changes or [])
+    _save_driver_changes(db, trip.id, data.driver_changes or [], validated_trip_vehicles)
 
-    customer = db.query(Customer).filter(Customer.id == trip.customer_id).first()
-    if customer and is_admin:
-        customer.total_billed += trip.total_charged - prior_total_charged
-        customer.pending_balance += trip.pending_amount - prior_pending
     if not is_admin:
         trip.total_charged = prior_total_charged
         trip.pending_amount = prior_pending
+    for name, delta in customer_trip_deltas(trip).items():
+        customer_deltas[trip.customer_id][name] += delta
+    apply_trip_counters(db, customer_deltas, vehicle_deltas)
+    record_trip(db, trip, pricing.party_fuel_credit)
+    record_vehicle_trip(db, trip)
 
     db.commit()
     db.refresh(trip)
@@ -635,23 +836,19 @@ def update_trip(db: Session, trip_id: int, data: TripUpdate, current_user=None):
 
 
 def delete_trip(db: Session, trip_id: int):
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    # Locked so a concurrent delete waits here and then finds the trip gone.
+    trip = db.query(Trip).filter(Trip.id == trip_id).with_for_update().first()
     if not trip:
         return {"message": "Trip already deleted"}
 
-    customer = db.query(Customer).filter(Customer.id == trip.customer_id).first()
-
+    vehicle_deltas = defaultdict(lambda: {"total_trips": 0, "total_km": 0})
     for entry in (trip.vehicles or []):
-        vehicle = db.query(Vehicle).filter(Vehicle.vehicle_number == entry.vehicle_number).first()
-        if vehicle:
-            vehicle.total_trips = max((vehicle.total_trips or 0) - 1, 0)
-            vehicle.total_km = max((vehicle.total_km or 0) - (entry.distance_km or 0), 0)
-
-    if customer:
-        customer.total_trips = max((customer.total_trips or 0) - 1, 0)
-        customer.total_billed -= trip.total_charged
-        customer.pending_balance -= trip.pending_amount
+        vehicle_deltas[entry.vehicle_number]["total_trips"] -= 1
+        vehicle_deltas[entry.vehicle_number]["total_km"] -= entry.distance_km or 0
+    apply_trip_counters(db, {trip.customer_id: customer_trip_deltas(trip, sign=-1)}, vehicle_deltas)
 
+    record_trip(db, trip, sign=-1)
+    record_vehicle_trip(db, trip, sign=-1)
     db.delete(trip)
     db.commit()
     return {"message": "Trip deleted successfully"}
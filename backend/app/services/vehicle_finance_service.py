@@ -5,16 +5,26 @@ from datetime import date
 from math import pow
 
 from fastapi import HTTPException
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
 
 from app.models.vehicle import Vehicle
 from app.models.vehicle_emi import VehicleEMIInstallment, VehicleEMIPlan
 from app.models.vehicle_insurance import VehicleInsurance
 from app.models.vehicle_tax import VehicleTax
-from app.schemas.vehicle_finance import EMIPlanCreate, InsuranceUpsert, TaxUpsert
+from app.schemas.vehicle_finance import EMIPlanBatchItem, EMIPlanCreate, InsuranceUpsert, TaxUpsert
+from app.services.finance_status_service import installment_aggregates, insurance_status, tax_status
+from app.services.fleet_alert_service import (
+    FINANCE_ALERT_TYPES,
+    fleet_alert_cards,
+    refresh_vehicle_alerts,
+    vehicle_alerts,
+)
+from app.services.pagination import decode_cursor, encode_cursor, paginate_ascending
+from app.services.response_cache import response_cache
 
 
-EXPIRY_WARNING_DAYS = 30
+DEFAULT_INSTALLMENT_PAGE_SIZE = 60
 
 
 def _round_2(value: float) -> float:
@@ -73,6 +83,29 @@ def _installment_status(installment: VehicleEMIInstallment, today: date) -> str:
     return "pending"
 
 
+def _next_due_installments(db: Session, plan_ids: list[int]) -> dict[int, VehicleEMIInstallment]:
+    """The first unpaid installment of each plan."""
+    if not plan_ids:
+        return {}
+    position = (
+        func.row_number()
+        .over(partition_by=VehicleEMIInstallment.emi_plan_id, order_by=VehicleEMIInstallment.installment_number)
+        .label("position")
+    )
+    unpaid = (
+        select(VehicleEMIInstallment.id, position)
+        .where(VehicleEMIInstallment.emi_plan_id.in_(plan_ids), VehicleEMIInstallment.is_paid == False)
+        .subquery()
+    )
+    rows = (
+        db.query(VehicleEMIInstallment)
+        .join(unpaid, unpaid.c.id == VehicleEMIInstallment.id)
+        .filter(unpaid.c.position == 1)
+        .all()
+    )
+    return {row.emi_plan_id: row for row in rows}
+
+
 def _serialize_installment(installment: VehicleEMIInstallment, today: date) -> dict:
     return {
         "id": installment.id,
@@ -90,27 +123,16 @@ def _serialize_installment(installment: VehicleEMIInstallment, today: date) -> d
     }
 
 
-def _serialize_emi_plan(plan: VehicleEMIPlan | None, today: date) -> dict | None:
+def _serialize_emi_plan(
+    plan: VehicleEMIPlan | None,
+    today: date,
+    aggregates: dict | None = None,
+    next_due: VehicleEMIInstallment | None = None,
+) -> dict | None:
+    """Plan header; installments are listed separately through list_emi_installments."""
     if not plan:
         return None
-    installments = sorted(plan.installments, key=lambda i: i.installment_number)
-    paid = 0
-    pending = 0
-    overdue = 0
-    remaining = 0.0
-    serialized_installments: list[dict] = []
-    for installment in installments:
-        status = _installment_status(installment, today)
-        if status == "paid":
-            paid += 1
-        elif status == "overdue":
-            overdue += 1
-        else:
-            pending += 1
-        if not installment.is_paid:
-            remaining += max((installment.amount_due or 0) - (installment.paid_amount or 0), 0)
-        serialized = _serialize_installment(installment, today)
-        serialized_installments.append(serialized)
+    aggregates = aggregates or {"paid": 0, "pending": 0, "overdue": 0, "remaining": 0.0}
     return {
         "id": plan.id,
         "vehicle_number": plan.vehicle_number,
@@ -122,40 +144,25 @@ def _serialize_emi_plan(plan: VehicleEMIPlan | None, today: date) -> dict | None
         "emi_start_date": plan.emi_start_date,
         "emi_end_date": plan.emi_end_date,
         "monthly_emi": _round_2(plan.monthly_emi),
-        "paid_installments": paid,
-        "pending_installments": pending,
-        "overdue_installments": overdue,
-        "total_remaining_balance": _round_2(remaining),
-        "installments": serialized_installments,
+        "paid_installments": aggregates["paid"],
+        "pending_installments": aggregates["pending"],
+        "overdue_installments": aggregates["overdue"],
+        "total_remaining_balance": _round_2(aggregates["remaining"]),
+        "next_due_installment": _serialize_installment(next_due, today) if next_due else None,
     }
 
 
-def _insurance_status(record: VehicleInsurance | None, today: date) -> tuple[int, str]:
-    if not record:
-        return 0, "missing"
-    remaining_days = (record.end_date - today).days
-    if remaining_days < 0:
-        return remaining_days, "expired"
-    if remaining_days <= EXPIRY_WARNING_DAYS:
-        return remaining_days, "expiring_soon"
-    return remaining_days, "active"
-
-
-def _tax_status(record: VehicleTax | None, today: date) -> tuple[int, str]:
-    if not record:
-        return 0, "missing"
-    remaining_days = (record.tax_expiry_date - today).days
-    if remaining_days < 0:
-        return remaining_days, "expired"
-    if remaining_days <= EXPIRY_WARNING_DAYS:
-        return remaining_days, "expiring_soon"
-    return remaining_days, "active"
+def _serialize_emi_plans(db: Session, plans: list[VehicleEMIPlan], today: date) -> list[dict]:
+    plan_ids = [plan.id for plan in plans]
+    aggregates = installment_aggregates(db, today, VehicleEMIPlan.id.in_(plan_ids)) if plan_ids else {}
+    next_due = _next_due_installments(db, plan_ids)
+    return [_serialize_emi_plan(plan, today, aggregates.get(plan.id), next_due.get(plan.id)) for plan in plans]
 
 
 def _serialize_insurance(record: VehicleInsurance | None, today: date) -> dict | None:
     if not record:
         return None
-    remaining_days, status = _insurance_status(record, today)
+    remaining_days, status = insurance_status(record, today)
     return {
         "id": record.id,
         "vehicle_number": record.vehicle_number,
@@ -175,7 +182,7 @@ def _serialize_insurance(record: VehicleInsurance | None, today: date) -> dict |
 def _serialize_tax(record: VehicleTax | None, today: date) -> dict | None:
     if not record:
         return None
-    remaining_days, status = _tax_status(record, today)
+    remaining_days, status = tax_status(record, today)
     return {
         "id": record.id,
         "vehicle_number": record.vehicle_number,
@@ -195,63 +202,120 @@ def _serialize_tax(record: VehicleTax | None, today: date) -> dict | None:
     }
 
 
-def upsert_vehicle_emi_plan(db: Session, vehicle_number: str, payload: EMIPlanCreate) -> dict:
-    normalized_vehicle_number = _ensure_vehicle_exists(db, vehicle_number)
-    loan_amount = _loan_amount_from_input(payload)
-    monthly_emi = _compute_emi(loan_amount, payload.annual_interest_rate, payload.loan_duration_months)
-    emi_end_date = _add_months(payload.emi_start_date, payload.loan_duration_months - 1)
+def _amortization_schedule(plan_id: int, loan_amount: float, annual_interest_rate: float, monthly_emi: float, months: int, start_date: date) -> list[dict]:
+    """Every installment row of a plan, ready for a single executemany insert."""
+    monthly_rate = float(annual_interest_rate) / 12 / 100
+    rows: list[dict] = []
+    balance = float(loan_amount)
+    for installment_number in range(1, months + 1):
+        interest_component = _round_2(balance * monthly_rate) if monthly_rate > 0 else 0.0
+        if installment_number == months:
+            principal_component = _round_2(balance)
+        else:
+            principal_component = _round_2(monthly_emi - interest_component)
+        principal_component = max(principal_component, 0.0)
+        closing_balance = _round_2(max(balance - principal_component, 0.0))
+        rows.append(
+            {
+                "emi_plan_id": plan_id,
+                "installment_number": installment_number,
+                "due_date": _add_months(start_date, installment_number - 1),
+                "opening_balance": _round_2(balance),
+                "principal_component": principal_component,
+                "interest_component": interest_component,
+                "amount_due": _round_2(principal_component + interest_component),
+                "closing_balance": closing_balance,
+                "paid_amount": 0.0,
+                "is_paid": False,
+            }
+        )
+        balance = closing_balance
+    return rows
+
+
+def _create_emi_plans(db: Session, requests: list[tuple[str, EMIPlanCreate]]) -> list[VehicleEMIPlan]:
+    """
+    Replace the active EMI plan of each (normalized vehicle number, payload) pair.
+
+    Plans are flushed together and every installment of every plan goes in with
+    one bulk insert. The caller commits.
+    """
+    plans: list[VehicleEMIPlan] = []
+    for vehicle_number, payload in requests:
+        loan_amount = _loan_amount_from_input(payload)
+        plans.append(
+            VehicleEMIPlan(
+                vehicle_number=vehicle_number,
+                vehicle_purchase_price=_round_2(payload.vehicle_purchase_price),
+                down_payment=_round_2(payload.down_payment),
+                loan_amount=loan_amount,
+                annual_interest_rate=_round_2(payload.annual_interest_rate),
+                loan_duration_months=payload.loan_duration_months,
+                emi_start_date=payload.emi_start_date,
+                emi_end_date=_add_months(payload.emi_start_date, payload.loan_duration_months - 1),
+                monthly_emi=_compute_emi(loan_amount, payload.annual_interest_rate, payload.loan_duration_months),
+                is_active=True,
+            )
+        )
 
     (
         db.query(VehicleEMIPlan)
-        .filter(VehicleEMIPlan.vehicle_number == normalized_vehicle_number, VehicleEMIPlan.is_active == True)
+        .filter(
+            VehicleEMIPlan.vehicle_number.in_([vehicle_number for vehicle_number, _ in requests]),
+            VehicleEMIPlan.is_active == True,
+        )
         .update({"is_active": False})
     )
-
-    plan = VehicleEMIPlan(
-        vehicle_number=normalized_vehicle_number,
-        vehicle_purchase_price=_round_2(payload.vehicle_purchase_price),
-        down_payment=_round_2(payload.down_payment),
-        loan_amount=_round_2(loan_amount),
-        annual_interest_rate=_round_2(payload.annual_interest_rate),
-        loan_duration_months=payload.loan_duration_months,
-        emi_start_date=payload.emi_start_date,
-        emi_end_date=emi_end_date,
-        monthly_emi=_round_2(monthly_emi),
-        is_active=True,
-    )
-    db.add(plan)
+    db.add_all(plans)
     db.flush()
 
-    balance = float(loan_amount)
-    monthly_rate = float(payload.annual_interest_rate) / 12 / 100
-    for installment_number in range(1, payload.loan_duration_months + 1):
-        due_date = _add_months(payload.emi_start_date, installment_number - 1)
-        opening_balance = _round_2(balance)
-        interest_component = _round_2(balance * monthly_rate) if monthly_rate > 0 else 0.0
-        principal_component = _round_2(monthly_emi - interest_component)
-        if installment_number == payload.loan_duration_months:
-            principal_component = _round_2(balance)
-        principal_component = max(principal_component, 0.0)
-        amount_due = _round_2(principal_component + interest_component)
-        closing_balance = _round_2(max(balance - principal_component, 0.0))
-        db.add(
-            VehicleEMIInstallment(
-                emi_plan_id=plan.id,
-                installment_number=installment_number,
-                due_date=due_date,
-                opening_balance=opening_balance,
-                principal_component=principal_component,
-                interest_component=interest_component,
-                amount_due=amount_due,
-                closing_balance=closing_balance,
+    installments: list[dict] = []
+    for plan, (_, payload) in zip(plans, requests):
+        installments.extend(
+            _amortization_schedule(
+                plan.id,
+                plan.loan_amount,
+                payload.annual_interest_rate,
+                plan.monthly_emi,
+                plan.loan_duration_months,
+                plan.emi_start_date,
             )
         )
-        balance = closing_balance
+    db.execute(insert(VehicleEMIInstallment), installments)
+    return plans
 
+
+def upsert_vehicle_emi_plan(db: Session, vehicle_number: str, payload: EMIPlanCreate) -> dict:
+    normalized_vehicle_number = _ensure_vehicle_exists(db, vehicle_number)
+    plan = _create_emi_plans(db, [(normalized_vehicle_number, payload)])[0]
+    refresh_vehicle_alerts(db, [normalized_vehicle_number])
     db.commit()
     db.refresh(plan)
-    _ = plan.installments
-    return _serialize_emi_plan(plan, date.today()) or {}
+    return _serialize_emi_plans(db, [plan], date.today())[0]
+
+
+def upsert_vehicle_emi_plans(db: Session, payloads: list[EMIPlanBatchItem]) -> list[dict]:
+    """Create EMI plans for many vehicles in one transaction, e.g. when a fleet is refinanced."""
+    requests = [(_normalize_vehicle_number(payload.vehicle_number), payload) for payload in payloads]
+    vehicle_numbers = [vehicle_number for vehicle_number, _ in requests]
+    duplicates = sorted({number for number in vehicle_numbers if vehicle_numbers.count(number) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate vehicles in batch: {', '.join(duplicates)}")
+
+    existing = {
+        row.vehicle_number
+        for row in db.query(Vehicle.vehicle_number)
+        .filter(Vehicle.vehicle_number.in_(vehicle_numbers), Vehicle.is_deleted == False)
+        .all()
+    }
+    missing = [number for number in vehicle_numbers if number not in existing]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Vehicle not found: {', '.join(missing)}")
+
+    plans = _create_emi_plans(db, requests)
+    refresh_vehicle_alerts(db, vehicle_numbers)
+    db.commit()
+    return _serialize_emi_plans(db, plans, date.today())
 
 
 def pay_emi_installment(
@@ -271,12 +335,46 @@ def pay_emi_installment(
     installment.paid_amount = _round_2(pay_amount)
     installment.paid_on = paid_on or date.today()
     installment.is_paid = installment.paid_amount >= (installment.amount_due or 0) - 0.01
+    refresh_vehicle_alerts(db, [installment.plan.vehicle_number])
     db.commit()
     db.refresh(installment)
 
     return _serialize_installment(installment, date.today())
 
 
+def list_emi_installments(
+    db: Session,
+    plan_id: int,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> dict:
+    """One page of a plan's installments in schedule order, optionally limited to a due-date range."""
+    if not db.query(VehicleEMIPlan.id).filter(VehicleEMIPlan.id == plan_id).first():
+        raise HTTPException(status_code=404, detail="EMI plan not found")
+
+    query = db.query(VehicleEMIInstallment).filter(VehicleEMIInstallment.emi_plan_id == plan_id)
+    if start_date:
+        query = query.filter(VehicleEMIInstallment.due_date >= start_date)
+    if end_date:
+        query = query.filter(VehicleEMIInstallment.due_date <= end_date)
+    after = tuple(decode_cursor(cursor, 2)) if cursor else None
+    rows, has_more = paginate_ascending(
+        query,
+        VehicleEMIInstallment.installment_number,
+        VehicleEMIInstallment.id,
+        limit=limit or DEFAULT_INSTALLMENT_PAGE_SIZE,
+        after=after,
+    )
+    today = date.today()
+    return {
+        "plan_id": plan_id,
+        "items": [_serialize_installment(row, today) for row in rows],
+        "next_cursor": encode_cursor([rows[-1].installment_number, rows[-1].id]) if has_more else None,
+    }
+
+
 def upsert_vehicle_insurance(db: Session, vehicle_number: str, payload: InsuranceUpsert) -> dict:
     normalized_vehicle_number = _ensure_vehicle_exists(db, vehicle_number)
 
@@ -303,6 +401,7 @@ def upsert_vehicle_insurance(db: Session, vehicle_number: str, payload: Insuranc
         is_active=True,
     )
     db.add(record)
+    refresh_vehicle_alerts(db, [normalized_vehicle_number])
     db.commit()
     db.refresh(record)
     return _serialize_insurance(record, date.today()) or {}
@@ -338,6 +437,7 @@ def upsert_vehicle_tax(db: Session, vehicle_number: str, payload: TaxUpsert) ->
         is_active=True,
     )
     db.add(record)
+    refresh_vehicle_alerts(db, [normalized_vehicle_number])
     db.commit()
     db.refresh(record)
     return _serialize_tax(record, date.today()) or {}
@@ -353,8 +453,6 @@ def get_vehicle_finance_summary(db: Session, vehicle_number: str) -> dict:
         .order_by(VehicleEMIPlan.created_at.desc())
         .first()
     )
-    if emi_plan:
-        _ = emi_plan.installments
     insurance = (
         db.query(VehicleInsurance)
         .filter(VehicleInsurance.vehicle_number == normalized_vehicle_number, VehicleInsurance.is_active == True)
@@ -368,28 +466,18 @@ def get_vehicle_finance_summary(db: Session, vehicle_number: str) -> dict:
         .first()
     )
 
-    emi_payload = _serialize_emi_plan(emi_plan, today)
+    emi_payload = _serialize_emi_plans(db, [emi_plan], today)[0] if emi_plan else None
     insurance_payload = _serialize_insurance(insurance, today)
     tax_payload = _serialize_tax(tax, today)
 
     monthly_total = 0.0
-    alerts: list[str] = []
     if emi_payload:
         monthly_total += float(emi_payload["monthly_emi"])
-        if emi_payload["overdue_installments"] > 0:
-            alerts.append(f"EMI overdue: {emi_payload['overdue_installments']} installment(s)")
     if insurance_payload:
         monthly_total += float(insurance_payload["monthly_insurance_cost"])
-        if insurance_payload["status"] == "expired":
-            alerts.append("Insurance is expired")
-        elif insurance_payload["status"] == "expiring_soon":
-            alerts.append(f"Insurance expires in {insurance_payload['remaining_days']} day(s)")
     if tax_payload:
         monthly_total += float(tax_payload["monthly_tax_cost"])
-        if tax_payload["status"] == "expired":
-            alerts.append("Tax is expired")
-        elif tax_payload["status"] == "expiring_soon":
-            alerts.append(f"Tax expires in {tax_payload['remaining_days']} day(s)")
+    alerts = [row.message for row in vehicle_alerts(db, normalized_vehicle_number, FINANCE_ALERT_TYPES)]
 
     return {
         "vehicle_number": normalized_vehicle_number,
@@ -402,98 +490,95 @@ def get_vehicle_finance_summary(db: Session, vehicle_number: str) -> dict:
     }
 
 
+def get_fleet_monthly_finance_totals(db: Session, vehicle_numbers: list[str]) -> dict[str, float]:
+    """
+    Monthly EMI + insurance + tax per vehicle, using the latest active record of each
+    kind like get_vehicle_finance_summary. Keyed by normalized vehicle number.
+    """
+    normalized = sorted({_normalize_vehicle_number(value) for value in vehicle_numbers})
+    totals = dict.fromkeys(normalized, 0.0)
+    if not normalized:
+        return totals
+
+    for model, amount_field in (
+        (VehicleEMIPlan, "monthly_emi"),
+        (VehicleInsurance, "monthly_insurance_cost"),
+        (VehicleTax, "monthly_tax_cost"),
+    ):
+        records = (
+            db.query(model)
+            .filter(model.vehicle_number.in_(normalized), model.is_active == True)
+            .order_by(model.created_at.desc())
+            .all()
+        )
+        seen: set[str] = set()
+        for record in records:
+            if record.vehicle_number in seen:
+                continue
+            seen.add(record.vehicle_number)
+            totals[record.vehicle_number] += _round_2(getattr(record, amount_field))
+
+    return {key: _round_2(value) for key, value in totals.items()}
+
+
+def get_cached_finance_dashboard_summary(db: Session) -> dict:
+    # Keyed by day because installment, insurance and tax statuses depend on today's date.
+    return response_cache.get_or_compute(
+        db,
+        ("finance_dashboard_summary", date.today()),
+        lambda: get_finance_dashboard_summary(db),
+    )
+
+
 def get_finance_dashboard_summary(db: Session) -> dict:
     today = date.today()
     active_emi_plans = db.query(VehicleEMIPlan).filter(VehicleEMIPlan.is_active == True).all()
     active_insurance = db.query(VehicleInsurance).filter(VehicleInsurance.is_active == True).all()
     active_taxes = db.query(VehicleTax).filter(VehicleTax.is_active == True).all()
 
-    emi_paid = 0
-    emi_pending = 0
-    emi_overdue = 0
-    monthly_emi_outflow = 0.0
-    for plan in active_emi_plans:
-        monthly_emi_outflow += float(plan.monthly_emi or 0)
-        for installment in plan.installments:
-            status = _installment_status(installment, today)
-            if status == "paid":
-                emi_paid += 1
-            elif status == "overdue":
-                emi_overdue += 1
-            else:
-                emi_pending += 1
+    installment_counts = installment_aggregates(db, today, VehicleEMIPlan.is_active == True)
+    emi_paid = sum(counts["paid"] for counts in installment_counts.values())
+    emi_pending = sum(counts["pending"] for counts in installment_counts.values())
+    emi_overdue = sum(counts["overdue"] for counts in installment_counts.values())
+    monthly_emi_outflow = sum(float(plan.monthly_emi or 0) for plan in active_emi_plans)
 
     insurance_expiring_soon = 0
     insurance_expired = 0
     monthly_insurance_outflow = 0.0
-    alert_cards: list[dict] = []
     for record in active_insurance:
         monthly_insurance_outflow += float(record.monthly_insurance_cost or 0)
-        remaining_days, status = _insurance_status(record, today)
+        _, status = insurance_status(record, today)
         if status == "expired":
             insurance_expired += 1
-            alert_cards.append(
-                {
-                    "type": "insurance",
-                    "vehicle_number": record.vehicle_number,
-                    "severity": "danger",
-                    "message": f"Insurance expired {abs(remaining_days)} day(s) ago",
-                    "remaining_days": remaining_days,
-                }
-            )
         elif status == "expiring_soon":
             insurance_expiring_soon += 1
-            alert_cards.append(
-                {
-                    "type": "insurance",
-                    "vehicle_number": record.vehicle_number,
-                    "severity": "warning",
-                    "message": f"Insurance expires in {remaining_days} day(s)",
-                    "remaining_days": remaining_days,
-                }
-            )
 
     tax_expiring_soon = 0
     tax_expired = 0
     monthly_tax_outflow = 0.0
     for record in active_taxes:
         monthly_tax_outflow += float(record.monthly_tax_cost or 0)
-        remaining_days, status = _tax_status(record, today)
+        _, status = tax_status(record, today)
         if status == "expired":
             tax_expired += 1
-            alert_cards.append(
-                {
-                    "type": "tax",
-                    "vehicle_number": record.vehicle_number,
-                    "severity": "danger",
-                    "message": f"Tax expired {abs(remaining_days)} day(s) ago",
-                    "remaining_days": remaining_days,
-                }
-            )
         elif status == "expiring_soon":
             tax_expiring_soon += 1
-            alert_cards.append(
-                {
-                    "type": "tax",
-                    "vehicle_number": record.vehicle_number,
-                    "severity": "warning",
-                    "message": f"Tax expires in {remaining_days} day(s)",
-                    "remaining_days": remaining_days,
-                }
-            )
 
-    vehicle_numbers = sorted(
-        {
-            *(plan.vehicle_number for plan in active_emi_plans),
-            *(row.vehicle_number for row in active_insurance),
-            *(row.vehicle_number for row in active_taxes),
-        }
-    )
+    plans_by_vehicle: dict[str, VehicleEMIPlan] = {}
+    for plan in active_emi_plans:
+        plans_by_vehicle.setdefault(plan.vehicle_number, plan)
+    insurance_by_vehicle: dict[str, VehicleInsurance] = {}
+    for record in active_insurance:
+        insurance_by_vehicle.setdefault(record.vehicle_number, record)
+    tax_by_vehicle: dict[str, VehicleTax] = {}
+    for record in active_taxes:
+        tax_by_vehicle.setdefault(record.vehicle_number, record)
+
     vehicle_wise_expenses: list[dict] = []
-    for vehicle_number in vehicle_numbers:
-        plan = next((row for row in active_emi_plans if row.vehicle_number == vehicle_number), None)
-        insurance = next((row for row in active_insurance if row.vehicle_number == vehicle_number), None)
-        tax = next((row for row in active_taxes if row.vehicle_number == vehicle_number), None)
+    for vehicle_number in sorted({*plans_by_vehicle, *insurance_by_vehicle, *tax_by_vehicle}):
+        plan = plans_by_vehicle.get(vehicle_number)
+        insurance = insurance_by_vehicle.get(vehicle_number)
+        tax = tax_by_vehicle.get(vehicle_number)
         monthly_emi = float(plan.monthly_emi or 0) if plan else 0
         monthly_insurance = float(insurance.monthly_insurance_cost or 0) if insurance else 0
         monthly_tax = float(tax.monthly_tax_cost or 0) if tax else 0
@@ -520,6 +605,6 @@ def get_finance_dashboard_summary(db: Session) -> dict:
         "total_monthly_insurance_outflow": _round_2(monthly_insurance_outflow),
         "total_monthly_tax_outflow": _round_2(monthly_tax_outflow),
         "total_monthly_finance_outflow": _round_2(total_monthly_finance),
-        "alert_cards": alert_cards[:50],
+        "alert_cards": fleet_alert_cards(db, ("insurance", "tax"), limit=50),
         "vehicle_wise_expenses": vehicle_wise_expenses,
     }
@@ -15,7 +15,7 @@ def create_vehicle(db: Session, vehicle: VehicleCreate):
     existing = (
         db.query(Vehicle)
         .filter(
-            func.lower(Vehicle.vehicle_number) == func.lower(normalized_number),
+            Vehicle.vehicle_number == normalized_number,
             Vehicle.is_deleted == False
         )
         .first()
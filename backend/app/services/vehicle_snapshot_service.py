@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import case, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.fuel import Fuel
+from app.models.mechanic import MechanicEntry
+from app.models.oil_bill import OilBill, OilBillEntry
+from app.models.spare_part import SparePart
+from app.models.trip import Trip
+from app.models.trip_vehicle import TripVehicle
+from app.models.vehicle_stats_snapshot import VehicleDriverStats, VehicleStatsSnapshot
+from app.services.dashboard_service import trip_effective_date
+from app.services.expense_service import month_bucket
+from app.services.financial_rollup_service import apply_counter_delta
+
+
+SNAPSHOT_METRICS = (
+    "trip_count",
+    "trip_income",
+    "trip_revenue",
+    "total_km",
+    "trip_fuel_cost",
+    "direct_fuel_cost",
+    "direct_fuel_litres",
+    "spare_cost",
+    "oil_cost",
+    "oil_entries",
+    "mechanic_cost",
+)
+
+_COUNT_METRICS = {"trip_count", "oil_entries"}
+_TRIP_METRICS = ("trip_count", "trip_income", "trip_revenue", "total_km", "trip_fuel_cost")
+
+
+def _month_key(value: date | datetime | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.strftime("%Y-%m")
+
+
+def trip_vehicle_allocation(trip_ids=None):
+    """
+    Per vehicle entry revenue allocation as a subquery, computed with window functions.
+
+    Each entry keeps its own subtotal (base fare + toll + parking + other) and
+    the remainder of the trip's billed total is shared in proportion to those
+    subtotals, or evenly when every subtotal is zero. ``trip_ids`` (a list or
+    a select of trip ids) limits the trips; filter vehicles on the result, not
+    here, so each trip's window still sees all of its entries.
+
+    Columns: trip_vehicle_id, trip_id, vehicle_number, driver_id, distance_km,
+    fuel_cost, allocated_revenue, trip_total, effective_date and
+    first_vehicle_entry (true on one entry per trip and vehicle).
+    """
+    pricing_type = func.lower(func.coalesce(TripVehicle.pricing_type, "per_km"))
+    base = case(
+        (pricing_type == "package", func.coalesce(TripVehicle.package_amount, 0)),
+        else_=func.coalesce(TripVehicle.distance_km, 0) * func.coalesce(TripVehicle.cost_per_km, 0),
+    )
+    subtotal = (
+        base
+        + func.coalesce(TripVehicle.toll_amount, 0)
+        + func.coalesce(TripVehicle.parking_amount, 0)
+        + func.coalesce(TripVehicle.other_expenses, 0)
+    )
+    subtotal_sum = func.sum(subtotal).over(partition_by=TripVehicle.trip_id)
+    entry_count = func.count(TripVehicle.id).over(partition_by=TripVehicle.trip_id)
+    trip_total = func.coalesce(Trip.total_charged, 0)
+    allocated = case(
+        (subtotal_sum > 0, subtotal + (trip_total - subtotal_sum) * subtotal / subtotal_sum),
+        else_=trip_total * 1.0 / entry_count,
+    )
+    fuel_cost = case(
+        (func.coalesce(TripVehicle.fuel_cost, 0) != 0, TripVehicle.fuel_cost),
+        else_=func.coalesce(TripVehicle.diesel_used, 0) + func.coalesce(TripVehicle.petrol_used, 0),
+    )
+    entry_rank = func.row_number().over(
+        partition_by=(TripVehicle.trip_id, TripVehicle.vehicle_number),
+        order_by=TripVehicle.id,
+    )
+
+    query = select(
+        TripVehicle.id.label("trip_vehicle_id"),
+        TripVehicle.trip_id.label("trip_id"),
+        TripVehicle.vehicle_number.label("vehicle_number"),
+        TripVehicle.driver_id.label("driver_id"),
+        func.coalesce(TripVehicle.distance_km, 0).label("distance_km"),
+        fuel_cost.label("fuel_cost"),
+        allocated.label("allocated_revenue"),
+        trip_total.label("trip_total"),
+        trip_effective_date().label("effective_date"),
+        (entry_rank == 1).label("first_vehicle_entry"),
+    ).join(Trip, Trip.id == TripVehicle.trip_id)
+    if trip_ids is not None:
+        query = query.where(TripVehicle.trip_id.in_(trip_ids))
+    return query.subquery("trip_vehicle_allocation")
+
+
+def _allocated_vehicle_months(db: Session, allocation) -> list:
+    month = month_bucket(db, allocation.c.effective_date)
+    first_entry = allocation.c.first_vehicle_entry
+    return db.execute(
+        select(
+            allocation.c.vehicle_number,
+            month.label("month"),
+            func.sum(case((first_entry, 1), else_=0)).label("trip_count"),
+            func.sum(case((first_entry, allocation.c.trip_total), else_=0)).label("trip_income"),
+            func.sum(allocation.c.allocated_revenue).label("trip_revenue"),
+            func.sum(allocation.c.distance_km).label("total_km"),
+            func.sum(allocation.c.fuel_cost).label("trip_fuel_cost"),
+        ).group_by(allocation.c.vehicle_number, month)
+    ).mappings().all()
+
+
+def _allocated_vehicle_drivers(db: Session, allocation) -> list:
+    return db.execute(
+        select(
+            allocation.c.vehicle_number,
+            allocation.c.driver_id,
+            func.count().label("trips"),
+            func.sum(allocation.c.allocated_revenue).label("revenue"),
+        )
+        .where(allocation.c.driver_id.isnot(None))
+        .group_by(allocation.c.vehicle_number, allocation.c.driver_id)
+        .order_by(allocation.c.vehicle_number, allocation.c.driver_id)
+    ).mappings().all()
+
+
+def _record(db: Session, vehicle_number: str | None, value: date | datetime | None, metrics: dict, sign: int) -> None:
+    month = _month_key(value)
+    if not vehicle_number or not month:
+        return
+    apply_counter_delta(
+        db,
+        VehicleStatsSnapshot.__table__,
+        {"vehicle_number": vehicle_number, "month": month},
+        {name: sign * amount for name, amount in metrics.items()},
+    )
+
+
+def record_vehicle_trip(db: Session, trip: Trip, sign: int = 1) -> None:
+    """Apply a trip's per-vehicle share; call with sign=-1 before changing or deleting it."""
+    record_vehicle_trips(db, [trip.id], sign)
+
+
+def record_vehicle_trips(db: Session, trip_ids: list[int], sign: int = 1) -> None:
+    """Apply the per-vehicle shares of several trips, one delta per vehicle and month."""
+    db.flush()
+    allocation = trip_vehicle_allocation(trip_ids)
+    for row in _allocated_vehicle_months(db, allocation):
+        if not row["month"]:
+            continue
+        apply_counter_delta(
+            db,
+            VehicleStatsSnapshot.__table__,
+            {"vehicle_number": row["vehicle_number"], "month": row["month"]},
+            {name: sign * (row[name] or 0) for name in _TRIP_METRICS},
+        )
+    for row in _allocated_vehicle_drivers(db, allocation):
+        apply_counter_delta(
+            db,
+            VehicleDriverStats.__table__,
+            {"vehicle_number": row["vehicle_number"], "driver_id": row["driver_id"]},
+            {"trips": sign * row["trips"], "revenue": sign * float(row["revenue"] or 0)},
+        )
+
+
+def record_vehicle_fuel(db: Session, fuel: Fuel, sign: int = 1) -> None:
+    _record(
+        db,
+        fuel.vehicle_number,
+        fuel.filled_date,
+        {"direct_fuel_cost": float(fuel.total_cost or 0), "direct_fuel_litres": float(fuel.quantity or 0)},
+        sign,
+    )
+
+
+def record_vehicle_spare_part(db: Session, spare: SparePart, sign: int = 1) -> None:
+    amount = float(spare.cost or 0) * float(spare.quantity or 1)
+    _record(db, spare.vehicle_number, spare.replaced_date, {"spare_cost": amount}, sign)
+
+
+def record_vehicle_mechanic_entry(db: Session, entry: MechanicEntry, sign: int = 1) -> None:
+    _record(db, entry.vehicle_number, entry.service_date, {"mechanic_cost": float(entry.cost or 0)}, sign)
+
+
+def record_vehicle_oil_bill(db: Session, bill: OilBill, sign: int = 1) -> None:
+    for entry in bill.entries:
+        _record(db, entry.vehicle_number, bill.bill_date, {"oil_cost": float(entry.total_amount or 0), "oil_entries": 1}, sign)
+
+
+def _vehicle_month_sums(db: Session, vehicle_column, date_column, metrics: dict, *, select_from=None, join=None) -> list:
+    month = month_bucket(db, date_column)
+    query = select(
+        vehicle_column.label("vehicle_number"),
+        month.label("month"),
+        *(func.sum(expr).label(name) for name, expr in metrics.items()),
+    )
+    if select_from is not None:
+        query = query.select_from(select_from)
+    if join is not None:
+        query = query.join(*join)
+    return db.execute(query.group_by(vehicle_column, month)).mappings().all()
+
+
+def rebuild_vehicle_stats_snapshot(db: Session) -> int:
+    """Recompute every vehicle's snapshot from the source tables. Returns the vehicle count."""
+    snapshot: defaultdict[tuple, dict] = defaultdict(lambda: dict.fromkeys(SNAPSHOT_METRICS, 0))
+    allocation = trip_vehicle_allocation()
+    driver_stats = _allocated_vehicle_drivers(db, allocation)
+
+    sources = [
+        _allocated_vehicle_months(db, allocation),
+        _vehicle_month_sums(
+            db,
+            Fuel.vehicle_number,
+            Fuel.filled_date,
+            {"direct_fuel_cost": Fuel.total_cost, "direct_fuel_litres": Fuel.quantity},
+        ),
+        _vehicle_month_sums(
+            db,
+            SparePart.vehicle_number,
+            SparePart.replaced_date,
+            {"spare_cost": SparePart.cost * func.coalesce(SparePart.quantity, 1)},
+        ),
+        _vehicle_month_sums(db, MechanicEntry.vehicle_number, MechanicEntry.service_date, {"mechanic_cost": MechanicEntry.cost}),
+        _vehicle_month_sums(
+            db,
+            OilBillEntry.vehicle_number,
+            OilBill.bill_date,
+            {"oil_cost": OilBillEntry.total_amount, "oil_entries": literal(1)},
+            select_from=OilBillEntry,
+            join=(OilBill, OilBill.id == OilBillEntry.oil_bill_id),
+        ),
+    ]
+    for rows in sources:
+        for row in rows:
+            bucket = snapshot[(row["vehicle_number"], row["month"])]
+            for name, value in row.items():
+                if name not in {"vehicle_number", "month"}:
+                    bucket[name] += value or 0
+
+    db.execute(delete(VehicleStatsSnapshot))
+    db.execute(delete(VehicleDriverStats))
+    if snapshot:
+        db.execute(
+            insert(VehicleStatsSnapshot),
+            [
+                {
+                    "vehicle_number": vehicle_number,
+                    "month": month,
+                    **{name: (int(value) if name in _COUNT_METRICS else float(value)) for name, value in totals.items()},
+                }
+                for (vehicle_number, month), totals in sorted(snapshot.items())
+            ],
+        )
+    if driver_stats:
+        db.execute(
+            insert(VehicleDriverStats),
+            [
+                {
+                    "vehicle_number": row["vehicle_number"],
+                    "driver_id": row["driver_id"],
+                    "trips": row["trips"],
+                    "revenue": float(row["revenue"] or 0),
+                }
+                for row in driver_stats
+            ],
+        )
+    db.commit()
+    return len({vehicle_number for vehicle_number, _ in snapshot})
+
+
+def snapshot_totals(db: Session, vehicle_numbers: list[str]) -> dict[str, dict[str, float]]:
+    """All-time snapshot totals per vehicle number, in one grouped query (unrounded)."""
+    totals = {number: dict.fromkeys(SNAPSHOT_METRICS, 0.0) for number in vehicle_numbers}
+    if not vehicle_numbers:
+        return totals
+    rows = db.execute(
+        select(
+            VehicleStatsSnapshot.vehicle_number,
+            *(func.sum(getattr(VehicleStatsSnapshot, name)).label(name) for name in SNAPSHOT_METRICS),
+        )
+        .where(VehicleStatsSnapshot.vehicle_number.in_(vehicle_numbers))
+        .group_by(VehicleStatsSnapshot.vehicle_number)
+    ).mappings()
+    for row in rows:
+        totals[row["vehicle_number"]] = {name: float(row[name] or 0) for name in SNAPSHOT_METRICS}
+    return totals
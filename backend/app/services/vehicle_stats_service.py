@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from collections import Counter, defaultdict
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session, selectinload
+from fastapi import HTTPException
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
 
 from app.models.driver import Driver
 from app.models.driver_salary import DriverSalary
@@ -15,22 +15,23 @@ from app.models.spare_part import SparePart
 from app.models.trip import Trip
 from app.models.trip_vehicle import TripVehicle
 from app.models.vehicle import Vehicle
-from app.services.maintenance_service import calculate_monthly_maintenance_cost
-from app.services.vehicle_finance_service import get_vehicle_finance_summary
+from app.models.vehicle_stats_snapshot import VehicleDriverStats, VehicleStatsSnapshot
+from app.services.dashboard_service import trip_effective_date
+from app.services.maintenance_service import (
+    calculate_fleet_monthly_maintenance_cost,
+    calculate_monthly_maintenance_cost,
+)
+from app.services.pagination import decode_cursor, encode_cursor, paginate_descending
+from app.services.fleet_alert_service import vehicle_alerts
+from app.services.vehicle_finance_service import get_fleet_monthly_finance_totals, get_vehicle_finance_summary
+from app.services.vehicle_service import normalize_vehicle_number
+from app.services.vehicle_snapshot_service import SNAPSHOT_METRICS, snapshot_totals
 
 
 def _round_2(value: float) -> float:
     return round(float(value or 0), 2)
 
 
-def _month_key(value: date | datetime | None) -> str | None:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        value = value.date()
-    return value.strftime("%Y-%m")
-
-
 def _last_six_months(today: date) -> list[str]:
     keys: list[str] = []
     y, m = today.year, today.month
@@ -44,322 +45,146 @@ def _last_six_months(today: date) -> list[str]:
     return keys
 
 
-def vehicle_summary(db: Session, vehicle_number: str):
+SUMMARY_SECTIONS = (
+    "finance_summary",
+    "financial_details",
+    "trip_performance",
+    "fuel_management",
+    "maintenance_section",
+    "driver_details",
+    "smart_dashboard",
+    "alerts_section",
+    "spare_parts",
+    "oil_entries",
+)
+
+# Lists that accept limit/cursor; service and breakdown history live in maintenance_section.
+HISTORY_LISTS = ("spare_parts", "oil_entries", "service_history", "breakdown_history")
+
+DEFAULT_SERVICE_HISTORY_LIMIT = 20
+BREAKDOWN_KEYWORDS = ("breakdown", "puncture", "engine", "axle", "failed")
+
+
+def _parse_sections(include: str | None) -> set[str]:
+    if not include:
+        return set(SUMMARY_SECTIONS)
+    sections = {value.strip() for value in include.split(",") if value.strip()}
+    unknown = sections - set(SUMMARY_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown summary section(s): {', '.join(sorted(unknown))}. Valid: {', '.join(SUMMARY_SECTIONS)}",
+        )
+    return sections
+
+
+def _parse_history_cursor(cursor: str | None) -> tuple[str | None, tuple | None]:
+    if not cursor:
+        return None, None
+    name, sort_value, row_id = decode_cursor(cursor, 3)
+    if name not in HISTORY_LISTS or not isinstance(row_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        return name, (date.fromisoformat(sort_value), row_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def vehicle_summary(
+    db: Session,
+    vehicle_number: str,
+    include: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+):
+    """
+    Vehicle page summary.
+
+    Headline totals are always returned; ``include`` (comma-separated
+    SUMMARY_SECTIONS, default all) limits which sections are built. With
+    ``limit``, each history list returns at most that many rows newest first
+    and ``next_cursors[list]`` holds the token for its next page; pass it back
+    as ``cursor`` to continue that list.
+    """
+    sections = _parse_sections(include)
+    cursor_list, cursor_after = _parse_history_cursor(cursor)
     today = date.today()
+    vehicle_key = normalize_vehicle_number(vehicle_number)
 
     vehicle = (
         db.query(Vehicle)
-        .filter(func.lower(Vehicle.vehicle_number) == vehicle_number.lower(), Vehicle.is_deleted == False)
+        .filter(Vehicle.vehicle_number == vehicle_key, Vehicle.is_deleted == False)
         .first()
     )
     if not vehicle:
         return None
 
-    vehicle_key = vehicle_number.lower()
-
-    vehicle_trips = (
-        db.query(Trip)
-        .join(TripVehicle, TripVehicle.trip_id == Trip.id)
-        .filter(func.lower(TripVehicle.vehicle_number) == vehicle_key)
-        .options(selectinload(Trip.vehicles))
-        .all()
-    )
-    total_trips = len({trip.id for trip in vehicle_trips})
-
-    total_km = 0.0
-    trip_cost = 0.0
-    trip_fuel_cost = 0.0
-    route_counter: Counter[str] = Counter()
-    driver_counter: Counter[int] = Counter()
-    driver_revenue: defaultdict[int, float] = defaultdict(float)
-    monthly_income: defaultdict[str, float] = defaultdict(float)
-
-    completed_trips = 0
-    upcoming_trips = 0
-    cancelled_trips = 0
-
-    highest_trip = None
-    lowest_trip = None
-
-    for trip in vehicle_trips:
-        effective_date = (trip.departure_datetime.date() if trip.departure_datetime else trip.trip_date) or today
-        if effective_date > today:
-            upcoming_trips += 1
-        elif (trip.total_charged or 0) <= 0:
-            cancelled_trips += 1
-        else:
-            completed_trips += 1
-
-        route = f"{trip.from_location or '-'} -> {trip.to_location or '-'}"
-        route_counter[route] += 1
-
-        trip_total = float(trip.total_charged or 0)
-        month = _month_key(effective_date)
-        if month:
-            monthly_income[month] += trip_total
-
-        if highest_trip is None or trip_total > highest_trip["revenue"]:
-            highest_trip = {
-                "trip_id": trip.id,
-                "invoice_number": trip.invoice_number,
-                "route": route,
-                "revenue": _round_2(trip_total),
-            }
-        if lowest_trip is None or trip_total < lowest_trip["revenue"]:
-            lowest_trip = {
-                "trip_id": trip.id,
-                "invoice_number": trip.invoice_number,
-                "route": route,
-                "revenue": _round_2(trip_total),
-            }
+    next_cursors: dict[str, str] = {}
 
-        vehicles = list(trip.vehicles or [])
-        if not vehicles:
-            continue
-
-        subtotals = []
-        for tv in vehicles:
-            pricing_type = (tv.pricing_type or "per_km").lower()
-            base = (tv.package_amount or 0) if pricing_type == "package" else (tv.distance_km or 0) * (tv.cost_per_km or 0)
-            subtotal = float((base or 0) + (tv.toll_amount or 0) + (tv.parking_amount or 0) + (tv.other_expenses or 0))
-            subtotals.append((tv, subtotal))
-
-        subtotal_sum = sum(value for _, value in subtotals)
-        vehicle_count = len(subtotals) if subtotals else max(trip.number_of_vehicles or 1, 1)
-
-        for tv, subtotal in subtotals:
-            if (tv.vehicle_number or "").lower() != vehicle_key:
-                continue
-
-            total_km += float(tv.distance_km or 0)
-            fuel_cost = float(tv.fuel_cost or 0)
-            if not fuel_cost:
-                fuel_cost = float(tv.diesel_used or 0) + float(tv.petrol_used or 0)
-            trip_fuel_cost += fuel_cost
-
-            allocated_revenue = 0.0
-            if subtotal_sum > 0:
-                allocated_revenue = subtotal + (trip_total - subtotal_sum) * (subtotal / subtotal_sum)
-            else:
-                allocated_revenue = trip_total / vehicle_count
-            trip_cost += allocated_revenue
-
-            if tv.driver_id:
-                driver_counter[tv.driver_id] += 1
-                driver_revenue[tv.driver_id] += allocated_revenue
-
-    customers = (
-        db.query(func.count(func.distinct(Trip.customer_id)))
-        .join(TripVehicle, TripVehicle.trip_id == Trip.id)
-        .filter(func.lower(TripVehicle.vehicle_number) == vehicle_key)
-        .scalar()
-        or 0
+    def history(name: str, query, sort_column, id_column, position, default_limit: int | None = None):
+        rows, has_more = paginate_descending(
+            query,
+            sort_column,
+            id_column,
+            limit=limit if limit is not None else default_limit,
+            after=cursor_after if cursor_list == name else None,
+        )
+        if has_more and limit is not None:
+            next_cursors[name] = encode_cursor([name, *position(rows[-1])])
+        return rows
+
+    snapshot_rows = db.query(VehicleStatsSnapshot).filter(VehicleStatsSnapshot.vehicle_number == vehicle_key).all()
+    months = {row.month: row for row in snapshot_rows}
+    totals = {name: float(sum(getattr(row, name) or 0 for row in snapshot_rows)) for name in SNAPSHOT_METRICS}
+    total_trips = int(totals["trip_count"])
+    total_km = totals["total_km"]
+    trip_cost = totals["trip_revenue"]
+    trip_fuel_cost = totals["trip_fuel_cost"]
+    direct_fuel_cost = totals["direct_fuel_cost"]
+    direct_fuel_litres = totals["direct_fuel_litres"]
+    total_fuel_cost = _round_2(direct_fuel_cost + trip_fuel_cost)
+    oil_total_cost = totals["oil_cost"]
+    mechanic_total_cost = totals["mechanic_cost"]
+
+    trip_ids = select(TripVehicle.trip_id).where(TripVehicle.vehicle_number == vehicle_key)
+    effective_date = trip_effective_date()
+    charged = func.coalesce(Trip.total_charged, 0)
+    trip_stats = (
+        db.query(
+            func.sum(case((effective_date > today, 1), else_=0)).label("upcoming"),
+            func.sum(case((effective_date > today, 0), (charged <= 0, 1), else_=0)).label("cancelled"),
+            func.sum(case((effective_date > today, 0), (charged <= 0, 0), else_=1)).label("completed"),
+            func.count(func.distinct(Trip.customer_id)).label("customers"),
+            func.sum(case((Trip.pending_amount > 0, Trip.pending_amount), else_=0)).label("outstanding"),
+            func.max(Trip.trip_date).label("last_trip_date"),
+        )
+        .filter(Trip.id.in_(trip_ids))
+        .one()
     )
+    completed_trips = int(trip_stats.completed or 0)
 
     monthly_maintenance_cost = calculate_monthly_maintenance_cost(db, vehicle_number)
     maintenance_cost = float(vehicle.total_maintenance_cost or 0)
 
-    fuel_rows = (
-        db.query(Fuel)
-        .filter(func.lower(Fuel.vehicle_number) == vehicle_key)
-        .order_by(Fuel.filled_date.desc())
+    fuel_costs = {
+        fuel_type: _round_2(amount)
+        for fuel_type, amount in db.query(Fuel.fuel_type, func.sum(Fuel.total_cost))
+        .filter(Fuel.vehicle_number == vehicle_key)
+        .group_by(Fuel.fuel_type)
+        .order_by(Fuel.fuel_type)
         .all()
-    )
-    fuel_costs: dict[str, float] = defaultdict(float)
-    direct_fuel_cost = 0.0
-    direct_fuel_litres = 0.0
-    monthly_fuel_cost: defaultdict[str, float] = defaultdict(float)
-    monthly_fuel_litres: defaultdict[str, float] = defaultdict(float)
-    for row in fuel_rows:
-        fuel_costs[row.fuel_type] += float(row.total_cost or 0)
-        direct_fuel_cost += float(row.total_cost or 0)
-        direct_fuel_litres += float(row.quantity or 0)
-        month = _month_key(row.filled_date)
-        if month:
-            monthly_fuel_cost[month] += float(row.total_cost or 0)
-            monthly_fuel_litres[month] += float(row.quantity or 0)
-
-    fuel_costs = {key: _round_2(value) for key, value in fuel_costs.items()}
-    total_fuel_cost = _round_2(direct_fuel_cost + trip_fuel_cost)
-
-    spare_parts = (
-        db.query(SparePart)
-        .filter(func.lower(SparePart.vehicle_number) == vehicle_key)
-        .order_by(SparePart.replaced_date.desc())
-        .all()
-    )
-    spare_parts_replaced = len(spare_parts)
-
-    oil_entries = (
-        db.query(OilBillEntry, OilBill.bill_date.label("bill_date"))
-        .join(OilBill, OilBill.id == OilBillEntry.oil_bill_id)
-        .filter(func.lower(OilBillEntry.vehicle_number) == vehicle_key)
-        .order_by(OilBill.bill_date.desc())
-        .all()
-    )
-    oil_total_cost = sum(float(entry.total_amount or 0) for entry, _ in oil_entries)
-
-    mechanic_entries = (
-        db.query(MechanicEntry)
-        .filter(func.lower(MechanicEntry.vehicle_number) == vehicle_key)
-        .order_by(MechanicEntry.service_date.desc())
-        .all()
-    )
-    mechanic_total_cost = sum(float(m.cost or 0) for m in mechanic_entries)
+    }
 
     finance_summary = get_vehicle_finance_summary(db, vehicle_number)
     emi_details = finance_summary.get("emi") or {}
     monthly_finance_total = float(finance_summary.get("monthly_finance_total", 0) or 0)
 
-    # Driver details and salary pending
-    top_driver_id = driver_counter.most_common(1)[0][0] if driver_counter else None
-    assigned_driver = db.query(Driver).filter(Driver.id == top_driver_id).first() if top_driver_id else None
-    salary_pending = 0.0
-    driver_attendance = 0
-    if assigned_driver and assigned_driver.monthly_salary:
-        month_start = today.replace(day=1)
-        paid_this_month = (
-            db.query(func.coalesce(func.sum(DriverSalary.amount), 0))
-            .filter(
-                DriverSalary.driver_id == assigned_driver.id,
-                DriverSalary.paid_on >= month_start,
-                DriverSalary.paid_on <= today,
-            )
-            .scalar()
-            or 0
-        )
-        salary_pending = max(float(assigned_driver.monthly_salary or 0) - float(paid_this_month or 0), 0)
-
-        attendance_rows = (
-            db.query(func.count(func.distinct(Trip.trip_date)))
-            .join(TripVehicle, TripVehicle.trip_id == Trip.id)
-            .filter(
-                TripVehicle.driver_id == assigned_driver.id,
-                func.lower(TripVehicle.vehicle_number) == vehicle_key,
-                Trip.trip_date >= today.replace(day=1),
-                Trip.trip_date <= today,
-            )
-            .scalar()
-        )
-        driver_attendance = int(attendance_rows or 0)
-
-    # Derived analytics
     total_vehicle_cost = _round_2(
         trip_cost + maintenance_cost + total_fuel_cost + monthly_maintenance_cost + monthly_finance_total + mechanic_total_cost + oil_total_cost
     )
     total_profit_loss = _round_2(trip_cost - (maintenance_cost + total_fuel_cost + mechanic_total_cost + oil_total_cost + monthly_finance_total))
-    running_cost_per_km = _round_2(total_vehicle_cost / total_km) if total_km > 0 else 0.0
-    fuel_efficiency = _round_2(total_km / direct_fuel_litres) if direct_fuel_litres > 0 else 0.0
-
-    monthly_keys = _last_six_months(today)
-    monthly_expense: defaultdict[str, float] = defaultdict(float)
-
-    for row in mechanic_entries:
-        key = _month_key(row.service_date)
-        if key:
-            monthly_expense[key] += float(row.cost or 0)
-
-    for row in spare_parts:
-        key = _month_key(row.replaced_date)
-        if key:
-            monthly_expense[key] += float(row.cost or 0) * float(row.quantity or 1)
-
-    for row, bill_date in oil_entries:
-        key = _month_key(bill_date)
-        if key:
-            monthly_expense[key] += float(row.total_amount or 0)
-
-    for key, value in monthly_fuel_cost.items():
-        monthly_expense[key] += value
-
-    for key in monthly_keys:
-        monthly_expense[key] += monthly_finance_total
-
-    monthly_expense_income_graph = [
-        {
-            "month": key,
-            "income": _round_2(monthly_income.get(key, 0)),
-            "expense": _round_2(monthly_expense.get(key, 0)),
-        }
-        for key in monthly_keys
-    ]
-    profit_trend_graph = [
-        {
-            "month": row["month"],
-            "profit": _round_2(float(row["income"]) - float(row["expense"])),
-        }
-        for row in monthly_expense_income_graph
-    ]
-
-    # ROI and health score
-    estimated_investment = float(emi_details.get("vehicle_purchase_price", 0) or 0)
-    if estimated_investment <= 0:
-        estimated_investment = float(emi_details.get("loan_amount", 0) or 0) + float(emi_details.get("down_payment", 0) or 0)
-    roi = _round_2((total_profit_loss / estimated_investment) * 100) if estimated_investment > 0 else 0.0
-
-    health_score = 100
-    if fuel_efficiency > 0 and fuel_efficiency < 4:
-        health_score -= 20
-    if running_cost_per_km > 0 and running_cost_per_km > 80:
-        health_score -= 15
-    if emi_details.get("overdue_installments", 0) > 0:
-        health_score -= 20
-    if mechanic_entries and mechanic_entries[0].service_date and mechanic_entries[0].service_date < today - timedelta(days=180):
-        health_score -= 10
-    health_score = max(min(health_score, 100), 0)
-
-    # Alerts
-    alerts: list[dict] = []
-    for alert in finance_summary.get("alerts", []):
-        alerts.append({"type": "finance", "severity": "warning", "message": alert})
-
-    last_service_date = mechanic_entries[0].service_date if mechanic_entries else None
-    next_service_due = (last_service_date + timedelta(days=90)) if last_service_date else None
-    if next_service_due:
-        remaining = (next_service_due - today).days
-        if remaining < 0:
-            alerts.append({"type": "service", "severity": "danger", "message": "Service overdue"})
-        elif remaining <= 7:
-            alerts.append({"type": "service", "severity": "warning", "message": f"Service due in {remaining} day(s)"})
-
-    most_frequent_route = route_counter.most_common(1)[0][0] if route_counter else None
-    avg_revenue_trip = _round_2(trip_cost / completed_trips) if completed_trips > 0 else 0.0
-
-    driver_performance_rows = []
-    if driver_counter:
-        driver_lookup = {
-            driver.id: driver
-            for driver in db.query(Driver).filter(Driver.id.in_(list(driver_counter.keys()))).all()
-        }
-        for driver_id, count in driver_counter.most_common():
-            driver_obj = driver_lookup.get(driver_id)
-            driver_performance_rows.append(
-                {
-                    "driver_id": driver_id,
-                    "driver_name": driver_obj.name if driver_obj else f"Driver #{driver_id}",
-                    "trips": count,
-                    "revenue": _round_2(driver_revenue.get(driver_id, 0)),
-                    "avg_revenue": _round_2(driver_revenue.get(driver_id, 0) / count) if count > 0 else 0,
-                }
-            )
-
-    breakdown_keywords = ("breakdown", "puncture", "engine", "axle", "failed")
-    breakdown_history = [
-        {
-            "id": entry.id,
-            "service_date": entry.service_date,
-            "work_description": entry.work_description,
-            "cost": _round_2(entry.cost),
-        }
-        for entry in mechanic_entries
-        if any(keyword in (entry.work_description or "").lower() for keyword in breakdown_keywords)
-    ]
 
-    active_status = "active" if completed_trips > 0 and any(
-        ((trip.trip_date or today) >= today - timedelta(days=30)) for trip in vehicle_trips
-    ) else "inactive"
-
-    return {
+    summary = {
         "vehicle_number": vehicle_number,
         "total_trips": total_trips,
         "total_km": _round_2(total_km),
@@ -371,43 +196,109 @@ def vehicle_summary(db: Session, vehicle_number: str):
         "trip_fuel_cost": _round_2(trip_fuel_cost),
         "total_fuel_cost": _round_2(total_fuel_cost),
         "total_vehicle_cost": total_vehicle_cost,
-        "customers_served": customers,
-        "finance_summary": finance_summary,
+        "customers_served": int(trip_stats.customers or 0),
+    }
+    if "finance_summary" in sections:
+        summary["finance_summary"] = finance_summary
 
-        "financial_details": {
+    if "financial_details" in sections:
+        summary["financial_details"] = {
             "emi_details": finance_summary.get("emi"),
             "insurance_status": finance_summary.get("insurance"),
             "tax_expiry": finance_summary.get("tax"),
             "monthly_fixed_cost": _round_2(monthly_finance_total + monthly_maintenance_cost),
             "total_profit_loss": total_profit_loss,
-            "outstanding_payments": _round_2(sum(max(float(trip.pending_amount or 0), 0) for trip in vehicle_trips)),
-        },
+            "outstanding_payments": _round_2(trip_stats.outstanding),
+        }
+
+    driver_performance_rows = []
+    if sections & {"trip_performance", "driver_details"}:
+        driver_rows = (
+            db.query(VehicleDriverStats)
+            .filter(VehicleDriverStats.vehicle_number == vehicle_key, VehicleDriverStats.trips > 0)
+            .order_by(VehicleDriverStats.trips.desc(), VehicleDriverStats.revenue.desc(), VehicleDriverStats.driver_id.asc())
+            .all()
+        )
+        driver_lookup = {
+            driver.id: driver
+            for driver in db.query(Driver).filter(Driver.id.in_([row.driver_id for row in driver_rows])).all()
+        } if driver_rows else {}
+        for row in driver_rows:
+            driver_obj = driver_lookup.get(row.driver_id)
+            revenue = float(row.revenue or 0)
+            driver_performance_rows.append(
+                {
+                    "driver_id": row.driver_id,
+                    "driver_name": driver_obj.name if driver_obj else f"Driver #{row.driver_id}",
+                    "trips": row.trips,
+                    "revenue": _round_2(revenue),
+                    "avg_revenue": _round_2(revenue / row.trips) if row.trips > 0 else 0,
+                }
+            )
+
+    if "trip_performance" in sections:
+        from_label = func.coalesce(func.nullif(Trip.from_location, ""), "-")
+        to_label = func.coalesce(func.nullif(Trip.to_location, ""), "-")
+        top_route = (
+            db.query(from_label, to_label)
+            .filter(Trip.id.in_(trip_ids))
+            .group_by(from_label, to_label)
+            .order_by(func.count(Trip.id).desc())
+            .first()
+        )
 
-        "trip_performance": {
+        def revenue_card(trip: Trip | None):
+            if trip is None:
+                return None
+            return {
+                "trip_id": trip.id,
+                "invoice_number": trip.invoice_number,
+                "route": f"{trip.from_location or '-'} -> {trip.to_location or '-'}",
+                "revenue": _round_2(trip.total_charged),
+            }
+
+        trips_for_vehicle = db.query(Trip).filter(Trip.id.in_(trip_ids))
+        summary["trip_performance"] = {
             "total_completed_trips": completed_trips,
-            "upcoming_trips": upcoming_trips,
-            "cancelled_trips": cancelled_trips,
-            "most_frequent_route": most_frequent_route,
-            "highest_revenue_trip": highest_trip,
-            "lowest_revenue_trip": lowest_trip,
-            "average_revenue_per_trip": avg_revenue_trip,
+            "upcoming_trips": int(trip_stats.upcoming or 0),
+            "cancelled_trips": int(trip_stats.cancelled or 0),
+            "most_frequent_route": f"{top_route[0]} -> {top_route[1]}" if top_route else None,
+            "highest_revenue_trip": revenue_card(trips_for_vehicle.order_by(charged.desc(), Trip.id.asc()).first()),
+            "lowest_revenue_trip": revenue_card(trips_for_vehicle.order_by(charged.asc(), Trip.id.asc()).first()),
+            "average_revenue_per_trip": _round_2(trip_cost / completed_trips) if completed_trips > 0 else 0.0,
             "driver_wise_performance": driver_performance_rows,
-        },
+        }
 
-        "fuel_management": {
+    # Snapshot sums can carry float residue after a trip is removed, so test rounded values.
+    running_cost_per_km = _round_2(total_vehicle_cost / total_km) if _round_2(total_km) > 0 else 0.0
+    fuel_efficiency = _round_2(total_km / direct_fuel_litres) if _round_2(direct_fuel_litres) > 0 else 0.0
+    monthly_keys = _last_six_months(today)
+
+    def month_value(key: str, name: str) -> float:
+        row = months.get(key)
+        return float(getattr(row, name) or 0) if row is not None else 0.0
+
+    if "fuel_management" in sections:
+        last_fuel = (
+            db.query(Fuel)
+            .filter(Fuel.vehicle_number == vehicle_key)
+            .order_by(Fuel.filled_date.desc())
+            .first()
+        )
+        summary["fuel_management"] = {
             "average_mileage": fuel_efficiency,
             "fuel_efficiency_km_per_l": fuel_efficiency,
             "last_fuel_entry": {
-                "filled_date": fuel_rows[0].filled_date if fuel_rows else None,
-                "quantity": _round_2(fuel_rows[0].quantity) if fuel_rows else None,
-                "total_cost": _round_2(fuel_rows[0].total_cost) if fuel_rows else None,
-                "fuel_type": fuel_rows[0].fuel_type if fuel_rows else None,
+                "filled_date": last_fuel.filled_date if last_fuel else None,
+                "quantity": _round_2(last_fuel.quantity) if last_fuel else None,
+                "total_cost": _round_2(last_fuel.total_cost) if last_fuel else None,
+                "fuel_type": last_fuel.fuel_type if last_fuel else None,
             },
             "monthly_fuel_trend": [
                 {
                     "month": key,
-                    "litres": _round_2(monthly_fuel_litres.get(key, 0)),
-                    "expense": _round_2(monthly_fuel_cost.get(key, 0)),
+                    "litres": _round_2(month_value(key, "direct_fuel_litres")),
+                    "expense": _round_2(month_value(key, "direct_fuel_cost")),
                 }
                 for key in monthly_keys
             ],
@@ -416,10 +307,43 @@ def vehicle_summary(db: Session, vehicle_number: str):
                 "direct_fuel_cost": _round_2(direct_fuel_cost),
                 "total_fuel_cost": _round_2(total_fuel_cost),
             },
-        },
+        }
 
-        "maintenance_section": {
-            "next_service_due": next_service_due,
+    # Stored fleet alerts feed the maintenance section and the alerts list; the last service date feeds the health score.
+    alerts: list[dict] = []
+    last_service_date = None
+    if sections & {"maintenance_section", "smart_dashboard", "alerts_section"}:
+        last_service_date = (
+            db.query(func.max(MechanicEntry.service_date))
+            .filter(MechanicEntry.vehicle_number == vehicle_key)
+            .scalar()
+        )
+        alerts = [
+            {"type": row.alert_type, "severity": row.severity, "message": row.message}
+            for row in vehicle_alerts(db, vehicle_key)
+        ]
+
+    if "maintenance_section" in sections:
+        mechanic_entries = db.query(MechanicEntry).filter(MechanicEntry.vehicle_number == vehicle_key)
+        service_history = history(
+            "service_history",
+            mechanic_entries,
+            MechanicEntry.service_date,
+            MechanicEntry.id,
+            lambda row: (row.service_date, row.id),
+            default_limit=DEFAULT_SERVICE_HISTORY_LIMIT,
+        )
+        breakdown_entries = history(
+            "breakdown_history",
+            mechanic_entries.filter(
+                or_(*(func.lower(MechanicEntry.work_description).like(f"%{keyword}%") for keyword in BREAKDOWN_KEYWORDS))
+            ),
+            MechanicEntry.service_date,
+            MechanicEntry.id,
+            lambda row: (row.service_date, row.id),
+        )
+        summary["maintenance_section"] = {
+            "next_service_due": (last_service_date + timedelta(days=90)) if last_service_date else None,
             "last_service_date": last_service_date,
             "service_history": [
                 {
@@ -429,16 +353,58 @@ def vehicle_summary(db: Session, vehicle_number: str):
                     "cost": _round_2(row.cost),
                     "vendor": row.vendor,
                 }
-                for row in mechanic_entries[:20]
+                for row in service_history
             ],
-            "spare_parts_replaced": spare_parts_replaced,
-            "oil_entries_count": len(oil_entries),
+            "spare_parts_replaced": (
+                db.query(func.count(SparePart.id)).filter(SparePart.vehicle_number == vehicle_key).scalar() or 0
+            ),
+            "oil_entries_count": int(totals["oil_entries"]),
             "oil_total_cost": _round_2(oil_total_cost),
             "maintenance_alerts": [item for item in alerts if item["type"] in {"service"}],
-            "breakdown_history": breakdown_history,
-        },
+            "breakdown_history": [
+                {
+                    "id": entry.id,
+                    "service_date": entry.service_date,
+                    "work_description": entry.work_description,
+                    "cost": _round_2(entry.cost),
+                }
+                for entry in breakdown_entries
+            ],
+        }
 
-        "driver_details": {
+    if "driver_details" in sections:
+        top_driver_id = driver_performance_rows[0]["driver_id"] if driver_performance_rows else None
+        assigned_driver = db.query(Driver).filter(Driver.id == top_driver_id).first() if top_driver_id else None
+        salary_pending = 0.0
+        driver_attendance = 0
+        if assigned_driver and assigned_driver.monthly_salary:
+            month_start = today.replace(day=1)
+            paid_this_month = (
+                db.query(func.coalesce(func.sum(DriverSalary.amount), 0))
+                .filter(
+                    DriverSalary.driver_id == assigned_driver.id,
+                    DriverSalary.paid_on >= month_start,
+                    DriverSalary.paid_on <= today,
+                )
+                .scalar()
+                or 0
+            )
+            salary_pending = max(float(assigned_driver.monthly_salary or 0) - float(paid_this_month or 0), 0)
+
+            attendance_rows = (
+                db.query(func.count(func.distinct(Trip.trip_date)))
+                .join(TripVehicle, TripVehicle.trip_id == Trip.id)
+                .filter(
+                    TripVehicle.driver_id == assigned_driver.id,
+                    TripVehicle.vehicle_number == vehicle_key,
+                    Trip.trip_date >= today.replace(day=1),
+                    Trip.trip_date <= today,
+                )
+                .scalar()
+            )
+            driver_attendance = int(attendance_rows or 0)
+
+        summary["driver_details"] = {
             "assigned_driver": {
                 "driver_id": assigned_driver.id,
                 "name": assigned_driver.name,
@@ -450,19 +416,68 @@ def vehicle_summary(db: Session, vehicle_number: str):
             "driver_performance": driver_performance_rows[:5],
             "driver_attendance": driver_attendance,
             "driver_salary_pending": _round_2(salary_pending),
-        },
-        "smart_dashboard": {
+        }
+
+    if "smart_dashboard" in sections:
+        monthly_expense_income_graph = []
+        for key in monthly_keys:
+            expense = (
+                month_value(key, "mechanic_cost")
+                + month_value(key, "spare_cost")
+                + month_value(key, "oil_cost")
+                + month_value(key, "direct_fuel_cost")
+                + monthly_finance_total
+            )
+            monthly_expense_income_graph.append(
+                {"month": key, "income": _round_2(month_value(key, "trip_income")), "expense": _round_2(expense)}
+            )
+
+        estimated_investment = float(emi_details.get("vehicle_purchase_price", 0) or 0)
+        if estimated_investment <= 0:
+            estimated_investment = float(emi_details.get("loan_amount", 0) or 0) + float(emi_details.get("down_payment", 0) or 0)
+        roi = _round_2((total_profit_loss / estimated_investment) * 100) if estimated_investment > 0 else 0.0
+
+        health_score = 100
+        if fuel_efficiency > 0 and fuel_efficiency < 4:
+            health_score -= 20
+        if running_cost_per_km > 0 and running_cost_per_km > 80:
+            health_score -= 15
+        if emi_details.get("overdue_installments", 0) > 0:
+            health_score -= 20
+        if last_service_date and last_service_date < today - timedelta(days=180):
+            health_score -= 10
+        health_score = max(min(health_score, 100), 0)
+
+        last_trip_date = trip_stats.last_trip_date
+        active_status = (
+            "active"
+            if completed_trips > 0 and last_trip_date is not None and last_trip_date >= today - timedelta(days=30)
+            else "inactive"
+        )
+        summary["smart_dashboard"] = {
             "vehicle_health_score": health_score,
             "vehicle_active_status": active_status,
             "running_cost_per_km": running_cost_per_km,
             "roi": roi,
             "monthly_expense_vs_income_graph": monthly_expense_income_graph,
-            "profit_trend_graph": profit_trend_graph,
-        },
+            "profit_trend_graph": [
+                {"month": row["month"], "profit": _round_2(float(row["income"]) - float(row["expense"]))}
+                for row in monthly_expense_income_graph
+            ],
+        }
 
-        "alerts_section": alerts,
+    if "alerts_section" in sections:
+        summary["alerts_section"] = alerts
 
-        "spare_parts": [
+    if "spare_parts" in sections:
+        spare_parts = history(
+            "spare_parts",
+            db.query(SparePart).filter(SparePart.vehicle_number == vehicle_key),
+            SparePart.replaced_date,
+            SparePart.id,
+            lambda row: (row.replaced_date, row.id),
+        )
+        summary["spare_parts"] = [
             {
                 "id": sp.id,
                 "part_name": sp.part_name,
@@ -472,8 +487,19 @@ def vehicle_summary(db: Session, vehicle_number: str):
                 "replaced_date": sp.replaced_date,
             }
             for sp in spare_parts
-        ],
-        "oil_entries": [
+        ]
+
+    if "oil_entries" in sections:
+        oil_entries = history(
+            "oil_entries",
+            db.query(OilBillEntry, OilBill.bill_date.label("bill_date"))
+            .join(OilBill, OilBill.id == OilBillEntry.oil_bill_id)
+            .filter(OilBillEntry.vehicle_number == vehicle_key),
+            OilBill.bill_date,
+            OilBillEntry.id,
+            lambda row: (row.bill_date, row.OilBillEntry.id),
+        )
+        summary["oil_entries"] = [
             {
                 "id": entry.id,
                 "bill_id": entry.oil_bill_id,
@@ -485,5 +511,69 @@ def vehicle_summary(db: Session, vehicle_number: str):
                 "note": entry.note,
             }
             for entry, bill_date in oil_entries
-        ],
-    }
+        ]
+
+    summary["next_cursors"] = next_cursors
+    return summary
+
+
+def fleet_summary(db: Session, vehicle_numbers: list[str] | None = None) -> list[dict]:
+    """
+    Cost and profit totals for many vehicles at once.
+
+    Uses the same definitions as vehicle_summary, read from the vehicle stats
+    snapshot with one grouped query for the whole set.
+    """
+    query = db.query(Vehicle).filter(Vehicle.is_deleted == False)
+    if vehicle_numbers is not None:
+        keys = {normalize_vehicle_number(number) for number in vehicle_numbers}
+        if not keys:
+            return []
+        query = query.filter(Vehicle.vehicle_number.in_(keys))
+    vehicles = query.order_by(Vehicle.vehicle_number.asc()).all()
+    if not vehicles:
+        return []
+
+    numbers = [vehicle.vehicle_number for vehicle in vehicles]
+    stats = snapshot_totals(db, numbers)
+    monthly_maintenance = calculate_fleet_monthly_maintenance_cost(db, numbers)
+    monthly_finance = get_fleet_monthly_finance_totals(db, numbers)
+
+    summaries = []
+    for vehicle in vehicles:
+        key = vehicle.vehicle_number
+        row = stats[key]
+        direct_fuel_cost = row["direct_fuel_cost"]
+        oil_total_cost = row["oil_cost"]
+        mechanic_total_cost = row["mechanic_cost"]
+        total_fuel_cost = _round_2(direct_fuel_cost + row["trip_fuel_cost"])
+        maintenance_cost = float(vehicle.total_maintenance_cost or 0)
+        monthly_maintenance_cost = monthly_maintenance.get(key, 0.0)
+        monthly_finance_total = monthly_finance.get(key, 0.0)
+        trip_cost = row["trip_revenue"]
+
+        total_vehicle_cost = _round_2(
+            trip_cost + maintenance_cost + total_fuel_cost + monthly_maintenance_cost + monthly_finance_total + mechanic_total_cost + oil_total_cost
+        )
+        summaries.append(
+            {
+                "vehicle_number": vehicle.vehicle_number,
+                "total_trips": int(row["trip_count"]),
+                "total_km": _round_2(row["total_km"]),
+                "trip_cost": _round_2(trip_cost),
+                "maintenance_cost": _round_2(maintenance_cost),
+                "monthly_maintenance_cost": _round_2(monthly_maintenance_cost),
+                "monthly_finance_total": _round_2(monthly_finance_total),
+                "direct_fuel_cost": _round_2(direct_fuel_cost),
+                "trip_fuel_cost": _round_2(row["trip_fuel_cost"]),
+                "total_fuel_cost": total_fuel_cost,
+                "oil_total_cost": _round_2(oil_total_cost),
+                "mechanic_total_cost": _round_2(mechanic_total_cost),
+                "spare_parts_cost": _round_2(row["spare_cost"]),
+                "total_vehicle_cost": total_vehicle_cost,
+                "total_profit_loss": _round_2(
+                    trip_cost - (maintenance_cost + total_fuel_cost + mechanic_total_cost + oil_total_cost + monthly_finance_total)
+                ),
+            }
+        )
+    return summaries
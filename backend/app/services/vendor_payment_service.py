@@ -4,12 +4,10 @@ from fastapi import HTTPException
 from app.models.vendor_payment import VendorPayment
 from app.models.trip import Trip
 from app.models.vendor import Vendor
-from app.models.fuel import Fuel
-from app.models.mechanic import MechanicEntry
-from app.models.oil_bill import OilBill, OilBillEntry
-from app.models.spare_part import SparePart
-from app.models.trip_vehicle import TripVehicle
+from app.models.oil_bill import OilBill
 from app.schemas.vendor_payment import VendorPaymentCreate
+from app.services.financial_rollup_service import record_vendor_payment
+from app.services.vendor_stats_service import vendor_balance
 
 
 def list_payments_by_vendor(db: Session, vendor_id: int):
@@ -62,61 +60,7 @@ def create_vendor_payment(db: Session, data: VendorPaymentCreate):
                 detail=f"Payment exceeds bill pending amount. Pending for this bill is Rs. {bill_pending:.2f}",
             )
 
-    normalized_name = (vendor.name or "").strip().lower()
-
-    fuel_total = (
-        db.query(func.coalesce(func.sum(Fuel.total_cost), 0.0))
-        .filter(func.lower(func.trim(Fuel.vendor)) == normalized_name)
-        .scalar()
-    )
-    spare_total = (
-        db.query(func.coalesce(func.sum(SparePart.cost * SparePart.quantity), 0.0))
-        .filter(func.lower(func.trim(SparePart.vendor)) == normalized_name)
-        .scalar()
-    )
-    mechanic_total = (
-        db.query(func.coalesce(func.sum(MechanicEntry.cost), 0.0))
-        .filter(func.lower(func.trim(MechanicEntry.vendor)) == normalized_name)
-        .scalar()
-    )
-    oil_total = (
-        db.query(func.coalesce(func.sum(OilBillEntry.total_amount), 0.0))
-        .join(OilBill, OilBill.id == OilBillEntry.oil_bill_id)
-        .filter(OilBill.vendor_id == data.vendor_id)
-        .scalar()
-    )
-    trip_vehicle_total = (
-        db.query(func.coalesce(func.sum(TripVehicle.fuel_cost), 0.0))
-        .filter(func.lower(func.trim(TripVehicle.fuel_vendor)) == normalized_name)
-        .scalar()
-    )
-    matching_trip_ids = (
-        db.query(TripVehicle.trip_id)
-        .filter(func.lower(func.trim(TripVehicle.fuel_vendor)) == normalized_name)
-        .distinct()
-        .subquery()
-    )
-    trip_no_vehicle_total = (
-        db.query(func.coalesce(func.sum(Trip.diesel_used + Trip.petrol_used), 0.0))
-        .filter(func.lower(func.trim(Trip.vendor)) == normalized_name)
-        .filter(~Trip.id.in_(matching_trip_ids))
-        .scalar()
-    )
-    paid_total = (
-        db.query(func.coalesce(func.sum(VendorPayment.amount), 0.0))
-        .filter(VendorPayment.vendor_id == data.vendor_id)
-        .scalar()
-    )
-
-    total_owed = (
-        float(fuel_total or 0)
-        + float(spare_total or 0)
-        + float(mechanic_total or 0)
-        + float(oil_total or 0)
-        + float(trip_vehicle_total or 0)
-        + float(trip_no_vehicle_total or 0)
-    )
-    pending_amount = max(total_owed - float(paid_total or 0), 0)
+    pending_amount = vendor_balance(db, vendor)["pending"]
     if float(data.amount or 0) > pending_amount:
         raise HTTPException(
             status_code=400,
@@ -125,6 +69,7 @@ def create_vendor_payment(db: Session, data: VendorPaymentCreate):
 
     payment = VendorPayment(**data.dict())
     db.add(payment)
+    record_vendor_payment(db, payment)
     db.commit()
     db.refresh(payment)
     return payment
@@ -133,6 +78,7 @@ def create_vendor_payment(db: Session, data: VendorPaymentCreate):
 def delete_vendor_payment(db: Session, payment_id: int):
     payment = db.query(VendorPayment).filter(VendorPayment.id == payment_id).first()
     if payment:
+        record_vendor_payment(db, payment, sign=-1)
         db.delete(payment)
         db.commit()
     return payment
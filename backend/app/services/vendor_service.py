@@ -6,6 +6,8 @@ from app.models.vendor import Vendor
 from app.models.oil_bill import OilBill
 from app.models.vendor_payment import VendorPayment
 from app.schemas.vendor import VendorCreate, VendorUpdate
+from app.services.financial_rollup_service import record_oil_bill, record_vendor_payment
+from app.services.vehicle_snapshot_service import record_vehicle_oil_bill
 
 ALLOWED_CATEGORIES = {"fuel", "spare_parts", "mechanic", "oil"}
 
@@ -84,6 +86,12 @@ def delete_vendor(db: Session, vendor_id: int):
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
 
+    for payment in db.query(VendorPayment).filter(VendorPayment.vendor_id == vendor_id).all():
+        record_vendor_payment(db, payment, sign=-1)
+    for bill in db.query(OilBill).filter(OilBill.vendor_id == vendor_id).all():
+        record_oil_bill(db, bill, sign=-1)
+        record_vehicle_oil_bill(db, bill, sign=-1)
+
     db.query(VendorPayment).filter(VendorPayment.vendor_id == vendor_id).delete(
         synchronize_session=False
     )
@@ -0,0 +1,23 @@
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import app.models  # noqa: E402,F401
+from app.database.session import SessionLocal  # noqa: E402
+from app.services.vehicle_snapshot_service import rebuild_vehicle_stats_snapshot  # noqa: E402
+
+
+def main():
+    db = SessionLocal()
+    try:
+        vehicles = rebuild_vehicle_stats_snapshot(db)
+        print(f"Rebuilt vehicle stats snapshot for {vehicles} vehicles.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,66 @@
 from pathlib import Path
+import argparse
+import os
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
+import app.models  # noqa: E402,F401
 from app.database.session import SessionLocal  # noqa: E402
-from app.models.customer import Customer  # noqa: E402
-from app.models.trip import Trip  # noqa: E402
-from app.services.trip_service import _calculate_base_pricing, _calculate_pricing_items_total, _calculate_trip_days  # noqa: E402
+from app.services.financial_rollup_service import rebuild_financial_rollup  # noqa: E402
+from app.services.trip_recalculation_service import RECALCULATION_CHUNK_SIZE, recalculate_trip_totals  # noqa: E402
+from app.services.vehicle_snapshot_service import rebuild_vehicle_stats_snapshot  # noqa: E402
 
 
-def recalculate_trip(trip: Trip):
-    pricing_items = [item for item in (trip.pricing_items or []) if item.item_type == "pricing"]
-    charge_items = [item for item in (trip.pricing_items or []) if item.item_type == "charge"]
-    trip_days = _calculate_trip_days(trip.departure_datetime, trip.return_datetime)
+def _money(value):
+    return f"{float(value or 0):.2f}"
 
-    base_pricing_total = _calculate_base_pricing(
-        trip.pricing_type,
-        trip.package_amount or 0,
-        trip_days,
-        trip.distance_km or 0,
-        trip.cost_per_km or 0,
-        trip.number_of_vehicles or 1,
-    )
-    pricing_items_total = _calculate_pricing_items_total(
-        pricing_items,
-        trip.number_of_vehicles or 1,
-    )
-    charges_total = sum(
-        (item.amount if item.amount else (item.quantity or 1) * (item.rate or 0))
-        for item in charge_items
-    )
 
-    trip.total_charged = (
-        base_pricing_total +
-        pricing_items_total +
-        (trip.charged_toll_amount or 0) +
-        (trip.charged_parking_amount or 0) +
-        charges_total +
-        (trip.other_expenses or 0) -
-        (trip.discount_amount or 0)
-    )
-    trip.pending_amount = max((trip.total_charged or 0) - (trip.amount_received or 0), 0)
-    return trip.total_charged, trip.pending_amount
+def print_invalid(report):
+    for trip in report["invalid"]:
+        print(f"Trip {trip['id']} ({trip['invoice_number']}) left unchanged: {trip['error']}")
 
 
-def main():
-    db = SessionLocal()
-    try:
-        trips = db.query(Trip).all()
-        customers = db.query(Customer).all()
+def print_report(report):
+    for trip in report["trips"]:
+        print(
+            f"Trip {trip['id']} ({trip['invoice_number']}): "
+            f"total {_money(trip['old_total_charged'])} -> {_money(trip['total_charged'])}, "
+            f"pending {_money(trip['old_pending_amount'])} -> {_money(trip['pending_amount'])}"
+        )
+    for customer in report["customers"]:
+        print(
+            f"Customer {customer['id']} ({customer['name']}): "
+            f"trips {customer['old_total_trips'] or 0} -> {customer['total_trips']}, "
+            f"billed {_money(customer['old_total_billed'])} -> {_money(customer['total_billed'])}, "
+            f"pending {_money(customer['old_pending_balance'])} -> {_money(customer['pending_balance'])}"
+        )
 
-        changed = 0
-        for trip in trips:
-            old_total = float(trip.total_charged or 0)
-            old_pending = float(trip.pending_amount or 0)
-            new_total, new_pending = recalculate_trip(trip)
-            if round(old_total, 2) != round(new_total, 2) or round(old_pending, 2) != round(new_pending, 2):
-                changed += 1
 
-        for customer in customers:
-            customer_trips = [trip for trip in trips if trip.customer_id == customer.id]
-            customer.total_trips = len(customer_trips)
-            customer.total_billed = sum(float(trip.total_charged or 0) for trip in customer_trips)
-            customer.pending_balance = sum(float(trip.pending_amount or 0) for trip in customer_trips)
+def main():
+    parser = argparse.ArgumentParser(description="Reprice every trip and fix drifted trip and customer totals.")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing them")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="pricing processes (1 prices inline)")
+    parser.add_argument("--chunk-size", type=int, default=RECALCULATION_CHUNK_SIZE, help="trips per streamed chunk")
+    args = parser.parse_args()
 
-        db.commit()
-        print(f"Recalculated {len(trips)} trips. Updated {changed} trip totals.")
+    db = SessionLocal()
+    try:
+        report = recalculate_trip_totals(db, workers=args.workers, dry_run=args.dry_run, chunk_size=args.chunk_size)
+        print_invalid(report)
+        if args.dry_run:
+            print_report(report)
+        else:
+            rebuild_financial_rollup(db)
+            rebuild_vehicle_stats_snapshot(db)
+        verb = "Would update" if args.dry_run else "Updated"
+        print(
+            f"Recalculated {report['repriced']} trips ({report['skipped']} per-km trips without vehicle lines skipped, "
+            f"{len(report['invalid'])} invalid). "
+            f"{verb} {len(report['trips'])} trip totals and {len(report['customers'])} customer totals."
+        )
     finally:
         db.close()
 
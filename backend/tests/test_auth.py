@@ -0,0 +1,105 @@
+import os
+import unittest
+from pathlib import Path
+import sys
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.models  # noqa: F401
+from app.bootstrap import DEFAULT_USERS, run_bootstrap
+from app.database.base import Base
+from app.models.user import User
+from app.services.auth_service import (
+    Principal,
+    create_access_token,
+    create_user,
+    get_current_user,
+    principal_cache,
+    reset_password,
+)
+
+
+class PrincipalCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        self.db = self.SessionLocal()
+        self.user_queries = 0
+
+        @event.listens_for(self.engine, "before_cursor_execute")
+        def count_user_queries(_conn, _cursor, statement, *_args):
+            if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+                self.user_queries += 1
+
+        patcher = mock.patch("app.services.auth_service.SessionLocal", self.SessionLocal)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        principal_cache.clear()
+        self.addCleanup(principal_cache.clear)
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_principal_is_cached_until_the_user_row_changes(self):
+        create_user(self.db, "clerk", "secret-1", role="limited")
+        token = create_access_token({"sub": "clerk"})
+        self.user_queries = 0
+
+        first = get_current_user(token)
+        second = get_current_user(token)
+
+        self.assertEqual(first, Principal(id=first.id, username="clerk", role="limited"))
+        self.assertIs(second, first)
+        self.assertEqual(self.user_queries, 1)
+
+        self.db.query(User).filter(User.username == "clerk").update({"role": "admin"})
+        self.db.commit()
+        self.assertEqual(get_current_user(token).role, "admin")
+        self.assertEqual(self.user_queries, 2)
+
+        reset_password(self.db, get_current_user(token), "secret-1", "secret-2")
+        self.assertEqual(self.user_queries, 3)  # reset_password loads the row itself
+        get_current_user(token)
+        self.assertEqual(self.user_queries, 4)
+        self.assertTrue(self.db.query(User).filter(User.username == "clerk").one().verify_password("secret-2"))
+
+        with self.assertRaises(HTTPException) as ctx:
+            get_current_user(create_access_token({"sub": "nobody"}))
+        self.assertEqual(ctx.exception.status_code, 401)
+
+
+class BootstrapTests(unittest.TestCase):
+    def test_bootstrap_seeds_default_users_once(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        self.addCleanup(engine.dispose)
+        session = sessionmaker(bind=engine)
+
+        self.assertTrue(run_bootstrap(engine))
+        with session() as db:
+            first = {user.username: user.password_hash for user in db.query(User)}
+        self.assertEqual(set(first), {username for username, _, _ in DEFAULT_USERS})
+
+        writes = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def record_writes(_conn, _cursor, statement, *_args):
+            if statement.lstrip().split()[0].upper() in {"INSERT", "UPDATE", "DELETE", "ALTER"}:
+                writes.append(statement)
+
+        run_bootstrap(engine)
+        self.assertEqual(writes, [])
+        with session() as db:
+            self.assertEqual({user.username: user.password_hash for user in db.query(User)}, first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
+import csv
+import json
+import tempfile
+import threading
 import unittest
+from unittest import mock
 from datetime import date, datetime
 from pathlib import Path
 import sys
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
@@ -13,16 +18,33 @@ from app.database.base import Base
 from app.models.customer import Customer
 from app.models.driver import Driver
 from app.models.payment import Payment
+from app.models.spare_part import SparePart
 from app.models.trip import Trip
+from app.models.trip_driver_change import TripDriverChange
 from app.models.trip_vehicle import TripVehicle
+from app.models.trip_vehicle_expense import TripVehicleExpense
 from app.models.vehicle import Vehicle
 from app.models.vendor import Vendor
 from app.models.vendor_payment import VendorPayment
 from app.schemas.payment import PaymentCreate
-from app.schemas.trip import TripCreate
+from app.schemas.spare_part import SparePartCreate
+from app.schemas.trip import TripCreate, TripUpdate
 from app.schemas.vendor import VendorCreate
 from app.services.payment_service import create_payment
-from app.services.trip_service import _calculate_trip_days, create_trip
+from app.services.spare_part_service import add_spare_part, update_spare_part
+from app.services.trip_export_service import export_trips
+from app.services import trip_import_service
+from app.services.trip_import_service import import_trips, parse_trip_rows
+from app.services.trip_recalculation_service import recalculate_trip_totals
+from app.services.pricing_engine import calculate_trip_days
+from app.services.trip_service import (
+    _validate_trip_vehicles,
+    create_trip,
+    delete_trip,
+    list_trips,
+    trip_list_totals,
+    update_trip,
+)
 from app.services.vendor_service import add_vendor, list_vendors
 from app.services.vendor_stats_service import vendor_summary
 from fastapi import HTTPException
@@ -53,7 +75,7 @@ class CalculationTests(unittest.TestCase):
         start = datetime(2026, 4, 10, 8, 0, 0)
         end = datetime(2026, 4, 10, 20, 0, 0)
 
-        self.assertEqual(_calculate_trip_days(start, end), 1)
+        self.assertEqual(calculate_trip_days(start, end), 1)
 
     def test_create_trip_package_pricing_uses_days_and_vehicle_count(self):
         _, driver, customer = self._seed_trip_dependencies()
@@ -140,6 +162,37 @@ class CalculationTests(unittest.TestCase):
         self.assertEqual(ctx.exception.status_code, 400)
         self.assertIn("End KM cannot be less than Start KM", ctx.exception.detail)
 
+    def test_validate_trip_vehicles_fetches_vehicles_and_drivers_in_two_queries(self):
+        vehicles = [Vehicle(vehicle_number=f"MH12CV{index:04d}", seat_count=40) for index in range(25)]
+        drivers = [Driver(name=f"Driver {index}") for index in range(25)]
+        self.db.add_all([*vehicles, *drivers])
+        self.db.commit()
+        entries = [
+            {"vehicle_number": f"mh12-cv{index:04d}", "driver_id": driver.id, "start_km": 0, "end_km": 10}
+            for index, driver in enumerate(drivers)
+        ]
+
+        statements = []
+
+        def listener(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            validated = _validate_trip_vehicles(self.db, entries)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+
+        self.assertEqual(len(statements), 2)
+        self.assertEqual([row["vehicle"].vehicle_number for row in validated], [vehicle.vehicle_number for vehicle in vehicles])
+        self.assertEqual(validated[3]["seat_count"], 40)
+
+        entries[7]["vehicle_number"] = "MH12CV9999"
+        with self.assertRaises(HTTPException) as ctx:
+            _validate_trip_vehicles(self.db, entries)
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertEqual(ctx.exception.detail, "Vehicle not found: MH12CV9999")
+
     def test_create_trip_with_multiple_vehicle_entries_creates_trip_vehicles(self):
         vehicle_one, driver_one, customer = self._seed_trip_dependencies()
         vehicle_two = Vehicle(vehicle_number="MH14XY4321")
@@ -188,6 +241,453 @@ class CalculationTests(unittest.TestCase):
             2,
         )
 
+    def test_update_trip_keeps_unchanged_child_rows_and_syncs_the_rest(self):
+        vehicle_one, driver_one, customer = self._seed_trip_dependencies()
+        vehicle_two = Vehicle(vehicle_number="MH14XY4321")
+        driver_two = Driver(name="Driver Two")
+        self.db.add_all([vehicle_two, driver_two])
+        self.db.commit()
+
+        def payload(model, second_distance, include_second=True):
+            entries = [
+                {
+                    "vehicle_number": vehicle_one.vehicle_number,
+                    "driver_id": driver_one.id,
+                    "distance_km": 50,
+                    "expenses": [{"expense_type": "Toll", "amount": 200}],
+                    "driver_changes": [{"driver_id": driver_two.id, "notes": "night shift"}],
+                },
+                {
+                    "vehicle_number": vehicle_two.vehicle_number,
+                    "driver_id": driver_two.id,
+                    "distance_km": second_distance,
+                    "driver_changes": [{"driver_id": driver_one.id}],
+                },
+            ]
+            return model(
+                trip_date=date(2026, 4, 10),
+                from_location="Pune",
+                to_location="Nashik",
+                customer_id=customer.id,
+                cost_per_km=10,
+                invoice_number="INV-TEST-SYNC-001",
+                vehicles=entries if include_second else entries[:1],
+            )
+
+        trip = create_trip(self.db, payload(TripCreate, 60))
+        entry_ids = {tv.vehicle_number: tv.id for tv in trip.vehicles}
+        expense_id = self.db.query(TripVehicleExpense.id).scalar()
+        self.assertEqual(self.db.query(TripDriverChange).filter(TripDriverChange.trip_id == trip.id).count(), 2)
+
+        admin = type("User", (), {"role": "admin"})()
+        trip_id = trip.id
+        self.db.expire_all()
+        expense_selects = []
+
+        def listener(_conn, _cursor, statement, *_args):
+            if statement.lstrip().startswith("SELECT") and "FROM trip_vehicle_expenses" in statement:
+                expense_selects.append(statement)
+
+        event.listen(self.engine, "before_cursor_execute", listener)
+        try:
+            trip = update_trip(self.db, trip_id, payload(TripUpdate, 80), current_user=admin)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", listener)
+
+        # One IN query while syncing and one when the committed trip is reloaded, whatever the vehicle count.
+        self.assertEqual(len(expense_selects), 2)
+        self.assertEqual({tv.vehicle_number: tv.id for tv in trip.vehicles}, entry_ids)
+        self.assertEqual(self.db.query(TripVehicleExpense.id).scalar(), expense_id)
+        self.assertEqual(self.db.get(TripVehicle, entry_ids[vehicle_two.vehicle_number]).distance_km, 80)
+        self.assertEqual((vehicle_two.total_trips, vehicle_two.total_km), (1, 80))
+        self.assertEqual(
+            sorted((change.vehicle_number, change.notes) for change in trip.driver_changes),
+            [(vehicle_one.vehicle_number, "night shift"), (vehicle_two.vehicle_number, None)],
+        )
+
+        trip = update_trip(self.db, trip.id, payload(TripUpdate, 80, include_second=False), current_user=admin)
+
+        self.assertEqual([tv.id for tv in trip.vehicles], [entry_ids[vehicle_one.vehicle_number]])
+        self.assertEqual((vehicle_two.total_trips, vehicle_two.total_km), (0, 0))
+        self.assertEqual((vehicle_one.total_trips, vehicle_one.total_km), (1, 50))
+        self.assertEqual([change.vehicle_number for change in trip.driver_changes], [vehicle_one.vehicle_number])
+
+    def test_import_trips_matches_create_trip_and_reports_bad_rows(self):
+        vehicle, driver, customer = self._seed_trip_dependencies()
+        vehicles = json.dumps([{"vehicle_number": "mh12ab1234", "driver_id": driver.id, "distance_km": 40, "expenses": [{"amount": 300}]}])
+        upload = "\n".join(
+            [
+                "invoice_number,trip_date,from_location,to_location,customer_id,cost_per_km,amount_received,vehicles",
+                f"INV-IMP-1,2026-04-10,Pune,Nashik,{customer.id},12,100,\"{vehicles.replace(chr(34), chr(34) * 2)}\"",
+                f"INV-IMP-1,2026-04-11,Pune,Nashik,{customer.id},12,0,",
+                f"INV-IMP-2,2026-04-12,Pune,Nashik,999,12,0,",
+                f"INV-IMP-3,not-a-date,Pune,Nashik,{customer.id},12,0,",
+            ]
+        ).encode()
+
+        report = import_trips(self.db, parse_trip_rows(upload, "trips.csv"))
+
+        self.assertEqual((report["total_rows"], report["imported"], report["failed"]), (4, 1, 3))
+        self.assertEqual(
+            [(error["row"], error["errors"][0]) for error in report["errors"][:2]],
+            [(3, "Invoice number already exists"), (4, "Customer not found")],
+        )
+        self.assertEqual(report["errors"][2]["errors"][0].split(":")[0], "trip_date")
+
+        imported = self.db.query(Trip).filter(Trip.invoice_number == "INV-IMP-1").one()
+        created = create_trip(
+            self.db,
+            TripCreate(
+                invoice_number="INV-IMP-9",
+                trip_date=date(2026, 4, 10),
+                from_location="Pune",
+                to_location="Nashik",
+                customer_id=customer.id,
+                cost_per_km=12,
+                amount_received=100,
+                vehicles=json.loads(vehicles),
+            ),
+        )
+        for column in ("total_charged", "pending_amount", "total_cost", "distance_km", "vehicle_number", "driver_id"):
+            self.assertEqual(getattr(imported, column), getattr(created, column), column)
+        self.assertEqual([tv.vehicle_number for tv in imported.vehicles], ["MH12AB1234"])
+        self.assertEqual([expense.amount for expense in imported.vehicles[0].expenses], [300])
+        self.db.refresh(vehicle)
+        self.db.refresh(customer)
+        self.assertEqual((vehicle.total_trips, vehicle.total_km), (2, 80))
+        self.assertEqual(customer.total_trips, 2)
+
+        with self.assertRaises(HTTPException):
+            parse_trip_rows(b"\n\n", "empty.jsonl")
+
+    def test_import_reports_a_chunk_whose_invoice_number_was_taken_meanwhile(self):
+        vehicle, driver, customer = self._seed_trip_dependencies()
+        upload = "\n".join(
+            ["invoice_number,trip_date,from_location,to_location,customer_id,cost_per_km"]
+            + [f"INV-RACE-{n},2026-04-1{n},Pune,Nashik,{customer.id},12" for n in (1, 2, 3)]
+        ).encode()
+        rows = parse_trip_rows(upload, "trips.csv")
+        # Another request stores INV-RACE-2 after the file-wide check has run, so that check sees nothing.
+        self.db.add(Trip(invoice_number="INV-RACE-2", trip_date=date(2026, 4, 1), from_location="A", to_location="B"))
+        self.db.commit()
+        with mock.patch.object(trip_import_service, "IMPORT_CHUNK_SIZE", 2), mock.patch.object(
+            trip_import_service, "_existing_invoice_numbers", side_effect=[set(), {"INV-RACE-2"}]
+        ):
+            report = import_trips(self.db, rows)
+
+        self.assertEqual((report["imported"], report["failed"]), (1, 2))
+        self.assertEqual(
+            [(error["row"], error["errors"][0].split(":")[0]) for error in report["errors"]],
+            [(2, "Not imported"), (3, "Invoice number already exists")],
+        )
+        numbers = {number for (number,) in self.db.query(Trip.invoice_number).filter(Trip.invoice_number.like("INV-RACE-%"))}
+        self.assertEqual(numbers, {"INV-RACE-2", "INV-RACE-3"})
+        self.db.refresh(customer)
+        self.assertEqual(customer.total_trips, 1)
+
+    def test_blank_invoice_numbers_are_allocated_per_financial_year(self):
+        vehicle, driver, customer = self._seed_trip_dependencies()
+
+        def trip(trip_date, invoice_number=None):
+            return TripCreate(
+                invoice_number=invoice_number,
+                trip_date=trip_date,
+                from_location="Pune",
+                to_location="Nashik",
+                customer_id=customer.id,
+                cost_per_km=12,
+                vehicles=[{"vehicle_number": vehicle.vehicle_number, "driver_id": driver.id, "distance_km": 40}],
+            )
+
+        numbers = [
+            create_trip(self.db, trip(trip_date)).invoice_number
+            for trip_date in (date(2026, 4, 1), date(2027, 3, 31), date(2027, 4, 1))
+        ]
+        self.assertEqual(numbers, ["INV/2026-27/00001", "INV/2026-27/00002", "INV/2027-28/00001"])
+
+        # Typed-in numbers cannot take the allocator's format...
+        with self.assertRaises(HTTPException) as ctx:
+            create_trip(self.db, trip(date(2026, 5, 1), " INV/2026-27/00007 "))
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertIn("assigned automatically", ctx.exception.detail)
+        with self.assertRaises(HTTPException) as ctx:
+            create_trip(self.db, trip(date(2026, 5, 1), numbers[0]))
+        self.assertIn("assigned automatically", ctx.exception.detail)
+
+        # ...but ones stored before the rule are skipped rather than handed out again.
+        legacy = create_trip(self.db, trip(date(2026, 5, 1), "LEGACY-1"))
+        legacy.invoice_number = "INV/2026-27/00003"
+        self.db.commit()
+        self.assertEqual(create_trip(self.db, trip(date(2026, 5, 2))).invoice_number, "INV/2026-27/00004")
+        self.db.query(Trip).filter(Trip.id == legacy.id).update({"invoice_number": "INV/2026-27/00006"})
+        self.db.commit()
+
+        upload = "\n".join(
+            ["trip_date,from_location,to_location,customer_id,cost_per_km"]
+            + [f"{trip_date},Pune,Nashik,{customer.id},12" for trip_date in ("2026-06-01", "2027-05-01", "2026-07-01")]
+        ).encode()
+        self.assertEqual(import_trips(self.db, parse_trip_rows(upload, "trips.csv"))["imported"], 3)
+        self.assertEqual(
+            [number for (number,) in self.db.query(Trip.invoice_number).order_by(Trip.id)][5:],
+            ["INV/2026-27/00005", "INV/2027-28/00002", "INV/2026-27/00007"],
+        )
+
+    def test_list_trips_pages_by_cursor_and_filters(self):
+        vehicle, driver, customer = self._seed_trip_dependencies()
+        for number in range(5):
+            create_trip(
+                self.db,
+                TripCreate(
+                    invoice_number=f"{'INV' if number < 3 else 'OLD'}-{number}",
+                    trip_date=date(2026, 4, 10 + number),
+                    from_location="Pune",
+                    to_location="Nashik",
+                    customer_id=customer.id,
+                    cost_per_km=0,
+                    pricing_type="package",
+                    package_amount=1000,
+                    amount_received=[0, 200, 5000, 0, 0][number],
+                    vehicles=[
+                        {
+                            "vehicle_number": vehicle.vehicle_number,
+                            "driver_id": driver.id,
+                            "pricing_type": "package",
+                            "package_amount": 1000,
+                        }
+                    ],
+                ),
+            )
+        all_ids = [trip.id for trip in self.db.query(Trip).order_by(Trip.id.desc())]
+
+        seen, cursor = [], None
+        while True:
+            trips, cursor, total = list_trips(self.db, limit=2, cursor=cursor)
+            seen.extend(trip.id for trip in trips)
+            self.assertEqual(total, 5)
+            if not cursor:
+                break
+        self.assertEqual(seen, all_ids)
+
+        trips, cursor, total = list_trips(self.db, invoice_prefix="INV", payment_status="partial")
+        self.assertEqual(([trip.invoice_number for trip in trips], cursor, total), (["INV-1"], None, 1))
+        trips, _, total = list_trips(self.db, start_date=date(2026, 4, 12), driver_id=driver.id, payment_status="outstanding")
+        self.assertEqual(sorted(trip.invoice_number for trip in trips), ["OLD-3", "OLD-4"])
+        self.assertEqual(list_trips(self.db, vehicle_number="mh12-ab1234", payment_status="settled")[2], 1)
+        inv_trips = self.db.query(Trip).filter(Trip.invoice_number.startswith("INV")).all()
+        self.assertEqual(
+            trip_list_totals(self.db, invoice_prefix="INV"),
+            {
+                "trip_count": 3,
+                "total_charged": sum(trip.total_charged for trip in inv_trips),
+                "amount_received": 5200,
+                "pending_amount": sum(trip.pending_amount for trip in inv_trips),
+            },
+        )
+
+        rows, cursor, _ = list_trips(self.db, limit=2, compact=True)
+        self.assertEqual([row["id"] for row in rows], all_ids[:2])
+        self.assertEqual(list_trips(self.db, limit=2, cursor=cursor, compact=True)[0][0]["id"], all_ids[2])
+        self.assertEqual(
+            (rows[0]["pending_amount"], rows[0]["party_fuel_credit"]),
+            (self.db.get(Trip, all_ids[0]).pending_amount, 0),
+        )
+        self.assertNotIn("vehicles", rows[0])
+        with self.assertRaises(HTTPException):
+            list_trips(self.db, cursor="not-a-cursor")
+
+    def test_export_trips_streams_vehicle_lines_in_batches(self):
+        vehicle_one, driver_one, customer = self._seed_trip_dependencies()
+        vehicle_two = Vehicle(vehicle_number="MH14XY4321")
+        self.db.add(vehicle_two)
+        self.db.commit()
+        for number, vehicle_numbers in enumerate([[vehicle_one.vehicle_number, vehicle_two.vehicle_number], [vehicle_two.vehicle_number]]):
+            create_trip(
+                self.db,
+                TripCreate(
+                    invoice_number=f"INV-EXP-{number}",
+                    trip_date=date(2026, 4, 10),
+                    from_location="Pune",
+                    to_location="Nashik",
+                    customer_id=customer.id,
+                    cost_per_km=10,
+                    vehicles=[
+                        {"vehicle_number": vehicle_number, "driver_id": driver_one.id, "distance_km": 25}
+                        for vehicle_number in vehicle_numbers
+                    ],
+                ),
+            )
+        session_factory = sessionmaker(bind=self.engine)
+
+        with mock.patch("app.services.trip_export_service.EXPORT_BATCH_SIZE", 1):
+            chunks = list(export_trips(session_factory, "ndjson"))
+            rows = list(csv.DictReader("".join(export_trips(session_factory, "csv")).splitlines()))
+
+        self.assertEqual(len(chunks), 2)
+        trips = [json.loads(line) for line in "".join(chunks).splitlines()]
+        self.assertEqual(
+            [(trip["invoice_number"], [line["vehicle_number"] for line in trip["vehicles"]]) for trip in trips],
+            [("INV-EXP-0", ["MH12AB1234", "MH14XY4321"]), ("INV-EXP-1", ["MH14XY4321"])],
+        )
+        self.assertEqual(trips[0]["trip_date"], "2026-04-10")
+        self.assertEqual(
+            [(row["invoice_number"], row["line_vehicle_number"], row["line_distance_km"]) for row in rows],
+            [("INV-EXP-0", "MH12AB1234", "25"), ("INV-EXP-0", "MH14XY4321", "25"), ("INV-EXP-1", "MH14XY4321", "25")],
+        )
+        self.assertEqual(list(export_trips(session_factory, "csv", invoice_prefix="NONE"))[0].count("\n"), 1)
+        with self.assertRaises(HTTPException):
+            export_trips(session_factory, "xlsx")
+
+    def test_recalculate_trip_totals_repairs_only_drifted_trips_and_customers(self):
+        vehicle, driver, customer = self._seed_trip_dependencies()
+        for number in range(3):
+            create_trip(
+                self.db,
+                TripCreate(
+                    invoice_number=f"INV-RC-{number}",
+                    trip_date=date(2026, 4, 10),
+                    from_location="Pune",
+                    to_location="Nashik",
+                    customer_id=customer.id,
+                    pricing_type="package",
+                    package_amount=5000,
+                    cost_per_km=0,
+                    pricing_items=[{"description": "Guide", "amount": 300}],
+                    vehicles=[
+                        {
+                            "vehicle_number": vehicle.vehicle_number,
+                            "driver_id": driver.id,
+                            "distance_km": 40,
+                            "pricing_type": "package",
+                            "package_amount": 5000,
+                            "vendor_deduction_amount": 200,
+                            "expenses": [{"amount": 100}],
+                        }
+                    ],
+                ),
+            )
+        expected = [(trip.total_charged, trip.pending_amount) for trip in self.db.query(Trip).order_by(Trip.id)]
+        self.assertEqual(expected[0], (5300, 5000))
+        self.db.query(Trip).filter(Trip.invoice_number == "INV-RC-1").update({"total_charged": 1, "pending_amount": 1})
+        self.db.query(Customer).update({"total_billed": 0})
+        # A legacy row the pricing engine rejects is reported, not fatal.
+        self.db.query(Trip).filter(Trip.invoice_number == "INV-RC-2").update(
+            {"departure_datetime": datetime(2026, 4, 12, 9), "return_datetime": datetime(2026, 4, 10, 18)}
+        )
+        self.db.commit()
+
+        preview = recalculate_trip_totals(self.db, chunk_size=2, dry_run=True)
+        self.assertEqual((preview["repriced"], preview["skipped"]), (2, 0))
+        self.assertEqual([trip["invoice_number"] for trip in preview["invalid"]], ["INV-RC-2"])
+        self.assertEqual([(trip["invoice_number"], trip["total_charged"]) for trip in preview["trips"]], [("INV-RC-1", 5300)])
+        self.assertEqual([(row["total_billed"], row["pending_balance"]) for row in preview["customers"]], [(15900, 15000)])
+        self.assertEqual(self.db.query(Trip).filter(Trip.invoice_number == "INV-RC-1").one().total_charged, 1)
+
+        report = recalculate_trip_totals(self.db, workers=2, chunk_size=2)
+        self.assertEqual((len(report["trips"]), len(report["invalid"])), (1, 1))
+        self.assertEqual([(trip.total_charged, trip.pending_amount) for trip in self.db.query(Trip).order_by(Trip.id)], expected)
+        self.db.refresh(customer)
+        self.assertEqual((customer.total_trips, customer.total_billed, customer.pending_balance), (3, 15900, 15000))
+        self.assertEqual(recalculate_trip_totals(self.db)["trips"], [])
+
+    def test_counters_stay_exact_under_concurrent_trip_and_spare_part_writes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = create_engine(f"sqlite:///{directory}/stress.db", connect_args={"timeout": 60})
+            Base.metadata.create_all(engine)
+            SessionLocal = sessionmaker(bind=engine)
+            db = SessionLocal()
+            db.add_all(
+                [
+                    Vehicle(vehicle_number="MH12AB1234", total_maintenance_cost=0),
+                    Vehicle(vehicle_number="MH14XY4321", total_maintenance_cost=0),
+                    Driver(name="Driver One"),
+                    Customer(name="Customer One", phone="1234567890"),
+                    Customer(name="Customer Two", phone="0987654321"),
+                ]
+            )
+            db.commit()
+            driver_id = db.query(Driver.id).scalar()
+            customer_ids = [customer_id for (customer_id,) in db.query(Customer.id).order_by(Customer.id)]
+            db.close()
+            admin = type("User", (), {"role": "admin"})()
+            errors = []
+
+            def payload(model, invoice_number, customer_id, vehicle_numbers, distance_km):
+                return model(
+                    invoice_number=invoice_number,
+                    trip_date=date(2026, 4, 10),
+                    from_location="Pune",
+                    to_location="Nashik",
+                    customer_id=customer_id,
+                    pricing_type="package",
+                    package_amount=1000,
+                    cost_per_km=0,
+                    vehicles=[
+                        {
+                            "vehicle_number": vehicle_number,
+                            "driver_id": driver_id,
+                            "distance_km": distance_km,
+                            "pricing_type": "package",
+                            "package_amount": 1000,
+                        }
+                        for vehicle_number in vehicle_numbers
+                    ],
+                )
+
+            def worker(number):
+                session = SessionLocal()
+                try:
+                    for step in range(3):
+                        invoice_number = f"INV-ST-{number}-{step}"
+                        trip = create_trip(
+                            session,
+                            payload(TripCreate, invoice_number, customer_ids[0], ["MH12AB1234", "MH14XY4321"], 10 + step),
+                        )
+                        if step == 1:
+                            update_trip(
+                                session,
+                                trip.id,
+                                payload(TripUpdate, invoice_number, customer_ids[1], ["MH14XY4321"], 25),
+                                current_user=admin,
+                            )
+                        elif step == 2:
+                            delete_trip(session, trip.id)
+                    spare = add_spare_part(
+                        session,
+                        SparePartCreate(vehicle_number="MH12AB1234", part_name="Filter", cost=100, replaced_date=date(2026, 4, 10)),
+                    )
+                    update_spare_part(
+                        session,
+                        spare.id,
+                        SparePartCreate(vehicle_number="MH12AB1234", part_name="Filter", cost=150, quantity=2, replaced_date=date(2026, 4, 10)),
+                    )
+                except Exception as exc:  # surfaced below; a thread cannot fail the test itself
+                    errors.append(exc)
+                finally:
+                    session.close()
+
+            threads = [threading.Thread(target=worker, args=(number,)) for number in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+
+            db = SessionLocal()
+            for customer in db.query(Customer):
+                trips = db.query(Trip).filter(Trip.customer_id == customer.id).all()
+                self.assertEqual(customer.total_trips, len(trips))
+                self.assertAlmostEqual(customer.total_billed, sum(trip.total_charged for trip in trips))
+                self.assertAlmostEqual(customer.pending_balance, sum(trip.pending_amount for trip in trips))
+            self.assertEqual([customer.total_trips for customer in db.query(Customer).order_by(Customer.id)], [8, 8])
+            for vehicle in db.query(Vehicle):
+                lines = db.query(TripVehicle).filter(TripVehicle.vehicle_number == vehicle.vehicle_number).all()
+                self.assertEqual(vehicle.total_trips, len(lines))
+                self.assertEqual(vehicle.total_km, sum(line.distance_km for line in lines))
+            self.assertEqual(db.query(Vehicle).filter(Vehicle.vehicle_number == "MH12AB1234").one().total_maintenance_cost, 8 * 300)
+            self.assertEqual(db.query(SparePart).count(), 8)
+            db.close()
+            engine.dispose()
+
     def test_create_payment_clamps_pending_to_zero_on_exact_settlement(self):
         trip = Trip(
             trip_date=date(2026, 4, 10),
@@ -0,0 +1,250 @@
+import os
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.models  # noqa: F401
+from app.api.routes.dashboard import _build_dashboard_summary
+from app.database.base import Base
+from app.models.customer import Customer
+from app.models.driver import Driver
+from app.models.mechanic import MechanicEntry
+from app.models.spare_part import SparePart
+from app.models.vehicle import Vehicle
+from app.models.vendor import Vendor
+from app.schemas.fuel import FuelCreate
+from app.schemas.payment import PaymentCreate
+from app.schemas.trip import TripCreate
+from app.services.dashboard_service import dashboard_expense_totals, dashboard_trend, trip_financial_totals
+from app.services.financial_rollup_service import rebuild_financial_rollup, record_spare_part, rollup_totals
+from app.services.fuel_service import add_fuel, delete_fuel, update_fuel
+from app.services.payment_service import create_payment
+from app.services.trip_service import create_trip, delete_trip
+from app.services.vehicle_snapshot_service import record_vehicle_spare_part, snapshot_totals
+from app.services.vendor_stats_service import vendor_summary
+
+
+class DashboardAggregationTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+        self.db = SessionLocal()
+
+        vehicle = Vehicle(vehicle_number="MH12AB1234")
+        self.driver = Driver(name="Driver One")
+        self.customer = Customer(name="Customer One", phone="1234567890")
+        self.db.add_all([vehicle, self.driver, self.customer])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _create_trip(self, invoice_number, trip_date, **overrides):
+        payload = dict(
+            trip_date=trip_date,
+            from_location="Pune",
+            to_location="Mumbai",
+            customer_id=self.customer.id,
+            pricing_type="per_km",
+            cost_per_km=10,
+            invoice_number=invoice_number,
+            vehicles=[
+                {
+                    "vehicle_number": "MH12AB1234",
+                    "driver_id": self.driver.id,
+                    "start_km": 0,
+                    "end_km": 100,
+                    "driver_bhatta": 300,
+                    "vendor_deduction_amount": 50,
+                    "expenses": [{"expense_type": "Party Fuel Entry", "amount": 25}],
+                }
+            ],
+        )
+        payload.update(overrides)
+        return create_trip(self.db, TripCreate(**payload))
+
+    def test_trip_totals_sum_revenue_credits_and_charges(self):
+        self._create_trip(
+            "INV-DASH-001",
+            date(2026, 3, 5),
+            amount_received=100,
+            charge_items=[
+                {"description": "Night halt", "amount": 200},
+                {"description": "Waiting time", "amount": 150},
+                {"description": "Extra km", "amount": 80},
+                {"description": "Permit", "amount": 40},
+            ],
+            pricing_items=[{"description": "Diesel", "amount": 0, "quantity": 2, "rate": 30}],
+        )
+        self._create_trip("INV-DASH-002", date(2026, 4, 5))
+
+        totals = trip_financial_totals(self.db, date(2026, 3, 1), date(2026, 3, 31))
+
+        self.assertEqual(totals["total_trips"], 1)
+        self.assertEqual(totals["completed_trips"], 1)
+        self.assertEqual(totals["invoice_revenue"], 530)
+        self.assertEqual(totals["paid_amount"], 175)
+        self.assertEqual(totals["pending_amount"], 355)
+        self.assertEqual(totals["partial_payments"], 1)
+        self.assertEqual(totals["invoice_custom_pricing"], 60)
+        self.assertEqual(totals["night_charges"], 200)
+        self.assertEqual(totals["waiting_charges"], 150)
+        self.assertEqual(totals["additional_charges"], 80)
+        self.assertEqual(totals["other_additional_charges"], 40)
+        self.assertEqual(totals["driver_bhatta_cost"], 300)
+
+    def test_trip_totals_classify_trip_status(self):
+        self._create_trip("INV-DASH-003", date(2099, 1, 1))
+        self._create_trip(
+            "INV-DASH-004",
+            date(2020, 1, 1),
+            departure_datetime=datetime(2020, 1, 1, 8, 0, 0),
+            return_datetime=datetime(2099, 1, 1, 8, 0, 0),
+        )
+
+        totals = trip_financial_totals(self.db)
+
+        self.assertEqual(totals["total_trips"], 2)
+        self.assertEqual(totals["upcoming_trips"], 1)
+        self.assertEqual(totals["ongoing_trips"], 1)
+        self.assertEqual(totals["completed_trips"], 0)
+
+    def test_trend_groups_trips_and_expenses_by_month(self):
+        self._create_trip("INV-DASH-008", date(2026, 3, 5), charge_items=[{"description": "Permit", "amount": 200}])
+        self._create_trip("INV-DASH-009", date(2026, 4, 5))
+        fuel_payload = dict(vehicle_number="MH12AB1234", fuel_type="diesel", quantity=10, rate_per_litre=90)
+        add_fuel(self.db, FuelCreate(filled_date=date(2026, 4, 10), **fuel_payload))
+
+        trend = dashboard_trend(self.db, "2026-03", "2026-05")
+        march, april, may = trend["months"]
+
+        self.assertEqual([march["month"], april["month"], may["month"]], ["2026-03", "2026-04", "2026-05"])
+        march_totals = trip_financial_totals(self.db, date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(march["revenue"], march_totals["invoice_revenue"])
+        self.assertEqual(march["total_trips"], 1)
+        self.assertEqual(march["expense"], 300)
+        self.assertEqual(april["expense"], 1200)
+        self.assertEqual(april["profit"], -1200)
+        self.assertEqual(may["total_trips"], 0)
+        self.assertEqual(may["expense"], 0)
+
+    def test_expense_totals_filter_by_window_and_vendor(self):
+        vendor = Vendor(name="Fuel Point", category="fuel")
+        self.db.add(vendor)
+        self.db.commit()
+        fuel_payload = dict(vehicle_number="MH12AB1234", fuel_type="diesel", quantity=10, rate_per_litre=90)
+        add_fuel(self.db, FuelCreate(filled_date=date(2026, 3, 10), vendor=" fuel point ", **fuel_payload))
+        add_fuel(self.db, FuelCreate(filled_date=date(2026, 4, 10), vendor="Other", **fuel_payload))
+        self.db.add(
+            MechanicEntry(vehicle_number="MH12AB1234", service_date=date(2026, 3, 12), work_description="Brakes", cost=250)
+        )
+        self.db.commit()
+
+        march = dashboard_expense_totals(self.db, date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(march["direct_fuel_cost"], 900)
+        self.assertEqual(march["mechanic_cost"], 250)
+        self.assertEqual(dashboard_expense_totals(self.db)["direct_fuel_cost"], 1800)
+
+        summary = vendor_summary(self.db, vendor.id)
+        self.assertEqual(summary["fuel_total"], 900)
+        self.assertEqual(summary["pending"], 900)
+
+    def test_incremental_rollup_matches_rebuild(self):
+        trip = self._create_trip("INV-DASH-005", date(2026, 3, 5), charge_items=[{"description": "Permit", "amount": 200}])
+        self._create_trip("INV-DASH-006", date(2026, 4, 5))
+        removed = self._create_trip("INV-DASH-007", date(2026, 4, 9))
+        create_payment(
+            self.db,
+            PaymentCreate(trip_id=trip.id, payment_date=datetime(2026, 3, 6), payment_mode="cash", amount=20),
+        )
+        delete_trip(self.db, removed.id)
+        fuel_payload = dict(vehicle_number="MH12AB1234", fuel_type="diesel", quantity=10, rate_per_litre=90)
+        fuel = add_fuel(self.db, FuelCreate(filled_date=date(2026, 3, 10), **fuel_payload))
+        update_fuel(self.db, fuel.id, FuelCreate(filled_date=date(2026, 4, 10), **fuel_payload))
+        extra = add_fuel(self.db, FuelCreate(filled_date=date(2026, 4, 11), **fuel_payload))
+        delete_fuel(self.db, extra.id)
+
+        incremental = rollup_totals(self.db)
+        self.assertEqual(incremental["totals"]["trip_count"], 2)
+        self.assertEqual(incremental["totals"]["received"], 170)
+        self.assertEqual(incremental["totals"]["direct_fuel"], 900)
+        self.assertEqual([row["month"] for row in incremental["months"]], ["2026-03", "2026-04"])
+
+        rebuild_financial_rollup(self.db)
+        self.assertEqual(rollup_totals(self.db), incremental)
+        self.assertEqual(rollup_totals(self.db, "2026-04", "2026-04")["totals"]["direct_fuel"], 900)
+
+    def test_spare_part_without_quantity_counts_once_in_rollup_and_snapshot(self):
+        vendor = Vendor(name="Parts Hub", category="spare_parts")
+        spare = SparePart(
+            vehicle_number="MH12AB1234", part_name="Filter", cost=450, vendor="Parts Hub", replaced_date=date(2026, 5, 2)
+        )
+        self.db.add_all([vendor, spare])
+        self.db.flush()
+        # Legacy rows can hold NULL; the column default only applies to ORM inserts.
+        self.db.query(SparePart).filter(SparePart.id == spare.id).update({"quantity": None})
+        self.db.refresh(spare)
+        self.assertIsNone(spare.quantity)
+        record_spare_part(self.db, spare)
+        record_vehicle_spare_part(self.db, spare)
+        self.db.commit()
+
+        self.assertEqual(rollup_totals(self.db)["totals"]["spare"], 450)
+        self.assertEqual(snapshot_totals(self.db, ["MH12AB1234"])["MH12AB1234"]["spare_cost"], 450)
+        rebuild_financial_rollup(self.db)
+        self.assertEqual(rollup_totals(self.db)["totals"]["spare"], 450)
+        # Vendor balances keep counting a row without a quantity as nothing owed.
+        self.assertEqual(vendor_summary(self.db, vendor.id)["spare_total"], 0)
+
+    def test_dashboard_summary_reads_money_totals_from_rollup(self):
+        self._create_trip(
+            "INV-DASH-020",
+            date(2026, 3, 5),
+            amount_received=100,
+            charged_toll_amount=70,
+            discount_amount=500,
+            charge_items=[{"description": "Night halt", "amount": 200}],
+        )
+        self._create_trip("INV-DASH-021", date(2026, 3, 9))
+        self._create_trip("INV-DASH-022", date(2099, 1, 1))
+        fuel_payload = dict(vehicle_number="MH12AB1234", fuel_type="diesel", quantity=10, rate_per_litre=90)
+        add_fuel(self.db, FuelCreate(filled_date=date(2026, 3, 10), **fuel_payload))
+
+        for start, end in ((date(2026, 3, 1), date(2026, 3, 31)), (None, None)):
+            summary = _build_dashboard_summary(self.db, start, end)
+            live = trip_financial_totals(self.db, start, end)
+            expenses = dashboard_expense_totals(self.db, start, end)
+            self.assertEqual(
+                summary["trip_status_counts"],
+                {key: live[key] for key in ("total_trips", "completed_trips", "upcoming_trips", "ongoing_trips")},
+            )
+            self.assertEqual(summary["income"], live["invoice_revenue"])
+            self.assertEqual(summary["total_due"], live["pending_amount"])
+            self.assertEqual(summary["revenue_breakdown"]["charged_toll_recovery"], live["charged_toll_recovery"])
+            self.assertEqual(summary["revenue_breakdown"]["discount"], live["discount_total"])
+            self.assertEqual(summary["revenue_breakdown"]["night_charges"], live["night_charges"])
+            self.assertEqual(summary["operating_expense_breakdown"]["direct_fuel_cost"], expenses["direct_fuel_cost"])
+            balance = summary["balance_due_breakdown"]
+            self.assertEqual(balance["partial_payments"], live["partial_payments"])
+            self.assertEqual(balance["unpaid_invoices"], live["unpaid_invoices"])
+            self.assertEqual(balance["pending_customer_payments"], live["pending_customer_payments"])
+
+        # A mechanic entry written behind the services' back is not in the rollup, so the summary ignores it.
+        self.db.add(
+            MechanicEntry(vehicle_number="MH12AB1234", service_date=date(2026, 3, 12), work_description="Brakes", cost=250)
+        )
+        self.db.commit()
+        self.assertEqual(_build_dashboard_summary(self.db, None, None)["operating_expense_breakdown"]["mechanic_cost"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
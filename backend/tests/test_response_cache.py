@@ -0,0 +1,91 @@
+import os
+import unittest
+from pathlib import Path
+import sys
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.models  # noqa: F401
+from app.database.base import Base
+from app.models.vehicle import Vehicle
+from app.services.response_cache import ResponseCache, read_data_version
+
+
+class ResponseCacheTests(unittest.TestCase):
+    def test_hits_evicts_and_expires(self):
+        cache = ResponseCache(max_entries=2, ttl_seconds=10)
+        calls = []
+
+        def compute(value):
+            calls.append(value)
+            return value
+
+        self.assertEqual(cache.get_or_compute(None, "a", lambda: compute(1)), 1)
+        self.assertEqual(cache.get_or_compute(None, "a", lambda: compute(2)), 1)
+        cache.get_or_compute(None, "b", lambda: compute(3))
+        cache.get_or_compute(None, "c", lambda: compute(4))
+        self.assertEqual(cache.get_or_compute(None, "a", lambda: compute(5)), 5)
+        self.assertEqual(calls, [1, 3, 4, 5])
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+        with mock.patch("app.services.response_cache.time.monotonic", return_value=10**9):
+            self.assertEqual(cache.get_or_compute(None, "a", lambda: compute(6)), 6)
+
+    def test_committed_writes_bump_data_version(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            start = read_data_version(db)
+            db.query(Vehicle).all()
+            db.commit()
+            self.assertEqual(read_data_version(db), start)
+
+            db.add(Vehicle(vehicle_number="MH12AB1234"))
+            db.commit()
+            self.assertEqual(read_data_version(db), start + 1)
+
+            db.query(Vehicle).update({Vehicle.total_trips: 3})
+            db.commit()
+            self.assertEqual(read_data_version(db), start + 2)
+
+            db.add(Vehicle(vehicle_number="MH12AB5678"))
+            db.flush()
+            db.rollback()
+            db.commit()
+            self.assertEqual(read_data_version(db), start + 2)
+        finally:
+            db.close()
+            engine.dispose()
+
+    def test_write_from_another_worker_invalidates_entries(self):
+        engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(bind=engine)
+        db = SessionLocal()
+        # Each worker process has its own cache; they only share the database.
+        this_worker = ResponseCache()
+        other_worker_db = SessionLocal()
+        try:
+            self.assertEqual(this_worker.get_or_compute(db, "summary", lambda: 1), 1)
+            self.assertEqual(this_worker.get_or_compute(db, "summary", lambda: 2), 1)
+            db.commit()
+
+            other_worker_db.add(Vehicle(vehicle_number="MH12AB1234"))
+            other_worker_db.commit()
+
+            self.assertEqual(this_worker.get_or_compute(db, "summary", lambda: 3), 3)
+            self.assertEqual(this_worker.data_version, 1)
+        finally:
+            other_worker_db.close()
+            db.close()
+            engine.dispose()
+
+if __name__ == "__main__":
+    unittest.main()
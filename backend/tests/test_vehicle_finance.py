@@ -0,0 +1,231 @@
+import os
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.models  # noqa: F401
+from app.database.base import Base
+from app.models.fleet_alert import FleetAlert
+from app.models.vehicle import Vehicle
+from app.models.vehicle_emi import VehicleEMIInstallment, VehicleEMIPlan
+from app.schemas.mechanic import MechanicCreate
+from app.schemas.vehicle_finance import EMIPlanBatchItem, EMIPlanCreate, InsuranceUpsert, TaxUpsert
+from app.services.fleet_alert_service import rebuild_fleet_alerts, refresh_vehicle_alerts
+from app.services.mechanic_service import add_mechanic_entry
+from app.services.vehicle_finance_service import (
+    get_finance_dashboard_summary,
+    get_vehicle_finance_summary,
+    list_emi_installments,
+    pay_emi_installment,
+    upsert_vehicle_emi_plan,
+    upsert_vehicle_emi_plans,
+    upsert_vehicle_insurance,
+    upsert_vehicle_tax,
+)
+from app.services.vehicle_stats_service import vehicle_summary
+
+
+class VehicleFinanceTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+        self.db = SessionLocal()
+
+        self.db.add_all(
+            [
+                Vehicle(vehicle_number="MH12AB1234", total_maintenance_cost=0),
+                Vehicle(vehicle_number="MH12AB5678", total_maintenance_cost=0),
+            ]
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_dashboard_counts_installment_statuses_across_active_plans(self):
+        start = date.today().replace(day=1) - timedelta(days=62)
+        plan = upsert_vehicle_emi_plan(
+            self.db,
+            "MH12AB1234",
+            EMIPlanCreate(vehicle_purchase_price=120000, loan_amount=120000, loan_duration_months=12, emi_start_date=start),
+        )
+        pay_emi_installment(self.db, plan["next_due_installment"]["id"])
+        second = upsert_vehicle_emi_plan(
+            self.db,
+            "MH12AB5678",
+            EMIPlanCreate(vehicle_purchase_price=60000, loan_amount=60000, loan_duration_months=6, emi_start_date=start),
+        )
+        upsert_vehicle_insurance(
+            self.db,
+            "MH12AB5678",
+            InsuranceUpsert(
+                provider_name="Insurer",
+                policy_number="POL-1",
+                insurance_type="comprehensive",
+                start_date=date.today() - timedelta(days=300),
+                end_date=date.today() + timedelta(days=65),
+                total_insurance_amount=12000,
+            ),
+        )
+
+        summary = get_finance_dashboard_summary(self.db)
+
+        first = get_vehicle_finance_summary(self.db, "MH12AB1234")["emi"]
+        self.assertEqual(summary["emi_paid_installments"], 1)
+        self.assertGreater(summary["emi_overdue_installments"], 0)
+        for status in ("paid", "pending", "overdue"):
+            self.assertEqual(
+                summary[f"emi_{status}_installments"],
+                first[f"{status}_installments"] + second[f"{status}_installments"],
+            )
+        self.assertEqual(
+            [(row["vehicle_number"], row["monthly_emi"], row["monthly_insurance"]) for row in summary["vehicle_wise_expenses"]],
+            [("MH12AB1234", 10000.0, 0.0), ("MH12AB5678", 10000.0, 1000.0)],
+        )
+
+    def test_batch_plans_replace_active_plans_and_write_full_schedules(self):
+        upsert_vehicle_emi_plan(
+            self.db,
+            "MH12AB1234",
+            EMIPlanCreate(vehicle_purchase_price=50000, loan_amount=50000, loan_duration_months=5, emi_start_date=date(2026, 1, 31)),
+        )
+
+        plans = upsert_vehicle_emi_plans(
+            self.db,
+            [
+                EMIPlanBatchItem(
+                    vehicle_number="mh12-ab1234",
+                    vehicle_purchase_price=240000,
+                    loan_amount=240000,
+                    annual_interest_rate=12,
+                    loan_duration_months=24,
+                    emi_start_date=date(2026, 1, 31),
+                ),
+                EMIPlanBatchItem(
+                    vehicle_number="MH12AB5678",
+                    vehicle_purchase_price=90000,
+                    down_payment=30000,
+                    loan_duration_months=12,
+                    emi_start_date=date(2026, 3, 15),
+                ),
+            ],
+        )
+
+        self.assertEqual([plan["vehicle_number"] for plan in plans], ["MH12AB1234", "MH12AB5678"])
+        first, second = plans
+        schedule = list_emi_installments(self.db, first["id"], limit=600)["items"]
+        self.assertEqual(len(schedule), 24)
+        self.assertEqual(schedule[1]["due_date"], date(2026, 2, 28))
+        self.assertEqual(schedule[-1]["closing_balance"], 0.0)
+        self.assertAlmostEqual(sum(row["principal_component"] for row in schedule), 240000, places=2)
+        self.assertEqual(second["monthly_emi"], 5000.0)
+        self.assertEqual(self.db.query(VehicleEMIPlan).filter(VehicleEMIPlan.is_active == True).count(), 2)
+        self.assertEqual(self.db.query(VehicleEMIInstallment).count(), 5 + 24 + 12)
+
+        with self.assertRaises(HTTPException) as ctx:
+            upsert_vehicle_emi_plans(
+                self.db,
+                [
+                    EMIPlanBatchItem(vehicle_number="MH12AB9999", vehicle_purchase_price=1000, loan_duration_months=2, emi_start_date=date(2026, 1, 1)),
+                ],
+            )
+        self.assertEqual(ctx.exception.status_code, 404)
+
+    def test_plan_header_carries_aggregates_and_installments_are_paged(self):
+        plan = upsert_vehicle_emi_plan(
+            self.db,
+            "MH12AB1234",
+            EMIPlanCreate(vehicle_purchase_price=84000, loan_amount=84000, loan_duration_months=84, emi_start_date=date(2020, 1, 10)),
+        )
+        self.assertNotIn("installments", plan)
+        self.assertEqual(plan["next_due_installment"]["installment_number"], 1)
+        pay_emi_installment(self.db, plan["next_due_installment"]["id"])
+
+        header = get_vehicle_finance_summary(self.db, "MH12AB1234")["emi"]
+        self.assertEqual(header["paid_installments"], 1)
+        self.assertEqual(header["paid_installments"] + header["pending_installments"] + header["overdue_installments"], 84)
+        self.assertEqual(header["next_due_installment"]["installment_number"], 2)
+        self.assertAlmostEqual(header["total_remaining_balance"], 83000, places=2)
+
+        seen = []
+        cursor = None
+        while True:
+            page = list_emi_installments(self.db, plan["id"], limit=30, cursor=cursor)
+            seen.extend(item["installment_number"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, list(range(1, 85)))
+
+        in_2021 = list_emi_installments(self.db, plan["id"], start_date=date(2021, 1, 1), end_date=date(2021, 12, 31))
+        self.assertEqual([item["installment_number"] for item in in_2021["items"]], list(range(13, 25)))
+        self.assertIsNone(in_2021["next_cursor"])
+
+    def test_alerts_are_stored_on_write_and_read_by_summaries(self):
+        today = date.today()
+        plan = upsert_vehicle_emi_plan(
+            self.db,
+            "MH12AB1234",
+            EMIPlanCreate(vehicle_purchase_price=2000, loan_amount=2000, loan_duration_months=2, emi_start_date=today - timedelta(days=90)),
+        )
+        upsert_vehicle_tax(
+            self.db,
+            "MH12AB1234",
+            TaxUpsert(tax_start_date=today - timedelta(days=400), tax_expiry_date=today - timedelta(days=3), road_tax=1200),
+        )
+        add_mechanic_entry(
+            self.db,
+            MechanicCreate(vehicle_number="MH12AB1234", work_description="Service", cost=500, service_date=today - timedelta(days=95)),
+        )
+
+        finance = get_vehicle_finance_summary(self.db, "MH12AB1234")
+        self.assertEqual(finance["alerts"], ["EMI overdue: 2 installment(s)", "Tax expired 3 day(s) ago"])
+        self.assertEqual(
+            [(card["type"], card["severity"]) for card in get_finance_dashboard_summary(self.db)["alert_cards"]],
+            [("tax", "danger")],
+        )
+        summary = vehicle_summary(self.db, "MH12AB1234", include="alerts_section")
+        self.assertEqual([alert["type"] for alert in summary["alerts_section"]], ["emi", "tax", "service"])
+
+        pay_emi_installment(self.db, plan["next_due_installment"]["id"])
+        self.assertEqual(get_vehicle_finance_summary(self.db, "MH12AB1234")["alerts"][0], "EMI overdue: 1 installment(s)")
+
+        stored = sorted((row.vehicle_number, row.alert_type, row.message) for row in self.db.query(FleetAlert).all())
+        rebuild_fleet_alerts(self.db)
+        self.assertEqual(sorted((row.vehicle_number, row.alert_type, row.message) for row in self.db.query(FleetAlert).all()), stored)
+
+    def test_refresh_updates_existing_alert_rows_in_place(self):
+        today = date.today()
+        upsert_vehicle_tax(
+            self.db,
+            "MH12AB1234",
+            TaxUpsert(tax_start_date=today - timedelta(days=400), tax_expiry_date=today - timedelta(days=3), road_tax=1200),
+        )
+        # Rows left by another worker's refresh: one outdated, one that no longer applies.
+        tax = self.db.query(FleetAlert).filter(FleetAlert.alert_type == "tax").one()
+        tax.message = "Tax expired 2 day(s) ago"
+        for vehicle_number in ("MH12AB1234", "MH12AB5678"):
+            self.db.add(FleetAlert(vehicle_number=vehicle_number, alert_type="service", severity="danger", message="Service overdue"))
+        self.db.commit()
+
+        self.assertEqual(refresh_vehicle_alerts(self.db, ["MH12AB1234"]), 1)
+        self.db.commit()
+        rows = self.db.query(FleetAlert).order_by(FleetAlert.vehicle_number).all()
+        self.assertEqual(
+            [(row.id, row.vehicle_number, row.alert_type, row.message) for row in rows],
+            [(tax.id, "MH12AB1234", "tax", "Tax expired 3 day(s) ago"), (3, "MH12AB5678", "service", "Service overdue")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import unittest
+from datetime import date
+from pathlib import Path
+import sys
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import app.models  # noqa: F401
+from app.database.base import Base
+from app.models.customer import Customer
+from app.models.driver import Driver
+from app.models.trip_vehicle import TripVehicle
+from app.models.vehicle import Vehicle
+from app.schemas.mechanic import MechanicCreate
+from app.schemas.trip import TripCreate
+from app.services.mechanic_service import add_mechanic_entry
+from app.services.trip_service import create_trip, delete_trip
+from app.services.vehicle_snapshot_service import rebuild_vehicle_stats_snapshot, snapshot_totals, trip_vehicle_allocation
+from app.services.vehicle_stats_service import fleet_summary, vehicle_summary
+
+
+class FleetSummaryTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        SessionLocal = sessionmaker(bind=self.engine)
+        self.db = SessionLocal()
+
+        self.db.add_all(
+            [
+                Vehicle(vehicle_number="MH12AB1234", total_maintenance_cost=0),
+                Vehicle(vehicle_number="MH12AB5678", total_maintenance_cost=0),
+            ]
+        )
+        self.driver = Driver(name="Driver One")
+        self.customer = Customer(name="Customer One", phone="1234567890")
+        self.db.add_all([self.driver, self.customer])
+        self.db.commit()
+        add_mechanic_entry(
+            self.db,
+            MechanicCreate(vehicle_number="MH12AB5678", work_description="Clutch", cost=400, service_date=date(2026, 2, 1)),
+        )
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_fleet_summary_matches_single_vehicle_summary(self):
+        create_trip(
+            self.db,
+            TripCreate(
+                trip_date=date(2026, 3, 5),
+                from_location="Pune",
+                to_location="Mumbai",
+                customer_id=self.customer.id,
+                pricing_type="per_km",
+                cost_per_km=10,
+                invoice_number="INV-FLEET-001",
+                charge_items=[{"description": "Permit", "amount": 300}],
+                vehicles=[
+                    {"vehicle_number": "MH12AB1234", "driver_id": self.driver.id, "start_km": 0, "end_km": 100, "cost_per_km": 10},
+                    {"vehicle_number": "MH12AB5678", "driver_id": self.driver.id, "start_km": 0, "end_km": 50, "cost_per_km": 10},
+                ],
+            ),
+        )
+
+        fleet = {row["vehicle_number"]: row for row in fleet_summary(self.db)}
+
+        self.assertEqual(set(fleet), {"MH12AB1234", "MH12AB5678"})
+        for number, row in fleet.items():
+            single = vehicle_summary(self.db, number)
+            self.assertEqual(row["total_trips"], single["total_trips"])
+            self.assertEqual(row["total_km"], single["total_km"])
+            self.assertEqual(row["trip_cost"], single["trip_cost"])
+            self.assertEqual(row["total_vehicle_cost"], single["total_vehicle_cost"])
+            self.assertEqual(row["total_profit_loss"], single["financial_details"]["total_profit_loss"])
+        self.assertEqual(fleet["MH12AB5678"]["mechanic_total_cost"], 400)
+        self.assertEqual([row["vehicle_number"] for row in fleet_summary(self.db, ["mh12ab5678"])], ["MH12AB5678"])
+
+    def test_vehicle_numbers_are_stored_in_canonical_form(self):
+        create_trip(
+            self.db,
+            TripCreate(
+                trip_date=date(2026, 3, 6),
+                from_location="Pune",
+                to_location="Nashik",
+                customer_id=self.customer.id,
+                pricing_type="per_km",
+                cost_per_km=10,
+                invoice_number="INV-FLEET-002",
+                vehicles=[{"vehicle_number": "mh12-ab 1234", "driver_id": self.driver.id, "start_km": 0, "end_km": 40, "cost_per_km": 10}],
+            ),
+        )
+
+        trip_vehicle = self.db.query(TripVehicle).one()
+        self.assertEqual(trip_vehicle.vehicle_number, "MH12AB1234")
+        self.assertEqual(vehicle_summary(self.db, "mh12-ab-1234")["total_trips"], 1)
+
+    def test_allocation_query_shares_trip_total_by_subtotal(self):
+        trip = create_trip(
+            self.db,
+            TripCreate(
+                trip_date=date(2026, 3, 5),
+                from_location="Pune",
+                to_location="Mumbai",
+                customer_id=self.customer.id,
+                pricing_type="per_km",
+                cost_per_km=10,
+                invoice_number="INV-ALLOC-001",
+                charge_items=[{"description": "Permit", "amount": 300}],
+                vehicles=[
+                    {"vehicle_number": "MH12AB1234", "driver_id": self.driver.id, "start_km": 0, "end_km": 100, "cost_per_km": 10},
+                    {"vehicle_number": "MH12AB5678", "driver_id": self.driver.id, "start_km": 0, "end_km": 50, "cost_per_km": 10},
+                ],
+            ),
+        )
+
+        allocation = trip_vehicle_allocation([trip.id])
+        rows = {
+            row.vehicle_number: row.allocated_revenue
+            for row in self.db.execute(select(allocation.c.vehicle_number, allocation.c.allocated_revenue))
+        }
+
+        total = float(trip.total_charged)
+        self.assertAlmostEqual(rows["MH12AB1234"], 1000 + (total - 1500) * 1000 / 1500)
+        self.assertAlmostEqual(rows["MH12AB5678"], 500 + (total - 1500) * 500 / 1500)
+        self.assertAlmostEqual(sum(rows.values()), total)
+
+    def test_snapshot_is_updated_on_write_and_matches_rebuild(self):
+        trip = create_trip(
+            self.db,
+            TripCreate(
+                trip_date=date(2026, 3, 7),
+                from_location="Pune",
+                to_location="Satara",
+                customer_id=self.customer.id,
+                pricing_type="per_km",
+                cost_per_km=10,
+                invoice_number="INV-FLEET-003",
+                vehicles=[{"vehicle_number": "MH12AB1234", "driver_id": self.driver.id, "start_km": 0, "end_km": 60, "cost_per_km": 10}],
+            ),
+        )
+        self.assertEqual(snapshot_totals(self.db, ["MH12AB1234"])["MH12AB1234"]["trip_revenue"], 600)
+
+        delete_trip(self.db, trip.id)
+        incremental = snapshot_totals(self.db, ["MH12AB1234", "MH12AB5678"])
+        self.assertEqual(incremental["MH12AB1234"]["trip_count"], 0)
+        self.assertEqual(incremental["MH12AB5678"]["mechanic_cost"], 400)
+
+        rebuild_vehicle_stats_snapshot(self.db)
+        self.assertEqual(snapshot_totals(self.db, ["MH12AB5678"])["MH12AB5678"], incremental["MH12AB5678"])
+
+    def test_summary_builds_only_included_sections_and_pages_history(self):
+        add_mechanic_entry(
+            self.db,
+            MechanicCreate(vehicle_number="MH12AB5678", work_description="Engine breakdown", cost=900, service_date=date(2026, 2, 9)),
+        )
+
+        first = vehicle_summary(self.db, "MH12AB5678", include="maintenance_section", limit=1)
+        self.assertNotIn("trip_performance", first)
+        self.assertNotIn("spare_parts", first)
+        self.assertEqual([row["work_description"] for row in first["maintenance_section"]["service_history"]], ["Engine breakdown"])
+        self.assertEqual(len(first["maintenance_section"]["breakdown_history"]), 1)
+        self.assertNotIn("breakdown_history", first["next_cursors"])
+
+        second = vehicle_summary(
+            self.db, "MH12AB5678", include="maintenance_section", limit=1, cursor=first["next_cursors"]["service_history"]
+        )
+        self.assertEqual([row["work_description"] for row in second["maintenance_section"]["service_history"]], ["Clutch"])
+        self.assertEqual(second["next_cursors"], {})
+
+        with self.assertRaises(HTTPException):
+            vehicle_summary(self.db, "MH12AB5678", include="everything")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,15 @@ export default function Pagination({
   totalItems,
   pageSize = 10,
   onPageChange,
+  sequential = false,
 }) {
   const totalPages = Math.max(1, Math.ceil(totalItems / pageSize));
 
   const pageNumbers = useMemo(() => {
+    // Cursor-paged lists can only step to the neighbouring pages.
+    if (sequential) {
+      return [currentPage];
+    }
     if (totalPages <= 7) {
       return Array.from({ length: totalPages }, (_, i) => i + 1);
     }
@@ -17,7 +22,7 @@ export default function Pagination({
     return Array.from(pages)
       .filter((page) => page >= 1 && page <= totalPages)
       .sort((a, b) => a - b);
-  }, [currentPage, totalPages]);
+  }, [currentPage, totalPages, sequential]);
 
   const start = totalItems === 0 ? 0 : (currentPage - 1) * pageSize + 1;
   const end = Math.min(totalItems, currentPage * pageSize);
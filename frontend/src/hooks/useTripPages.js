@@ -0,0 +1,79 @@
+import { useCallback, useEffect, useMemo, useState } from "react";
+import api from "../services/api";
+
+const FILTER_DEBOUNCE_MS = 300;
+
+const compactParams = (filters) =>
+  Object.fromEntries(Object.entries(filters).filter(([, value]) => value !== "" && value !== null && value !== undefined));
+
+const freshPosition = (key) => ({ key, page: 1, cursors: [null] });
+
+/*
+ * One page of GET /trips at a time, filtered on the server.
+ *
+ * The API pages by cursor, so pages are walked in order: cursors[n - 1] is the
+ * X-Next-Cursor token that opens page n. Changing the filters starts again at
+ * page 1; typing in a filter field is debounced before it refetches.
+ */
+export default function useTripPages(filters, { pageSize = 10, view = "compact" } = {}) {
+  const filterKey = JSON.stringify(compactParams(filters));
+  const [appliedKey, setAppliedKey] = useState(filterKey);
+  const [position, setPosition] = useState(() => freshPosition(filterKey));
+  const [trips, setTrips] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [loading, setLoading] = useState(true);
+  const [reloadCount, setReloadCount] = useState(0);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setAppliedKey(filterKey), FILTER_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [filterKey]);
+
+  const current = position.key === appliedKey ? position : freshPosition(appliedKey);
+  const { page } = current;
+  const cursor = current.cursors[page - 1];
+
+  useEffect(() => {
+    let cancelled = false;
+    const params = { ...JSON.parse(appliedKey), view, limit: pageSize };
+    if (cursor) params.cursor = cursor;
+    setLoading(true);
+    api
+      .get("/trips", { params })
+      .then((res) => {
+        if (cancelled) return;
+        const next = res.headers["x-next-cursor"];
+        setTrips(res.data || []);
+        setTotal(Number(res.headers["x-total-count"] || 0));
+        setPosition((prev) => {
+          const base = prev.key === appliedKey ? prev : freshPosition(appliedKey);
+          const cursors = base.cursors.slice(0, page);
+          return { ...base, page, cursors: next ? [...cursors, next] : cursors };
+        });
+      })
+      .catch((error) => {
+        if (!cancelled) console.error("Error loading trips:", error);
+      })
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [appliedKey, page, cursor, pageSize, view, reloadCount]);
+
+  const setPage = useCallback(
+    (target) =>
+      setPosition((prev) => {
+        const base = prev.key === appliedKey ? prev : freshPosition(appliedKey);
+        return target >= 1 && target <= base.cursors.length ? { ...base, page: target } : base;
+      }),
+    [appliedKey]
+  );
+
+  const reload = useCallback(() => setReloadCount((count) => count + 1), []);
+
+  const params = useMemo(() => JSON.parse(appliedKey), [appliedKey]);
+
+  return { trips, total, page, pageSize, setPage, reload, loading, params };
+}
@@ -3,37 +3,17 @@ import { useNavigate } from "react-router-dom";
 import api from "../../services/api";
 import { formatDateDDMMYYYY } from "../../utils/date";
 import Pagination from "../../components/common/Pagination";
+import useTripPages from "../../hooks/useTripPages";
 
 export default function BookingReceiptList() {
   const navigate = useNavigate();
-  const [trips, setTrips] = useState([]);
   const [customers, setCustomers] = useState([]);
-  const [currentPage, setCurrentPage] = useState(1);
-  const pageSize = 10;
+  const { trips, total, page, pageSize, setPage } = useTripPages({});
 
   useEffect(() => {
-    loadTrips();
     loadCustomers();
   }, []);
 
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [trips.length]);
-
-  const paginatedTrips = trips.slice(
-    (currentPage - 1) * pageSize,
-    currentPage * pageSize
-  );
-
-  const loadTrips = async () => {
-    try {
-      const res = await api.get("/trips");
-      setTrips(res.data || []);
-    } catch (error) {
-      console.error("Error loading trips:", error);
-    }
-  };
-
   const loadCustomers = async () => {
     try {
       const res = await api.get("/customers");
@@ -76,7 +56,7 @@ export default function BookingReceiptList() {
               {trips.length === 0 ? (
                 <tr><td colSpan="5" className="p-20 text-center text-slate-400 font-bold uppercase tracking-widest text-[10px]">No bookings found</td></tr>
               ) : (
-                paginatedTrips.map((trip) => {
+                trips.map((trip) => {
                   const customer = customers.find(c => c.id === trip.customer_id);
                   const bookingLabel = trip.booking_id || trip.invoice_number || `BKG-${trip.id}`;
                   const status = trip.vehicle_number ? "Vehicle Assigned" : "Pending Vehicle";
@@ -133,10 +113,11 @@ export default function BookingReceiptList() {
           </table>
         </div>
         <Pagination
-          currentPage={currentPage}
-          totalItems={trips.length}
+          currentPage={page}
+          totalItems={total}
           pageSize={pageSize}
-          onPageChange={setCurrentPage}
+          onPageChange={setPage}
+          sequential
         />
       </div>
     </div>
@@ -15,7 +15,7 @@ export default function CustomerDetails() {
 
   useEffect(() => {
     api
-      .get(`/customers/${id}/trips`)
+      .get(`/customers/${id}/trips`, { params: { view: "compact" } })
       .then((res) => {
         setCustomer(res.data.customer);
         setTrips(res.data.trips);
@@ -32,15 +32,7 @@ export default function CustomerDetails() {
     )
     : trips;
 
-  const getPartyFuelCredit = (trip) =>
-    (trip.vehicles || []).reduce((sum, vehicle) => {
-      const directCredit = Number(vehicle.vendor_deduction_amount || 0);
-      const entryCredits = (vehicle.expenses || []).reduce(
-        (subtotal, exp) => subtotal + Number(exp.amount || 0),
-        0
-      );
-      return sum + directCredit + entryCredits;
-    }, 0);
+  const getPartyFuelCredit = (trip) => Number(trip.party_fuel_credit || 0);
 
   const getTripDueAmount = (trip) => {
     const totalCharged = Number(trip?.total_charged || 0);
@@ -3,30 +3,36 @@ import { useNavigate } from "react-router-dom";
 import api from "../../services/api";
 import { formatDateDDMMYYYY } from "../../utils/date";
 import Pagination from "../../components/common/Pagination";
+import useTripPages from "../../hooks/useTripPages";
 
 export default function InvoiceList() {
   const navigate = useNavigate();
-  const [trips, setTrips] = useState([]);
   const [customers, setCustomers] = useState([]);
   const [filterCustomer, setFilterCustomer] = useState("");
-  const [searchCustomer, setSearchCustomer] = useState("");
   const [searchInvoice, setSearchInvoice] = useState("");
-  const [currentPage, setCurrentPage] = useState(1);
-  const pageSize = 10;
+  const [totals, setTotals] = useState({ total_charged: 0, amount_received: 0, pending_amount: 0 });
+  const { trips, total, page, pageSize, setPage, params } = useTripPages({
+    customer_id: filterCustomer,
+    invoice_prefix: searchInvoice.trim(),
+  });
 
   useEffect(() => {
-    loadTrips();
     loadCustomers();
   }, []);
 
-  const loadTrips = async () => {
-    try {
-      const res = await api.get("/trips");
-      setTrips(res.data || []);
-    } catch (error) {
-      console.error("Error loading trips:", error);
-    }
-  };
+  // The cards cover every matching invoice, not just the page on screen.
+  useEffect(() => {
+    let cancelled = false;
+    api
+      .get("/trips/totals", { params })
+      .then(res => {
+        if (!cancelled) setTotals(res.data);
+      })
+      .catch(error => console.error("Error loading invoice totals:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [params]);
 
   const loadCustomers = async () => {
     try {
@@ -37,15 +43,7 @@ export default function InvoiceList() {
     }
   };
 
-  const getPartyFuelCredit = (trip) =>
-    (trip.vehicles || []).reduce((sum, vehicle) => {
-      const directCredit = Number(vehicle.vendor_deduction_amount || 0);
-      const entryCredits = (vehicle.expenses || []).reduce(
-        (subtotal, exp) => subtotal + Number(exp.amount || 0),
-        0
-      );
-      return sum + directCredit + entryCredits;
-    }, 0);
+  const getPartyFuelCredit = (trip) => Number(trip.party_fuel_credit || 0);
 
   const getDueAmount = (trip) => {
     const totalCharged = Number(trip.total_charged || 0);
@@ -53,41 +51,6 @@ export default function InvoiceList() {
     return Math.max(totalCharged - received - getPartyFuelCredit(trip), 0);
   };
 
-  let filteredTrips = trips;
-
-  if (filterCustomer) {
-    filteredTrips = filteredTrips.filter(t => t.customer_id === Number(filterCustomer));
-  }
-
-  if (searchCustomer.trim()) {
-    const query = searchCustomer.trim().toLowerCase();
-    filteredTrips = filteredTrips.filter(t => {
-      const name = customers.find(c => c.id === t.customer_id)?.name || "";
-      return name.toLowerCase().includes(query);
-    });
-  }
-
-  if (searchInvoice.trim()) {
-    const query = searchInvoice.trim().toLowerCase();
-    filteredTrips = filteredTrips.filter(t => {
-      const invoice = String(t.invoice_number || `INV-${t.id}`).toLowerCase();
-      return invoice.includes(query);
-    });
-  }
-
-  const totalInvoiced = filteredTrips.reduce((sum, t) => sum + (t.total_charged || 0), 0);
-  const totalPaid = filteredTrips.reduce((sum, t) => sum + (t.amount_received || 0), 0);
-  const totalPending = filteredTrips.reduce((sum, t) => sum + getDueAmount(t), 0);
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [filterCustomer, searchCustomer, searchInvoice, trips.length]);
-
-  const paginatedTrips = filteredTrips.slice(
-    (currentPage - 1) * pageSize,
-    currentPage * pageSize
-  );
-
   return (
     <div className="p-8 space-y-8 animate-in fade-in slide-in-from-bottom-4 duration-700">
       <div className="flex flex-col gap-6 md:flex-row md:justify-between md:items-center">
@@ -112,9 +75,9 @@ export default function InvoiceList() {
       </div>
 
       <div className="grid grid-cols-1 md:grid-cols-3 gap-8">
-        <KPI CardTitle="Total Billed" CardValue={` ₹${totalInvoiced.toLocaleString()}`} CardNote="Total across filtered invoices" Color="blue" />
-        <KPI CardTitle="Total Paid" CardValue={` ₹${totalPaid.toLocaleString()}`} CardNote="Amount collected from customers" Color="emerald" />
-        <KPI CardTitle="Balance Due" CardValue={` ₹${totalPending.toLocaleString()}`} CardNote="Amount yet to be settled" Color="rose" />
+        <KPI CardTitle="Total Billed" CardValue={` ₹${totals.total_charged.toLocaleString()}`} CardNote="Total across filtered invoices" Color="blue" />
+        <KPI CardTitle="Total Paid" CardValue={` ₹${totals.amount_received.toLocaleString()}`} CardNote="Amount collected from customers" Color="emerald" />
+        <KPI CardTitle="Balance Due" CardValue={` ₹${totals.pending_amount.toLocaleString()}`} CardNote="Amount yet to be settled" Color="rose" />
       </div>
 
       <div className="flex flex-wrap gap-4 items-center bg-slate-100/30 p-4 rounded-3xl border border-slate-100">
@@ -138,16 +101,7 @@ export default function InvoiceList() {
           <div className="relative flex-1 max-w-sm">
             <input
               className="w-full pl-10 pr-4 py-3 bg-white border border-slate-200 rounded-2xl text-xs font-bold text-slate-700 focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all outline-none"
-              placeholder="Search Customer..."
-              value={searchCustomer}
-              onChange={e => setSearchCustomer(e.target.value)}
-            />
-            <svg className="absolute left-3.5 top-3.5 w-4 h-4 text-slate-400" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path strokeLinecap="round" strokeLinejoin="round" strokeWidth="3" d="M21 21l-6-6m2-5a7 7 0 11-14 0 7 7 0 0114 0z" /></svg>
-          </div>
-          <div className="relative flex-1 max-w-sm">
-            <input
-              className="w-full pl-10 pr-4 py-3 bg-white border border-slate-200 rounded-2xl text-xs font-bold text-slate-700 focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all outline-none"
-              placeholder="Search Invoice #..."
+              placeholder="Invoice # starts with..."
               value={searchInvoice}
               onChange={e => setSearchInvoice(e.target.value)}
             />
@@ -168,14 +122,14 @@ export default function InvoiceList() {
               </tr>
             </thead>
             <tbody className="divide-y divide-slate-50">
-              {filteredTrips.length === 0 ? (
+              {trips.length === 0 ? (
                 <tr><td colSpan="4" className="p-20 text-center text-slate-400 font-bold uppercase tracking-widest text-[10px]">No invoices found</td></tr>
               ) : (
-                paginatedTrips.map(trip => {
+                trips.map(trip => {
                   const customer = customers.find(c => c.id === trip.customer_id);
                   const dueAmount = getDueAmount(trip);
                   const status = dueAmount === 0 ? "Settled" : dueAmount === Number(trip.total_charged || 0) ? "Outstanding" : "Partial";
-                  const hasVehicleAssigned = Boolean(trip.vehicle_number || (trip.vehicles && trip.vehicles.length));
+                  const hasVehicleAssigned = Boolean(trip.vehicle_number);
 
                   return (
                     <tr key={trip.id} className="group hover:bg-slate-50/40 transition-colors">
@@ -234,10 +188,11 @@ export default function InvoiceList() {
           </table>
         </div>
         <Pagination
-          currentPage={currentPage}
-          totalItems={filteredTrips.length}
+          currentPage={page}
+          totalItems={total}
           pageSize={pageSize}
-          onPageChange={setCurrentPage}
+          onPageChange={setPage}
+          sequential
         />
       </div>
     </div>
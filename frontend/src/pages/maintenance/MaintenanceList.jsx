@@ -26,6 +26,7 @@ export default function MaintenanceList() {
   const [vehicles, setVehicles] = useState([]);
   const [selectedVehicle, setSelectedVehicle] = useState("");
   const [finance, setFinance] = useState(null);
+  const [filteredInstallments, setFilteredInstallments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   const [viewMode, setViewMode] = useState("all_months");
@@ -81,15 +82,6 @@ export default function MaintenanceList() {
   const insurance = finance?.insurance;
   const tax = finance?.tax;
 
-  const periodMatches = (dateValue) => {
-    if (!dateValue) return false;
-    if (viewMode === "all_months") return true;
-    const normalized = String(dateValue).slice(0, 10);
-    if (viewMode === "monthly") return normalized.slice(0, 7) === selectedMonth;
-    if (viewMode === "yearly") return normalized.slice(0, 4) === selectedYear;
-    return true;
-  };
-
   const periodRange = useMemo(() => {
     if (viewMode === "all_months") return null;
     if (viewMode === "monthly") {
@@ -120,11 +112,29 @@ export default function MaintenanceList() {
     return start <= periodRange.end && end >= periodRange.start;
   }, [tax, periodRange, viewMode]);
 
-  const filteredInstallments = useMemo(() => {
-    const allInstallments = emi?.installments || [];
-    if (viewMode === "all_months") return allInstallments;
-    return allInstallments.filter((item) => periodMatches(item.due_date));
-  }, [emi, selectedMonth, selectedYear, viewMode]);
+  useEffect(() => {
+    if (!emi?.id) {
+      setFilteredInstallments([]);
+      return undefined;
+    }
+    let cancelled = false;
+    (async () => {
+      const params = periodRange ? { limit: 600, start_date: periodRange.start, end_date: periodRange.end } : { limit: 600 };
+      const items = [];
+      let cursor = null;
+      do {
+        const res = await api.get(`/vehicle-finance/emi-plans/${emi.id}/installments`, {
+          params: cursor ? { ...params, cursor } : params,
+        });
+        items.push(...(res.data?.items || []));
+        cursor = res.data?.next_cursor;
+      } while (cursor && !cancelled);
+      if (!cancelled) setFilteredInstallments(items);
+    })();
+    return () => {
+      cancelled = true;
+    };
+  }, [emi, periodRange]);
 
   const emiStatusForView = useMemo(() => {
     if (!emi) return "pending";
@@ -110,7 +110,7 @@ export default function QuotationForm() {
           </h3>
           
           <div className="grid grid-cols-1 md:grid-cols-3 gap-8">
-            <Field label="Quotation No" name="quotation_no" value={form.quotation_no} onChange={handleChange} required />
+            <Field label="Quotation No" name="quotation_no" value={form.quotation_no} onChange={handleChange} required={isEdit} placeholder={isEdit ? "" : "Auto-generated if blank"} />
             <Field label="Quotation Date" name="quotation_date" value={form.quotation_date} onChange={handleChange} type="date" required />
             <Field label="Customer Name" name="customer_name" value={form.customer_name} onChange={handleChange} required />
             <Field label="Address" name="address" value={form.address} onChange={handleChange} className="md:col-span-2" />
@@ -205,7 +205,7 @@ export default function QuotationForm() {
   );
 }
 
-function Field({ label, name, value, onChange, type = "text", required = false, className = "" }) {
+function Field({ label, name, value, onChange, type = "text", required = false, placeholder = "", className = "" }) {
   return (
     <div className={`space-y-2 ${className}`}>
       <label className="text-[10px] font-black uppercase tracking-widest text-slate-400 ml-1">{label}</label>
@@ -215,6 +215,7 @@ function Field({ label, name, value, onChange, type = "text", required = false,
         value={value}
         onChange={onChange}
         required={required}
+        placeholder={placeholder}
         className="w-full h-12 px-4 bg-slate-50 border border-slate-200 rounded-xl text-sm font-bold text-slate-700 outline-none focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all"
       />
     </div>
@@ -558,7 +558,8 @@ export default function TripForm() {
 
       const vendorName = form.vendor ? String(form.vendor).trim() : "";
       const normalizedInvoiceNumber = String(form.invoice_number || "").trim();
-      const effectiveInvoiceNumber = normalizedInvoiceNumber || `DRAFT-${Date.now()}`;
+      // A blank number on a new trip is allocated by the server.
+      const effectiveInvoiceNumber = normalizedInvoiceNumber || (isEdit ? `DRAFT-${Date.now()}` : null);
       const computedFuelCost = Number(form.fuel_litres || 0) * Number(form.fuel_rate || 0);
       const fuelCostTotal = computedFuelCost || Number(form.fuel_cost || 0);
       const isNewAdvancePayment = (pay) =>
@@ -978,7 +979,7 @@ export default function TripForm() {
                       name="invoice_number"
                       value={form.invoice_number}
                       onChange={handleChange}
-                      placeholder="INV-XXXXXX"
+                      placeholder={isEdit ? "INV-XXXXXX" : "Auto-generated if blank"}
                       className="w-full h-12 px-4 bg-slate-50 border border-slate-200 rounded-xl text-sm font-bold text-slate-800 placeholder:text-slate-300 outline-none focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all"
                     />
                   </div>
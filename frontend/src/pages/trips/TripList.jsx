@@ -1,38 +1,36 @@
-import { useEffect, useState, useCallback } from "react";
+import { useEffect, useState } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import api from "../../services/api";
 import { authService } from "../../services/auth";
 import { formatDateDDMMYYYY } from "../../utils/date";
 import Modal from "../../components/common/Modal";
 import Pagination from "../../components/common/Pagination";
+import useTripPages from "../../hooks/useTripPages";
+
+const isoDay = (offsetDays = 0) => new Date(Date.now() + offsetDays * 86400000).toISOString().split("T")[0];
 
 export default function Trips() {
   const navigate = useNavigate();
   const [searchParams] = useSearchParams();
 
-  const [trips, setTrips] = useState([]);
-  const [filteredTrips, setFilteredTrips] = useState([]);
   const [vehicles, setVehicles] = useState([]);
-  const [selectedVehicle, setSelectedVehicle] = useState("");
+  const [selectedVehicle, setSelectedVehicle] = useState(searchParams.get("vehicle") || "");
   const [customers, setCustomers] = useState([]);
   const [drivers, setDrivers] = useState([]);
   const [activeTab, setActiveTab] = useState("all");
-  const [initialLoadDone, setInitialLoadDone] = useState(false);
-  const [searchCustomer, setSearchCustomer] = useState("");
+  const [filterCustomer, setFilterCustomer] = useState("");
   const [searchInvoice, setSearchInvoice] = useState("");
-  const [currentPage, setCurrentPage] = useState(1);
-  const pageSize = 10;
+  const { trips, total, page, pageSize, setPage, reload } = useTripPages({
+    vehicle_number: selectedVehicle,
+    customer_id: filterCustomer,
+    invoice_prefix: searchInvoice.trim(),
+    // Upcoming and completed split on the departure date, falling back to the trip date.
+    start_date: activeTab === "upcoming" ? isoDay() : "",
+    end_date: activeTab === "completed" ? isoDay(-1) : "",
+  });
   const canWrite = !authService.hasLimitedAccess();
 
-  const getPartyFuelCredit = (trip) =>
-    (trip.vehicles || []).reduce((sum, vehicle) => {
-      const directCredit = Number(vehicle.vendor_deduction_amount || 0);
-      const entryCredits = (vehicle.expenses || []).reduce(
-        (subtotal, exp) => subtotal + Number(exp.amount || 0),
-        0
-      );
-      return sum + directCredit + entryCredits;
-    }, 0);
+  const getPartyFuelCredit = (trip) => Number(trip.party_fuel_credit || 0);
 
   const getDueAmount = (trip) => {
     const totalCharged = Number(trip.total_charged || 0);
@@ -51,85 +49,23 @@ export default function Trips() {
     api.get("/vehicles").then(res => setVehicles(res.data));
     api.get("/customers").then(res => setCustomers(res.data));
     api.get("/drivers").then(res => setDrivers(res.data));
+  }, []);
 
+  useEffect(() => {
     const vehicleParam = searchParams.get("vehicle");
     if (vehicleParam) {
       setSelectedVehicle(vehicleParam);
       setActiveTab("all");
-    } else {
-      fetchAllTrips();
     }
-    setInitialLoadDone(true);
   }, [searchParams]);
 
-  const fetchAllTrips = async () => {
-    const res = await api.get("/trips");
-    setTrips(res.data || []);
+  const clearFilters = () => {
+    setSelectedVehicle("");
+    setFilterCustomer("");
+    setSearchInvoice("");
+    setActiveTab("all");
   };
 
-  const searchByVehicle = useCallback(async () => {
-    if (!selectedVehicle) {
-      fetchAllTrips();
-      return;
-    }
-    const res = await api.get(`/trips/vehicle/${selectedVehicle}`);
-    setTrips(res.data || []);
-  }, [selectedVehicle]);
-
-  useEffect(() => {
-    if (initialLoadDone && selectedVehicle) {
-      searchByVehicle();
-    }
-  }, [searchByVehicle, initialLoadDone, selectedVehicle]);
-
-  /* ---------------- FILTER BY TAB ---------------- */
-  useEffect(() => {
-    const today = new Date().toISOString().split("T")[0];
-
-    let filtered = trips;
-    if (activeTab === "upcoming") {
-      filtered = trips.filter(t => {
-        const effectiveDate = t.departure_datetime
-          ? String(t.departure_datetime).split("T")[0]
-          : t.trip_date;
-        return effectiveDate >= today;
-      });
-    } else if (activeTab === "completed") {
-      filtered = trips.filter(t => {
-        const effectiveDate = t.departure_datetime
-          ? String(t.departure_datetime).split("T")[0]
-          : t.trip_date;
-        return effectiveDate < today;
-      });
-    }
-
-    if (searchInvoice.trim()) {
-      const invoiceQuery = searchInvoice.trim().toLowerCase();
-      filtered = filtered.filter(t =>
-        String(t.invoice_number || "").toLowerCase().includes(invoiceQuery)
-      );
-    }
-
-    if (searchCustomer.trim()) {
-      const customerQuery = searchCustomer.trim().toLowerCase();
-      filtered = filtered.filter(t => {
-        const name = customers.find(c => c.id === t.customer_id)?.name || "";
-        return name.toLowerCase().includes(customerQuery);
-      });
-    }
-
-    setFilteredTrips(filtered);
-  }, [trips, activeTab, searchInvoice, searchCustomer, customers]);
-
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [trips.length, activeTab, searchInvoice, searchCustomer, selectedVehicle]);
-
-  const paginatedTrips = filteredTrips.slice(
-    (currentPage - 1) * pageSize,
-    currentPage * pageSize
-  );
-
   /* ---------------- DELETE ---------------- */
   const handleDelete = async (id) => {
     showModal(
@@ -139,7 +75,7 @@ export default function Trips() {
       async () => {
         try {
           await api.delete(`/trips/${id}`);
-          fetchAllTrips();
+          reload();
           closeModal();
         } catch (err) {
           showModal("Delete Error", "Failed to delete trip. Please try again.");
@@ -206,12 +142,16 @@ export default function Trips() {
 
           <div className="md:col-span-2 flex gap-3">
             <div className="relative flex-1 group">
-              <input
-                className="w-full pl-10 pr-4 py-3 bg-white border border-slate-200 rounded-2xl text-xs font-bold text-slate-700 outline-none focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all"
-                placeholder="Search Customer..."
-                value={searchCustomer}
-                onChange={(e) => setSearchCustomer(e.target.value)}
-              />
+              <select
+                className="w-full pl-10 pr-4 py-3 bg-white border border-slate-200 rounded-2xl text-xs font-bold text-slate-700 appearance-none outline-none focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all"
+                value={filterCustomer}
+                onChange={(e) => setFilterCustomer(e.target.value)}
+              >
+                <option value="">All Customers</option>
+                {customers.map(c => (
+                  <option key={c.id} value={c.id}>{c.name}</option>
+                ))}
+              </select>
               <div className="absolute inset-y-0 left-0 pl-3.5 flex items-center pointer-events-none text-slate-300">
                 <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
                   <path strokeLinecap="round" strokeLinejoin="round" strokeWidth="2.5" d="M16 7a4 4 0 11-8 0 4 4 0 018 0zM12 14a7 7 0 00-7 7h14a7 7 0 00-7-7z" />
@@ -221,7 +161,7 @@ export default function Trips() {
             <div className="relative flex-1 group">
               <input
                 className="w-full pl-10 pr-4 py-3 bg-white border border-slate-200 rounded-2xl text-xs font-bold text-slate-700 outline-none focus:ring-4 focus:ring-blue-500/10 focus:border-blue-500 transition-all"
-                placeholder="Invoice #..."
+                placeholder="Invoice # starts with..."
                 value={searchInvoice}
                 onChange={(e) => setSearchInvoice(e.target.value)}
               />
@@ -234,10 +174,10 @@ export default function Trips() {
           </div>
 
           <button
-            onClick={searchByVehicle}
+            onClick={clearFilters}
             className="px-6 py-3 bg-slate-900 text-white font-black text-[10px] uppercase tracking-widest rounded-2xl hover:bg-slate-800 transition-all shadow-lg shadow-slate-900/10"
           >
-            Apply Filters
+            Clear Filters
           </button>
         </div>
       </div>
@@ -257,14 +197,14 @@ export default function Trips() {
             </thead>
 
             <tbody className="divide-y divide-slate-50">
-              {filteredTrips.length === 0 ? (
+              {trips.length === 0 ? (
                 <tr><td colSpan="5" className="p-20 text-center text-slate-400 font-bold">No trips found</td></tr>
               ) : (
-                paginatedTrips.map(trip => (
+                trips.map(trip => (
                   <tr key={trip.id} className="group hover:bg-slate-50/40 transition-colors">
                     <td className="p-6">
                       {(() => {
-                        const hasVehicleAssigned = Boolean(trip.vehicle_number || (trip.vehicles && trip.vehicles.length));
+                        const hasVehicleAssigned = Boolean(trip.vehicle_number);
                         return (
                           <div className="flex flex-col">
                             <span className="text-sm font-black text-blue-600 tracking-tight">{trip.invoice_number || "PENDING"}</span>
@@ -338,10 +278,11 @@ export default function Trips() {
           </table>
         </div>
         <Pagination
-          currentPage={currentPage}
-          totalItems={filteredTrips.length}
+          currentPage={page}
+          totalItems={total}
           pageSize={pageSize}
-          onPageChange={setCurrentPage}
+          onPageChange={setPage}
+          sequential
         />
       </div>
       {/* MODAL */}
@@ -34,7 +34,11 @@ export default function VehicleDetails() {
     try {
       const targetVehicleNumber = normalizeVehicleNumber(vehicle_number);
       const [summaryRes, fuelRes, spareRes, maintenanceRes, tripsRes, oilRes] = await Promise.all([
-        api.get(`/vehicles/${vehicle_number}/summary`),
+        api.get(`/vehicles/${vehicle_number}/summary`, {
+          params: {
+            include: "financial_details,trip_performance,fuel_management,maintenance_section,driver_details,smart_dashboard,alerts_section",
+          },
+        }),
         api.get("/fuel"),
         api.get("/spare-parts"),
         api.get(`/mechanic/vehicle/${vehicle_number}`),